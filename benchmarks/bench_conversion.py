@@ -0,0 +1,32 @@
+import json
+import shutil
+
+from testbench2robotframework import testbench2robotframework as write_report
+from testbench2robotframework.robotframework2testbench import robot2testbench as read_results
+
+
+def _read_config(workspace):
+    return json.loads(workspace["config"].read_text(encoding="utf-8"))
+
+
+def test_write(benchmark, measure_peak_memory, synthetic_workspace):
+    config = _read_config(synthetic_workspace)
+    report = str(synthetic_workspace["report"])
+    benchmark.extra_info["test_cases"] = synthetic_workspace["test_cases"]
+    measure_peak_memory(write_report, report, config)
+    benchmark.pedantic(write_report, args=(report, config), rounds=3)
+
+
+def test_read(benchmark, measure_peak_memory, synthetic_workspace, tmp_path):
+    config = _read_config(synthetic_workspace)
+    report = str(synthetic_workspace["report"])
+    output_xml = str(synthetic_workspace["output"])
+    result_dir = tmp_path / "result"
+    benchmark.extra_info["test_cases"] = synthetic_workspace["test_cases"]
+
+    def read():
+        shutil.rmtree(result_dir, ignore_errors=True)
+        read_results(report, output_xml, str(result_dir), config)
+
+    measure_peak_memory(read)
+    benchmark.pedantic(read, rounds=3)
@@ -0,0 +1,31 @@
+import os
+import tracemalloc
+
+import pytest
+
+from synthetic_report import PRESETS, create_workspace
+
+BENCHMARK_SIZE_VARIABLE = "TB2ROBOT_BENCHMARK_SIZE"
+
+
+@pytest.fixture(scope="session")
+def synthetic_workspace(tmp_path_factory):
+    size = os.environ.get(BENCHMARK_SIZE_VARIABLE, "small")
+    return create_workspace(
+        tmp_path_factory.mktemp(f"synthetic_{size}"), PRESETS[size], with_results=True
+    )
+
+
+@pytest.fixture
+def measure_peak_memory(benchmark):
+    def measure(function, *args):
+        tracemalloc.start()
+        try:
+            function(*args)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        benchmark.extra_info["peak_memory_bytes"] = peak
+        return peak
+
+    return measure
@@ -0,0 +1,325 @@
+"""Synthesizes TestBench JSON reports and matching Robot Framework results.
+
+The generated reports are deterministic for a given ``SyntheticReportSpec`` so that
+benchmark results of different releases can be compared with each other.
+
+Usage::
+
+    python benchmarks/synthetic_report.py OUTPUT_DIR --depth 3 --fan-out 4 --with-results
+"""
+
+import argparse
+import json
+import random
+import sys
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+LIBS_PATH = Path(__file__).resolve().parent.parent / "bundled" / "libs"
+if str(LIBS_PATH) not in sys.path:
+    sys.path.insert(0, str(LIBS_PATH))
+
+REPORT_DIRECTORY = "report"
+RESOURCE_DIRECTORY = "Resources"
+GENERATION_DIRECTORY = "Generated"
+RESOURCE_NAME = "Synthetic"
+CONFIG_FILE = "config.json"
+OUTPUT_XML = "output.xml"
+FAILING_KEYWORD = "Synthetic Check"
+FAILING_VALUE = "fail"
+
+
+@dataclass
+class SyntheticReportSpec:
+    tree_depth: int = 2
+    fan_out: int = 3
+    test_case_sets_per_theme: int = 3
+    test_cases_per_set: int = 5
+    interactions_per_test_case: int = 6
+    interaction_nesting: int = 2
+    interactions_per_compound: int = 3
+    parameters_per_interaction: int = 2
+    distinct_keywords: int = 20
+    fail_ratio: float = 0.1
+    seed: int = 4711
+
+
+PRESETS: Dict[str, SyntheticReportSpec] = {
+    "small": SyntheticReportSpec(),
+    "medium": SyntheticReportSpec(tree_depth=3, fan_out=4, test_cases_per_set=10),
+    "large": SyntheticReportSpec(
+        tree_depth=4, fan_out=5, test_cases_per_set=10, interactions_per_test_case=10
+    ),
+}
+
+
+class SyntheticReportGenerator:
+    def __init__(self, spec: SyntheticReportSpec) -> None:
+        self.spec = spec
+        self._random = random.Random(spec.seed)
+        self._next_key = 1
+        self.nodes: List[Dict] = []
+        self.test_case_sets: List[Dict] = []
+        self.test_cases: List[Dict] = []
+
+    def generate(self, report_dir: Path) -> Path:
+        report_dir.mkdir(parents=True, exist_ok=True)
+        root = self._create_node("RootNode", "", "0", "Synthetic Cycle", "itb-TT-root")
+        self._create_theme_children(root, 1)
+        write_json(report_dir / "cycle_structure.json", {"root": root, "nodes": self.nodes})
+        write_json(report_dir / "project.json", {"key": "1", "name": "Synthetic Project"})
+        for test_case_set in self.test_case_sets:
+            write_json(report_dir / f"{test_case_set['uniqueID']}.json", test_case_set)
+        for test_case in self.test_cases:
+            write_json(report_dir / f"{test_case['uniqueID']}.json", test_case)
+        return report_dir
+
+    def _key(self) -> str:
+        key = str(self._next_key)
+        self._next_key += 1
+        return key
+
+    def _create_node(
+        self, element_type: str, numbering: str, parent_key: str, name: str, uid: str
+    ) -> Dict:
+        return {
+            "elementType": element_type,
+            "base": {
+                "key": self._key(),
+                "numbering": numbering,
+                "parentKey": parent_key,
+                "name": name,
+                "uniqueID": uid,
+                "orderPos": 0,
+                "matchesFilter": True,
+            },
+            "spec": {"key": self._key(), "status": "Released"},
+            "exec": {"key": self._key(), "status": "Planned", "verdict": "Undefined"},
+            "filters": [],
+        }
+
+    def _create_theme_children(self, parent: Dict, depth: int) -> None:
+        parent_numbering = parent["base"]["numbering"]
+        prefix = f"{parent_numbering}." if parent_numbering else ""
+        if depth > self.spec.tree_depth:
+            for index in range(1, self.spec.test_case_sets_per_theme + 1):
+                numbering = f"{prefix}{index}"
+                node = self._create_node(
+                    "TestCaseSetNode",
+                    numbering,
+                    parent["base"]["key"],
+                    f"Test Case Set {numbering}",
+                    f"itb-TC-{len(self.test_case_sets) + 1}",
+                )
+                self.nodes.append(node)
+                self.test_case_sets.append(self._create_test_case_set(node))
+            return
+        for index in range(1, self.spec.fan_out + 1):
+            numbering = f"{prefix}{index}"
+            node = self._create_node(
+                "TestThemeNode",
+                numbering,
+                parent["base"]["key"],
+                f"Test Theme {numbering}",
+                f"itb-TT-{len(self.nodes) + 1}",
+            )
+            self.nodes.append(node)
+            self._create_theme_children(node, depth + 1)
+
+    def _create_test_case_set(self, node: Dict) -> Dict:
+        base = node["base"]
+        test_cases = []
+        for index in range(1, self.spec.test_cases_per_set + 1):
+            test_case = self._create_test_case(f"{base['uniqueID']}-PC-{index}")
+            self.test_cases.append(test_case)
+            test_cases.append(
+                {
+                    "uniqueID": test_case["uniqueID"],
+                    "index": index,
+                    "spec": {"key": self._key()},
+                    "exec": {"key": test_case["exec"]["key"], "status": "Planned"},
+                }
+            )
+        return {
+            "key": base["key"],
+            "numbering": base["numbering"],
+            "uniqueID": base["uniqueID"],
+            "name": base["name"],
+            "spec": {"key": self._key(), "keywords": [{"key": "1", "name": "synthetic"}]},
+            "exec": {"key": node["exec"]["key"]},
+            "testCases": test_cases,
+        }
+
+    def _create_test_case(self, uid: str) -> Dict:
+        interactions = [
+            self._create_atomic_interaction("Setup", "Synthetic Open"),
+            self._create_atomic_interaction("Setup", "Synthetic Prepare"),
+        ]
+        interactions.extend(
+            self._create_interaction("TestStep", 1)
+            for _ in range(self.spec.interactions_per_test_case)
+        )
+        interactions.append(self._create_atomic_interaction("Teardown", "Synthetic Close"))
+        return {
+            "uniqueID": uid,
+            "spec": {"key": self._key()},
+            "exec": {
+                "key": self._key(),
+                "status": "Planned",
+                "actualDuration": self._random.randint(100, 60_000),
+            },
+            "interactions": interactions,
+            "parameters": [],
+        }
+
+    def _create_interaction(self, sequence_phase: str, depth: int) -> Dict:
+        if depth < self.spec.interaction_nesting and self._random.random() < 0.3:
+            return self._create_compound_interaction(sequence_phase, depth)
+        if self._random.random() < self.spec.fail_ratio:
+            return self._create_atomic_interaction(sequence_phase, FAILING_KEYWORD, FAILING_VALUE)
+        name = f"Synthetic Step {self._random.randint(1, self.spec.distinct_keywords)}"
+        return self._create_atomic_interaction(sequence_phase, name)
+
+    def _create_compound_interaction(self, sequence_phase: str, depth: int) -> Dict:
+        return {
+            "key": self._key(),
+            "uniqueID": f"itb-IA-{self._next_key}",
+            "name": f"Synthetic Sequence {depth}",
+            "interactionType": "Compound",
+            "path": "Synthetic.Sequences",
+            "spec": {"sequencePhase": sequence_phase},
+            "parameters": [],
+            "interactions": [
+                self._create_interaction(sequence_phase, depth + 1)
+                for _ in range(self.spec.interactions_per_compound)
+            ],
+        }
+
+    def _create_atomic_interaction(
+        self, sequence_phase: str, name: str, value: Optional[str] = None
+    ) -> Dict:
+        return {
+            "key": self._key(),
+            "uniqueID": f"itb-IA-{self._next_key}",
+            "name": name,
+            "interactionType": "Atomic",
+            "path": f"RF-Resource.{RESOURCE_NAME}.{name}",
+            "spec": {"sequencePhase": sequence_phase},
+            "parameters": [
+                {
+                    "key": self._key(),
+                    "name": f"param{index}",
+                    "value": value or f"value {index}",
+                    "useType": "CallByValue",
+                }
+                for index in range(1, self.spec.parameters_per_interaction + 1)
+            ],
+            "interactions": [],
+        }
+
+    def keyword_names(self) -> Iterator[str]:
+        yield from ["Synthetic Open", "Synthetic Prepare", "Synthetic Close"]
+        for index in range(1, self.spec.distinct_keywords + 1):
+            yield f"Synthetic Step {index}"
+
+
+def write_json(path: Path, content) -> None:
+    with path.open("w", encoding="utf-8") as json_file:
+        json.dump(content, json_file)
+
+
+def write_resource_file(resource_dir: Path, generator: SyntheticReportGenerator) -> Path:
+    resource_dir.mkdir(parents=True, exist_ok=True)
+    lines = ["*** Keywords ***"]
+    for name in generator.keyword_names():
+        lines.extend([name, "    [Arguments]    @{args}", "    Log Many    @{args}", ""])
+    lines.extend(
+        [
+            FAILING_KEYWORD,
+            "    [Arguments]    @{args}",
+            f"    Should Not Contain    ${{args}}    {FAILING_VALUE}",
+            "",
+        ]
+    )
+    resource_file = resource_dir / f"{RESOURCE_NAME}.resource"
+    resource_file.write_text("\n".join(lines), encoding="utf-8")
+    return resource_file
+
+
+def create_workspace(workspace: Path, spec: SyntheticReportSpec, with_results: bool) -> Dict:
+    """Creates report, resources and config in ``workspace``.
+
+    When ``with_results`` is set the report is converted with ``write`` and the
+    generated suites are executed to produce a matching ``output.xml``.
+    """
+    workspace.mkdir(parents=True, exist_ok=True)
+    generator = SyntheticReportGenerator(spec)
+    report_dir = generator.generate(workspace / REPORT_DIRECTORY)
+    write_resource_file(workspace / RESOURCE_DIRECTORY, generator)
+    config = {
+        "generationDirectory": (workspace / GENERATION_DIRECTORY).as_posix(),
+        "resourceDirectory": (workspace / RESOURCE_DIRECTORY).as_posix(),
+        "loggingConfiguration": {
+            "console": {"logLevel": "WARNING"},
+            "file": {"logLevel": "WARNING", "fileName": str(workspace / "tb2robot.log")},
+        },
+    }
+    write_json(workspace / CONFIG_FILE, config)
+    paths = {
+        "workspace": workspace,
+        "report": report_dir,
+        "config": workspace / CONFIG_FILE,
+        "generation": workspace / GENERATION_DIRECTORY,
+        "output": workspace / OUTPUT_XML,
+        "test_case_sets": len(generator.test_case_sets),
+        "test_cases": len(generator.test_cases),
+    }
+    if with_results:
+        create_robot_results(paths, config)
+    return paths
+
+
+def create_robot_results(paths: Dict, config: Dict) -> Path:
+    from robot import run  # noqa: PLC0415
+
+    from testbench2robotframework import testbench2robotframework  # noqa: PLC0415
+
+    testbench2robotframework(str(paths["report"]), config)
+    run(
+        str(paths["generation"]),
+        output=str(paths["output"]),
+        log="NONE",
+        report="NONE",
+        console="none",
+    )
+    return paths["output"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("workspace", type=str, help="Directory the synthetic data is written to.")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="small")
+    for name, default in asdict(SyntheticReportSpec()).items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(default), default=None)
+    parser.add_argument(
+        "--with-results",
+        action="store_true",
+        help="Generates robot files and executes them to create a matching output.xml.",
+    )
+    args = parser.parse_args()
+    spec_values = asdict(PRESETS[args.preset])
+    spec_values.update(
+        {name: value for name, value in vars(args).items() if name in spec_values and value is not None}
+    )
+    paths = create_workspace(
+        Path(args.workspace).resolve(), SyntheticReportSpec(**spec_values), args.with_results
+    )
+    print(  # noqa: T201
+        f"Created {paths['test_case_sets']} test case sets with "
+        f"{paths['test_cases']} test cases in '{paths['report']}'."
+    )
+
+
+if __name__ == "__main__":
+    main()
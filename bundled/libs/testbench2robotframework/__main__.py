@@ -20,6 +20,7 @@ from testbench2robotframework import __version__
 
 from .config import write_default_config
 from .json_reader import read_json
+from .profiling import profiler
 from .robotframework2testbench import robot2testbench
 from .testbench2robotframework import testbench2robotframework
 from .utils import arg_parser
@@ -36,10 +37,35 @@ def run():
     if not Path(args.config).is_file():
         write_default_config(args.config)
     configuration = read_json(args.config)
+    if args.profile:
+        profiler.enable(args.profile_output)
+    if args.memory_report:
+        profiler.enable_memory_report()
+    if args.max_memory:
+        profiler.set_memory_limit(args.max_memory)
     if args.subcommand == 'write':
-        testbench2robotframework(args.jsonReport[0], configuration)
+        testbench2robotframework(
+            args.jsonReport[0],
+            configuration,
+            args.select,
+            args.ordering_file,
+            args.processes,
+            args.snapshot,
+            args.index,
+            args.validate,
+        )
     elif args.subcommand == 'read':
-        robot2testbench(args.jsonReport[0], args.output, args.result, configuration)
+        robot2testbench(
+            args.jsonReport[0],
+            args.output,
+            args.result,
+            configuration,
+            args.jobs,
+            args.incremental,
+        )
+    profiler.stop()
+    if args.profile or args.memory_report:
+        print(profiler.report())  # noqa: T201
 
 
 def print_version():
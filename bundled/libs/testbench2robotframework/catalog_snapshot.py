@@ -0,0 +1,302 @@
+import json
+import mmap
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .json_reader import TEST_STRUCTURE_TREE_FILE, TestBenchJsonReader, read_json
+from .log import logger
+from .model import InteractionDetails, TestStructureElementType
+from .profiling import profiler
+
+SNAPSHOT_SUFFIX = ".tbsnap"
+SNAPSHOT_MAGIC = b"TB2RSNAP"
+SNAPSHOT_VERSION = 1
+HEADER = struct.Struct("<8sIBxxxI")
+SECTION = struct.Struct("<24sc7xQQ")
+SECTION_ALIGNMENT = 8
+NO_DOCUMENT = 0xFFFFFFFF
+
+NODE_TYPES = {
+    TestStructureElementType.RootNode.value: 0,
+    TestStructureElementType.TestThemeNode.value: 1,
+    TestStructureElementType.TestCaseSetNode.value: 2,
+}
+UID_KIND_NODE = 0
+UID_KIND_TEST_CASE_SET = 1
+UID_KIND_TEST_CASE = 2
+
+# Column name -> array typecode. All columns of a table have the same length.
+COLUMNS = {
+    "str.offsets": "Q",
+    "str.data": "B",
+    "doc.offsets": "Q",
+    "doc.data": "B",
+    "node.uid": "I",
+    "node.parent": "i",
+    "node.type": "B",
+    "node.doc": "I",
+    "set.uid": "I",
+    "set.node": "I",
+    "set.doc": "I",
+    "set.cases.start": "I",
+    "set.cases.count": "I",
+    "set.cases": "I",
+    "case.uid": "I",
+    "case.doc": "I",
+    "case.interactions": "I",
+    "uid.string": "I",
+    "uid.kind": "B",
+    "uid.row": "I",
+}
+
+
+class StringTable:
+    def __init__(self) -> None:
+        self.ids: Dict[str, int] = {}
+        self.offsets = array("Q", [0])
+        self.data = bytearray()
+
+    def add(self, value: str) -> int:
+        string_id = self.ids.get(value)
+        if string_id is None:
+            string_id = self.ids[value] = len(self.offsets) - 1
+            self.data += value.encode("utf-8")
+            self.offsets.append(len(self.data))
+        return string_id
+
+
+class DocumentStore:
+    """Stores JSON documents back to back, addressed by an offset array."""
+
+    def __init__(self) -> None:
+        self.offsets = array("Q", [0])
+        self.data = bytearray()
+
+    def add(self, document) -> int:
+        if document is None:
+            return NO_DOCUMENT
+        self.data += json.dumps(document, separators=(",", ":"), ensure_ascii=False).encode()
+        self.offsets.append(len(self.data))
+        return len(self.offsets) - 2
+
+
+def write_catalog_snapshot(json_dir: str, snapshot_path: str) -> None:
+    """Writes the test theme tree, test case sets and test cases of a report to one file.
+
+    The file consists of a section table followed by columns, each a plain little or
+    big endian array as written by :mod:`array`. Strings live in a string table, the
+    JSON documents of nodes, test case sets, test cases and their interactions are
+    stored minified in a document store. Both are addressed by offset arrays, so a
+    reader can ``mmap`` the file and decode single documents on demand.
+    """
+    strings = StringTable()
+    documents = DocumentStore()
+    columns = {name: array(typecode) for name, typecode in COLUMNS.items()}
+    uid_rows: Dict[str, Tuple[int, int]] = {}
+    tree = read_json(str(Path(json_dir, TEST_STRUCTURE_TREE_FILE))) or {}
+    nodes = [tree["root"], *tree.get("nodes", [])] if tree.get("root") else []
+    node_indices = {node.get("base", {}).get("key"): index for index, node in enumerate(nodes)}
+    for index, node in enumerate(nodes):
+        base = node.get("base", {})
+        uid = base.get("uniqueID", "")
+        columns["node.uid"].append(strings.add(uid))
+        columns["node.parent"].append(node_indices.get(base.get("parentKey"), -1))
+        columns["node.type"].append(NODE_TYPES.get(node.get("elementType"), 1))
+        columns["node.doc"].append(documents.add(node))
+        uid_rows.setdefault(uid, (UID_KIND_NODE, index))
+        if node.get("elementType") != TestStructureElementType.TestCaseSetNode.value:
+            continue
+        test_case_set = read_json(str(Path(json_dir, f"{uid}.json")))
+        set_row = len(columns["set.uid"])
+        columns["set.uid"].append(strings.add(uid))
+        columns["set.node"].append(index)
+        columns["set.doc"].append(documents.add(test_case_set))
+        columns["set.cases.start"].append(len(columns["set.cases"]))
+        test_case_uids = [
+            test_case.get("uniqueID") for test_case in (test_case_set or {}).get("testCases", [])
+        ]
+        columns["set.cases.count"].append(len(test_case_uids))
+        uid_rows[uid] = (UID_KIND_TEST_CASE_SET, set_row)
+        for test_case_uid in test_case_uids:
+            kind, case_row = uid_rows.get(test_case_uid, (None, None))
+            if kind != UID_KIND_TEST_CASE:
+                case_row = _add_test_case(json_dir, test_case_uid, strings, documents, columns)
+                uid_rows[test_case_uid] = (UID_KIND_TEST_CASE, case_row)
+            columns["set.cases"].append(case_row)
+    for uid in sorted(uid_rows):
+        kind, row = uid_rows[uid]
+        columns["uid.string"].append(strings.add(uid))
+        columns["uid.kind"].append(kind)
+        columns["uid.row"].append(row)
+    columns["str.offsets"], columns["str.data"] = strings.offsets, array("B", strings.data)
+    columns["doc.offsets"], columns["doc.data"] = documents.offsets, array("B", documents.data)
+    _write_columns(snapshot_path, columns)
+    logger.info(
+        f"Snapshot with {len(nodes)} nodes, {len(columns['set.uid'])} test case sets and "
+        f"{len(columns['case.uid'])} test cases written to '{snapshot_path}'."
+    )
+
+
+def _add_test_case(json_dir, uid, strings, documents, columns) -> int:
+    test_case = read_json(str(Path(json_dir, f"{uid}.json")))
+    interactions = test_case.pop("interactions", []) if test_case else None
+    columns["case.uid"].append(strings.add(uid))
+    columns["case.doc"].append(documents.add(test_case))
+    columns["case.interactions"].append(documents.add(interactions))
+    return len(columns["case.uid"]) - 1
+
+
+def _write_columns(snapshot_path: str, columns: Dict[str, array]) -> None:
+    byteorder = b"<" if sys.byteorder == "little" else b">"
+    offset = _align(HEADER.size + SECTION.size * len(columns))
+    sections = []
+    for name, column in columns.items():
+        length = len(column) * column.itemsize
+        sections.append(SECTION.pack(name.encode(), column.typecode.encode(), offset, length))
+        offset = _align(offset + length)
+    with Path(snapshot_path).open("wb") as snapshot:
+        snapshot.write(
+            HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, byteorder[0], len(columns))
+        )
+        snapshot.write(b"".join(sections))
+        for column in columns.values():
+            snapshot.write(b"\0" * (_align(snapshot.tell()) - snapshot.tell()))
+            column.tofile(snapshot)
+
+
+def _align(offset: int) -> int:
+    return -(-offset // SECTION_ALIGNMENT) * SECTION_ALIGNMENT
+
+
+class CatalogSnapshot:
+    """Read access to a memory-mapped catalog snapshot.
+
+    Columns are ``memoryview`` casts of the mapping, so opening a snapshot copies
+    nothing and processes mapping the same file share its pages.
+    """
+
+    def __init__(self, snapshot_path: str) -> None:
+        self.path = snapshot_path
+        with Path(snapshot_path).open("rb") as snapshot:
+            self._mmap = mmap.mmap(snapshot.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = memoryview(self._mmap)
+        magic, version, byteorder, section_count = HEADER.unpack_from(self._buffer)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            sys.exit(f"'{snapshot_path}' is not a TestBench2RobotFramework snapshot.")
+        if bytes([byteorder]) != (b"<" if sys.byteorder == "little" else b">"):
+            sys.exit(f"Snapshot '{snapshot_path}' was written on a different byte order.")
+        self.columns: Dict[str, memoryview] = {}
+        for index in range(section_count):
+            name, typecode, offset, length = SECTION.unpack_from(
+                self._buffer, HEADER.size + index * SECTION.size
+            )
+            self.columns[name.rstrip(b"\0").decode()] = self._buffer[
+                offset : offset + length
+            ].cast(typecode.decode())
+
+    def close(self) -> None:
+        for column in self.columns.values():
+            column.release()
+        self.columns.clear()
+        self._buffer.release()
+        self._mmap.close()
+
+    def get_string(self, string_id: int) -> str:
+        offsets = self.columns["str.offsets"]
+        return bytes(self.columns["str.data"][offsets[string_id] : offsets[string_id + 1]]).decode()
+
+    def get_document(self, document_id: int):
+        if document_id == NO_DOCUMENT:
+            return None
+        offsets = self.columns["doc.offsets"]
+        profiler.count("snapshot documents read")
+        return json.loads(
+            bytes(self.columns["doc.data"][offsets[document_id] : offsets[document_id + 1]])
+        )
+
+    def find(self, uid: str) -> Optional[Tuple[int, int]]:
+        """Binary searches the sorted uid column and returns ``(kind, row)``."""
+        uid_strings = self.columns["uid.string"]
+        low, high = 0, len(uid_strings)
+        while low < high:
+            middle = (low + high) // 2
+            if self.get_string(uid_strings[middle]) < uid:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(uid_strings) and self.get_string(uid_strings[low]) == uid:
+            return self.columns["uid.kind"][low], self.columns["uid.row"][low]
+        return None
+
+    def read_test_theme_tree(self) -> Optional[Dict]:
+        node_documents = self.columns["node.doc"]
+        if not len(node_documents):
+            return None
+        return {
+            "root": self.get_document(node_documents[0]),
+            "nodes": [self.get_document(document) for document in node_documents[1:]],
+        }
+
+    def read_document(self, uid: str) -> Optional[Dict]:
+        """Returns the JSON document of the test case set or test case ``uid``."""
+        found = self.find(uid)
+        if found is None:
+            return None
+        kind, row = found
+        if kind == UID_KIND_TEST_CASE_SET:
+            return self.get_document(self.columns["set.doc"][row])
+        if kind == UID_KIND_TEST_CASE:
+            test_case = self.get_document(self.columns["case.doc"][row])
+            if test_case is not None:
+                test_case["interactions"] = self.get_document(
+                    self.columns["case.interactions"][row]
+                )
+            return test_case
+        return None
+
+    def read_interactions(self, uid: str) -> List[Dict]:
+        found = self.find(uid)
+        if found is None or found[0] != UID_KIND_TEST_CASE:
+            return []
+        return self.get_document(self.columns["case.interactions"][found[1]]) or []
+
+    def get_test_case_uids(self, test_case_set_uid: str) -> List[str]:
+        found = self.find(test_case_set_uid)
+        if found is None or found[0] != UID_KIND_TEST_CASE_SET:
+            return []
+        start = self.columns["set.cases.start"][found[1]]
+        count = self.columns["set.cases.count"][found[1]]
+        case_uids = self.columns["case.uid"]
+        return [
+            self.get_string(case_uids[row]) for row in self.columns["set.cases"][start : start + count]
+        ]
+
+
+class SnapshotJsonReader(TestBenchJsonReader):
+    """TestBenchJsonReader that reads from a catalog snapshot instead of JSON files."""
+
+    def __init__(self, snapshot_path: str) -> None:
+        super().__init__(snapshot_path)
+        self.snapshot = CatalogSnapshot(snapshot_path)
+
+    def _read_model(self, filename: str, model):
+        if filename == TEST_STRUCTURE_TREE_FILE:
+            dictionary = self.snapshot.read_test_theme_tree()
+        else:
+            dictionary = self.snapshot.read_document(Path(filename).stem)
+        if dictionary is None:
+            logger.debug(f"Cannot find {filename} in snapshot {self.snapshot.path}.")
+            return None
+        return model.from_dict(dictionary)
+
+    def read_test_theme_dictionary(self) -> Optional[Dict]:
+        return self.snapshot.read_test_theme_tree()
+
+    def read_interactions(self, uid: str) -> List[InteractionDetails]:
+        return [
+            InteractionDetails.from_dict(interaction)
+            for interaction in self.snapshot.read_interactions(uid)
+        ]
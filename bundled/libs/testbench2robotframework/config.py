@@ -2,8 +2,11 @@
 from __future__ import annotations
 
 import json
-from dataclasses import dataclass
-from typing import Dict, List
+import os
+import re
+from dataclasses import dataclass, field
+from pathlib import Path, PurePath
+from typing import Dict, FrozenSet, List, Optional, Pattern, Tuple
 
 from .model import StrEnum
 
@@ -101,6 +104,64 @@ class LoggingConfig:
         )
 
 
+@dataclass
+class ReportCacheConfig:
+    enabled: bool
+    directory: str
+    maxSize: int
+
+    @classmethod
+    def from_dict(cls, dictionary):
+        return cls(
+            enabled=dictionary.get("enabled", False),
+            directory=dictionary.get("directory", ""),
+            maxSize=dictionary.get("maxSize", 512),
+        )
+
+
+@dataclass
+class KeywordHoistingConfig:
+    enabled: bool
+    minLength: int
+    minOccurrences: int
+
+    @classmethod
+    def from_dict(cls, dictionary):
+        return cls(
+            enabled=dictionary.get("enabled", False),
+            minLength=dictionary.get("minLength", 3),
+            minOccurrences=dictionary.get("minOccurrences", 2),
+        )
+
+
+class FsyncPolicy(StrEnum):
+    NEVER = "NEVER"
+    BATCH = "BATCH"
+    END = "END"
+
+
+@dataclass
+class ResultWriterConfig:
+    batchSize: int
+    fsync: FsyncPolicy
+
+    @classmethod
+    def from_dict(cls, dictionary):
+        return cls(
+            batchSize=dictionary.get("batchSize", 4),
+            fsync=FsyncPolicy(dictionary.get("fsync", "NEVER").upper()),
+        )
+
+
+@dataclass
+class IoEngineConfig:
+    maxInFlight: int
+
+    @classmethod
+    def from_dict(cls, dictionary):
+        return cls(maxInFlight=dictionary.get("maxInFlight", 8))
+
+
 class ReferenceBehaviour(StrEnum):
     ATTACHMENT = "ATTACHMENT"
     REFERENCE = "REFERENCE"
@@ -134,6 +195,12 @@ class Configuration:
     phasePattern: str
     referenceBehaviour: ReferenceBehaviour
     attachmentConflictBehaviour: AttachmentConflictBehaviour
+    maxKeywordCommentSize: int
+    maxTestCommentSize: int
+    reportCache: ReportCacheConfig
+    keywordHoisting: KeywordHoistingConfig
+    resultWriter: ResultWriterConfig
+    ioEngine: IoEngineConfig
 
     @classmethod
     def from_dict(cls, dictionary) -> Configuration:
@@ -170,9 +237,123 @@ class Configuration:
             attachmentConflictBehaviour=AttachmentConflictBehaviour(
                 dictionary.get("attachmentConflictBehaviour", "USE_EXISTING").upper()
             ),
+            maxKeywordCommentSize=dictionary.get("maxKeywordCommentSize", 0),
+            maxTestCommentSize=dictionary.get("maxTestCommentSize", 0),
+            reportCache=ReportCacheConfig.from_dict(dictionary.get("reportCache", {})),
+            keywordHoisting=KeywordHoistingConfig.from_dict(
+                dictionary.get("keywordHoisting", {})
+            ),
+            resultWriter=ResultWriterConfig.from_dict(dictionary.get("resultWriter", {})),
+            ioEngine=IoEngineConfig.from_dict(dictionary.get("ioEngine", {})),
         )
 
 
+RELATIVE_RESOURCE_INDICATOR = r"^{root}"
+RESOURCE_DIRECTORY_INDICATOR = r"^{resourceDirectory}"
+ROBOT_PATH_SEPARATOR = "/"
+
+
+@dataclass(frozen=True)
+class CompiledConfiguration:
+    """Configuration with all patterns compiled and all paths resolved once per run."""
+
+    raw: Configuration
+    root_path: Path
+    library_patterns: Tuple[Pattern[str], ...]
+    resource_patterns: Tuple[Pattern[str], ...]
+    library_roots: FrozenSet[str]
+    resource_roots: FrozenSet[str]
+    test_case_split_pattern: Optional[Pattern[str]]
+    generation_directory: Path
+    resolved_generation_directory: str
+    resource_directory: str
+    resolved_resource_directory: Optional[str]
+    library_mappings: Dict[str, str]
+    resource_mappings: Dict[str, str]
+    forced_libraries: Tuple[str, ...]
+    forced_resources: Tuple[str, ...]
+    forced_variables: Tuple[str, ...]
+    fully_qualified: bool
+    log_compound_interactions: bool
+    log_suite_numbering: bool
+    phase_pattern: str
+    clear_generation_directory: bool
+    create_output_zip: bool
+    keyword_hoisting: KeywordHoistingConfig
+    resource_import_cache: Dict[Tuple[PurePath, str], str] = field(
+        default_factory=dict, repr=False, compare=False
+    )
+
+    @classmethod
+    def from_configuration(cls, config: Configuration) -> CompiledConfiguration:
+        root_path = Path(os.curdir).absolute()
+        resource_directory = config.resourceDirectory
+        return cls(
+            raw=config,
+            root_path=root_path,
+            library_patterns=tuple(re.compile(pattern) for pattern in config.rfLibraryRegex),
+            resource_patterns=tuple(re.compile(pattern) for pattern in config.rfResourceRegex),
+            library_roots=frozenset(config.rfLibraryRoots),
+            resource_roots=frozenset(config.rfResourceRoots),
+            test_case_split_pattern=re.compile(config.testCaseSplitPathRegEx)
+            if config.testCaseSplitPathRegEx
+            else None,
+            generation_directory=resolve_generation_directory(
+                config.generationDirectory, root_path
+            ),
+            resolved_generation_directory=replace_root_indicator(
+                config.generationDirectory, root_path
+            ),
+            resource_directory=resource_directory,
+            resolved_resource_directory=replace_root_indicator(resource_directory, root_path)
+            if resource_directory and re.match(RELATIVE_RESOURCE_INDICATOR, resource_directory)
+            else None,
+            library_mappings=dict(config.subdivisionsMapping.libraries),
+            resource_mappings={
+                resource: resolve_resource_mapping(mapping, resource_directory, root_path)
+                for resource, mapping in config.subdivisionsMapping.resources.items()
+                if mapping
+            },
+            forced_libraries=tuple(config.forcedImport.libraries),
+            forced_resources=tuple(config.forcedImport.resources),
+            forced_variables=tuple(config.forcedImport.variables),
+            fully_qualified=bool(config.fullyQualified),
+            log_compound_interactions=config.logCompoundInteractions,
+            log_suite_numbering=config.logSuiteNumbering,
+            phase_pattern=config.phasePattern,
+            clear_generation_directory=config.clearGenerationDirectory,
+            create_output_zip=config.createOutputZip,
+            keyword_hoisting=config.keywordHoisting,
+        )
+
+
+def resolve_generation_directory(generation_directory: str, root_path: Path) -> Path:
+    if not generation_directory:
+        return root_path / "Generated"
+    return Path(
+        re.sub(
+            RELATIVE_RESOURCE_INDICATOR,
+            str(root_path).replace('\\', '\\\\'),
+            generation_directory,
+            flags=re.IGNORECASE,
+        )
+    )
+
+
+def replace_root_indicator(path: str, root_path: Path) -> str:
+    return re.sub(
+        RELATIVE_RESOURCE_INDICATOR,
+        str(root_path).replace('\\', ROBOT_PATH_SEPARATOR),
+        str(path),
+        flags=re.IGNORECASE,
+    ).replace('\\', ROBOT_PATH_SEPARATOR)
+
+
+def resolve_resource_mapping(mapping: str, resource_directory: str, root_path: Path) -> str:
+    mapping = re.sub(RESOURCE_DIRECTORY_INDICATOR, resource_directory, mapping)
+    return re.sub(RELATIVE_RESOURCE_INDICATOR, str(root_path).replace('\\', '/'), mapping)
+
+
 def write_default_config(config_file):
     with open(config_file, 'w', encoding='utf-8') as file:
         json.dump(
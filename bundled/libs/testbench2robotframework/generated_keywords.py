@@ -0,0 +1,4 @@
+SHARED_SETUP_PREFIX = "Setup-Shared-"
+SHARED_TEARDOWN_PREFIX = "Teardown-Shared-"
+HOISTED_KEYWORD_PREFIX = "Hoisted-"
+HOISTED_RESOURCE = "hoisted_keywords.resource"
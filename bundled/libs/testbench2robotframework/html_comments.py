@@ -0,0 +1,167 @@
+import html
+import sys
+from typing import Iterable, List
+
+BACKGROUND_COLOR = {
+    "PASS": "#04AF91",
+    "FAIL": "#ce3e01",
+    "ERROR": "#ce3e01",
+    "SKIP": "#F3E96A",
+    "WARN": "#D48627",
+    "INFO": "#ddd",
+}
+COLOR = {
+    "PASS": "#fff",
+    "FAIL": "#fff",
+    "ERROR": "#fff",
+    "SKIP": "#000",
+    "WARN": "#fff",
+    "INFO": "#000",
+}
+STATUS_STYLE_TEMPLATE = "style='background-color: {background}; color: {color};'".format
+STATUS_STYLES = {
+    status: STATUS_STYLE_TEMPLATE(background=BACKGROUND_COLOR[status], color=COLOR.get(status))
+    for status in BACKGROUND_COLOR
+}
+DEFAULT_STATUS_STYLE = STATUS_STYLE_TEMPLATE(background="#fff", color="#000")
+
+ROW_SEPARATOR = "</tr><tr>"
+KEYWORD_COMMENT_TEMPLATE = (
+    "<html>"
+    "<body>"
+    "<style>"
+    "td {{padding: 5px; border: none;}} "
+    "table {{font-family: monospace; border: none;}}"
+    "</style>"
+    "<pre>"
+    "Start Time:   {start_time}\n"
+    "End Time:     {end_time}\n"
+    "Elapsed Time: {elapsed_time}\n"
+    "</pre>"
+    "<table>"
+    "<tr>"
+    "{rows}"
+    "</tr>"
+    "</table>"
+    "</body>"
+    "</html>"
+).format
+MESSAGE_ROW_TEMPLATE = "<td {style}><b>{level}</b></td><td><pre>{message}</pre></td><td>{time}</td>".format
+TEST_COMMENT_TEMPLATE = "<html><body>{comments}</body></html>".format
+TEST_PHASE_COMMENT_TEMPLATE = (
+    "{phase_name}"
+    "<pre>"
+    "Start Time:   {start_time}\n"
+    "End Time:     {end_time}\n"
+    "Elapsed Time: {elapsed_time}\n"
+    "</pre>"
+    "Message: <p><pre>{message}</pre></p>\n"
+).format
+SUITE_COMMENT_TEMPLATE = (
+    "<html>"
+    "<head>"
+    "<style>"
+    "td {{padding: 5px; border: none; white-space: pre-wrap;}} "
+    "table {{font-family: monospace; border: none;}}"
+    "</style>"
+    "</head>"
+    "<body>"
+    "<pre>"
+    "Start Time:   {start_time}\n"
+    "End Time:     {end_time}\n"
+    "</pre>"
+    "<table>"
+    "<tr>"
+    "{rows}"
+    "</tr>"
+    "</table>"
+    "</body>"
+    "</html>"
+).format
+SUITE_ROW_TEMPLATE = (
+    "<td>{name}</td><td>{phase}</td><td {style}><b>{status}</b></td><td><pre>{message}</pre></td>"
+).format
+TRUNCATED_ROW_TEMPLATE = (
+    "<td colspan='3'><i>Further messages omitted after {count} messages "
+    "to stay within {budget} characters.</i></td>"
+).format
+TRUNCATED_TESTS_ROW_TEMPLATE = (
+    "<td colspan='4'><i>Further tests omitted after {count} tests "
+    "to stay within {budget} characters.</i></td>"
+).format
+TRUNCATED_PHASES_TEMPLATE = (
+    "<p><i>Further phases omitted to stay within {budget} characters.</i></p>"
+).format
+TRUNCATED_TEXT_TEMPLATE = "\n[{omitted} characters omitted]".format
+
+
+def render_status(status: str) -> str:
+    return STATUS_STYLES.get(status, DEFAULT_STATUS_STYLE)
+
+
+class BoundedHtmlBuilder:
+    """Collects HTML fragments until a size budget in characters is reached.
+
+    Fragments are consumed lazily, so the source of an iterable passed to
+    ``extend`` is not walked any further once the budget is exhausted.
+    A budget of ``0`` means unlimited.
+    """
+
+    def __init__(self, budget: int = 0, separator: str = "") -> None:
+        self.budget = budget or sys.maxsize
+        self.separator = separator
+        self.fragments: List[str] = []
+        self.size = 0
+        self.truncated = False
+
+    @property
+    def remaining(self) -> int:
+        return self.budget - self.size
+
+    def add(self, fragment: str) -> bool:
+        size = len(fragment) + (len(self.separator) if self.fragments else 0)
+        if size > self.remaining:
+            self.truncated = True
+            return False
+        self.fragments.append(fragment)
+        self.size += size
+        return True
+
+    def extend(self, fragments: Iterable[str]) -> "BoundedHtmlBuilder":
+        for fragment in fragments:
+            if not self.add(fragment):
+                break
+        return self
+
+    def build(self) -> str:
+        return self.separator.join(self.fragments)
+
+
+def truncate_text(text: str, limit: int) -> str:
+    """Cuts ``text`` to ``limit`` characters and notes how much was omitted."""
+    if not limit or len(text) <= limit:
+        return text
+    return f"{text[:limit]}{TRUNCATED_TEXT_TEMPLATE(omitted=len(text) - limit)}"
+
+
+def escape_within(text: str, limit: int) -> str:
+    """Escapes ``text`` and cuts it to ``limit`` characters like ``truncate_text``.
+
+    Escaping makes the text longer, so the cut is shortened until the escaped text
+    and the note about the omitted characters fit into ``limit``.
+    """
+    escaped = html.escape(truncate_text(text, limit))
+    cut = limit
+    while limit and len(escaped) > limit and cut > 1:
+        cut = max(cut - (len(escaped) - limit), 1)
+        escaped = html.escape(truncate_text(text, cut))
+    return escaped
+
+
+def render_message_rows(rows: Iterable[str], budget: int) -> str:
+    builder = BoundedHtmlBuilder(budget, ROW_SEPARATOR).extend(rows)
+    if builder.truncated:
+        builder.fragments.append(
+            TRUNCATED_ROW_TEMPLATE(count=len(builder.fragments), budget=budget)
+        )
+    return builder.build()
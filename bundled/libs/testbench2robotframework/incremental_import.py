@@ -0,0 +1,259 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from zipfile import ZIP_DEFLATED, ZipFile
+
+from robot.result import TestCase, TestSuite
+
+from .json_reader import TEST_STRUCTURE_TREE_FILE
+from .log import logger
+from .model import (
+    ProtocolTestCaseExecutionSummary,
+    ProtocolTestCaseSetExecutionSummary,
+    TestCaseDetails,
+    TestStructureTree,
+)
+
+FINGERPRINT_FILE_SUFFIX = ".fingerprints.json"
+RESULT_TREE_FILE_SUFFIX = ".results.json"
+PROTOCOL_FILE = "protocol.json"
+
+
+def get_test_fingerprint(test_chain: List[TestCase]) -> str:
+    """Hashes status, end time and message of all phases of a test case."""
+    fingerprint = hashlib.blake2b(digest_size=16)
+    for test in test_chain:
+        fingerprint.update(f"{test.name}\0{test.status}\0{test.endtime}\0".encode())
+        fingerprint.update(hashlib.blake2b(test.message.encode(), digest_size=16).digest())
+    return fingerprint.hexdigest()
+
+
+def suite_to_dict(suite: TestSuite) -> Dict:
+    """Returns the suite tree with the test results but without keyword bodies."""
+    return {
+        "name": suite.name,
+        "source": str(suite.source) if suite.source else None,
+        "metadata": dict(suite.metadata),
+        "start_time": _format_time(suite.start_time),
+        "elapsed_time": suite.elapsed_time.total_seconds(),
+        "tests": [
+            {
+                "name": test.name,
+                "status": test.status,
+                "message": test.message,
+                "start_time": _format_time(test.start_time),
+                "elapsed_time": test.elapsed_time.total_seconds(),
+            }
+            for test in suite.tests
+        ],
+        "suites": [suite_to_dict(child) for child in suite.suites],
+    }
+
+
+def suite_from_dict(dictionary: Dict) -> TestSuite:
+    suite = TestSuite(
+        name=dictionary["name"],
+        source=dictionary["source"],
+        metadata=dictionary["metadata"],
+        start_time=_parse_time(dictionary["start_time"]),
+        elapsed_time=dictionary["elapsed_time"],
+    )
+    for test in dictionary["tests"]:
+        suite.tests.create(
+            name=test["name"],
+            status=test["status"],
+            message=test["message"],
+            start_time=_parse_time(test["start_time"]),
+            elapsed_time=test["elapsed_time"],
+        )
+    suite.suites = [suite_from_dict(child) for child in dictionary["suites"]]
+    return suite
+
+
+def _format_time(timestamp: Optional[datetime]) -> Optional[str]:
+    return timestamp.isoformat() if timestamp else None
+
+
+def _parse_time(timestamp: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(timestamp) if timestamp else None
+
+
+class PreviousResult:
+    """Read access to the JSON files of a previous import, stored as directory or ZIP."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._zip = ZipFile(path) if path.is_file() else None
+
+    def read_json(self, filename: str) -> Optional[Dict]:
+        try:
+            if self._zip is not None:
+                return json.loads(self._zip.read(filename))
+            with Path(self.path, filename).open(encoding="utf8") as json_file:
+                return json.load(json_file)
+        except (KeyError, OSError, ValueError):
+            return None
+
+    def close(self) -> None:
+        if self._zip is not None:
+            self._zip.close()
+
+
+class IncrementalImport:
+    """Keeps the per-test fingerprints of the previous import of a result.
+
+    Tests whose fingerprint did not change are not mapped again. Their protocol
+    entries, the test case set entries of unchanged sets and all results that are
+    not part of the current output.xml are taken over from the previous result.
+
+    The suite tree of the previous import is kept without keyword bodies, so that
+    the current output.xml can be merged into it like into a first output.xml.
+    Test case sets with changed tests are then written from all of their tests.
+    """
+
+    def __init__(
+        self,
+        fingerprint_file: Path,
+        result_tree_file: Path,
+        previous_result: Optional[PreviousResult],
+    ) -> None:
+        self.fingerprint_file = fingerprint_file
+        self.result_tree_file = result_tree_file
+        self.previous_result = previous_result
+        self.fingerprints: Dict[str, str] = {}
+        self.previous_fingerprints: Dict[str, str] = {}
+        self.previous_protocol: Dict[str, ProtocolTestCaseSetExecutionSummary] = {}
+        self.previous_test_protocols: Dict[str, ProtocolTestCaseExecutionSummary] = {}
+        self.unchanged_tests = 0
+        if previous_result is None:
+            return
+        if fingerprint_file.exists():
+            with fingerprint_file.open(encoding="utf8") as fingerprints:
+                self.previous_fingerprints = json.load(fingerprints)
+        for test_case_set in previous_result.read_json(PROTOCOL_FILE) or []:
+            protocol = ProtocolTestCaseSetExecutionSummary.from_dict(test_case_set)
+            self.previous_protocol[protocol.testCaseSetKey] = protocol
+        self.previous_test_protocols = {
+            test_case.uniqueID: test_case
+            for test_case_set in self.previous_protocol.values()
+            for test_case in test_case_set.testCases
+        }
+
+    @classmethod
+    def open(cls, json_result_path: str, create_zip: bool) -> "IncrementalImport":
+        result_path = Path(f"{json_result_path}.zip" if create_zip else json_result_path)
+        fingerprint_file = Path(f"{json_result_path}{FINGERPRINT_FILE_SUFFIX}")
+        result_tree_file = Path(f"{json_result_path}{RESULT_TREE_FILE_SUFFIX}")
+        if not all(path.exists() for path in (result_path, fingerprint_file, result_tree_file)):
+            logger.info("No previous import found, all results are imported.")
+            return cls(fingerprint_file, result_tree_file, None)
+        return cls(fingerprint_file, result_tree_file, PreviousResult(result_path))
+
+    @property
+    def has_previous_result(self) -> bool:
+        return self.previous_result is not None
+
+    def read_previous_suite(self) -> Optional[TestSuite]:
+        if self.previous_result is None:
+            return None
+        with self.result_tree_file.open(encoding="utf8") as result_tree:
+            return suite_from_dict(json.load(result_tree))
+
+    def is_unchanged(self, test_uid: str, test_chain: List[TestCase]) -> bool:
+        fingerprint = get_test_fingerprint(test_chain)
+        self.fingerprints[test_uid] = fingerprint
+        unchanged = (
+            self.previous_result is not None
+            and self.previous_fingerprints.get(test_uid) == fingerprint
+            and test_uid in self.previous_test_protocols
+        )
+        self.unchanged_tests += unchanged
+        return unchanged
+
+    def get_previous_test_protocol(self, test_uid: str) -> ProtocolTestCaseExecutionSummary:
+        return self.previous_test_protocols[test_uid]
+
+    def get_previous_test_case_set_protocol(
+        self, test_case_set_key: str
+    ) -> Optional[ProtocolTestCaseSetExecutionSummary]:
+        return self.previous_protocol.get(test_case_set_key)
+
+    def read_previous_test_case(self, test_uid: str) -> Optional[TestCaseDetails]:
+        if self.previous_result is None:
+            return None
+        test_case = self.previous_result.read_json(f"{test_uid}.json")
+        return TestCaseDetails.from_dict(test_case) if test_case else None
+
+    def read_previous_test_theme_tree(self) -> Optional[TestStructureTree]:
+        if self.previous_result is None:
+            return None
+        test_theme_tree = self.previous_result.read_json(TEST_STRUCTURE_TREE_FILE)
+        return TestStructureTree.from_dict(test_theme_tree) if test_theme_tree else None
+
+    def merge_test_protocols(
+        self, test_case_set_key: str, test_cases: List[ProtocolTestCaseExecutionSummary]
+    ) -> List[ProtocolTestCaseExecutionSummary]:
+        """Adds the previous entries of tests that are not part of the current result."""
+        previous = self.previous_protocol.get(test_case_set_key)
+        if previous is None:
+            return test_cases
+        current = {test_case.uniqueID: test_case for test_case in test_cases}
+        merged = [current.pop(test_case.uniqueID, test_case) for test_case in previous.testCases]
+        merged.extend(current.values())
+        return merged
+
+    def merge_protocol(
+        self, test_case_sets: List[ProtocolTestCaseSetExecutionSummary]
+    ) -> List[ProtocolTestCaseSetExecutionSummary]:
+        """Adds the previous entries of test case sets that are not part of the current result."""
+        if not self.previous_protocol:
+            return test_case_sets
+        current = {test_case_set.testCaseSetKey: test_case_set for test_case_set in test_case_sets}
+        merged = [current.pop(key, previous) for key, previous in self.previous_protocol.items()]
+        merged.extend(current.values())
+        return merged
+
+    def save(self, suite: TestSuite) -> None:
+        fingerprints = {**self.previous_fingerprints, **self.fingerprints}
+        with self.fingerprint_file.open("w", encoding="utf8") as fingerprint_file:
+            json.dump(fingerprints, fingerprint_file)
+        with self.result_tree_file.open("w", encoding="utf8") as result_tree_file:
+            json.dump(suite_to_dict(suite), result_tree_file)
+        logger.info(
+            f"Incremental import: {len(self.fingerprints) - self.unchanged_tests} of "
+            f"{len(self.fingerprints)} test results changed."
+        )
+
+    def close(self) -> None:
+        if self.previous_result is not None:
+            self.previous_result.close()
+
+
+def patch_result_zip(zip_path: Path, result_dir: Path, changed_files: Iterable[Path]) -> None:
+    """Writes ``changed_files`` into an existing result ZIP.
+
+    Files that are not yet part of the archive are appended to it. If existing
+    entries change, the unchanged entries and the changed files are written to a
+    new archive that then replaces the old one.
+    """
+    changed: Dict[str, Path] = {
+        Path(path).relative_to(result_dir).as_posix(): Path(path) for path in changed_files
+    }
+    with ZipFile(zip_path) as result_zip:
+        replaces_entries = not changed.keys().isdisjoint(result_zip.namelist())
+    if not replaces_entries:
+        with ZipFile(zip_path, "a", ZIP_DEFLATED) as result_zip:
+            for name, path in changed.items():
+                result_zip.write(path, name)
+        return
+    patched_path = zip_path.with_name(f"{zip_path.name}.tmp")
+    with ZipFile(zip_path) as source, ZipFile(patched_path, "w", ZIP_DEFLATED) as target:
+        for info in source.infolist():
+            if info.filename not in changed:
+                target.writestr(info, source.read(info))
+        for name, path in changed.items():
+            target.write(path, name)
+    os.replace(patched_path, zip_path)
@@ -0,0 +1,109 @@
+import shutil
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Deque, Dict, Iterable, Optional
+
+from .config import IoEngineConfig
+from .profiling import profiler
+
+
+def write_text_file(filepath: Path, content: str) -> None:
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+    with filepath.open("w", encoding="UTF-8") as output_file:
+        output_file.write(content)
+
+
+class IoEngine:
+    """Runs blocking file operations in a thread pool, overlapping them with decoding
+    and rendering in the calling thread.
+
+    Reads announced with :meth:`prefetch` are started ahead of time and returned in any
+    order by :meth:`read_bytes`. Writes and copies return immediately and are awaited
+    by :meth:`wait`. At most ``max_in_flight`` reads and as many writes are pending at
+    a time, which also bounds the memory held by prefetched and unwritten files. With
+    ``max_in_flight`` 0 every operation runs synchronously.
+    """
+
+    def __init__(self, max_in_flight: int) -> None:
+        self.max_in_flight = max(max_in_flight, 0)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        if self.max_in_flight:
+            self._executor = ThreadPoolExecutor(
+                self.max_in_flight, thread_name_prefix="tb2robot-io"
+            )
+        self._queued_reads: Deque[Path] = deque()
+        self._reads: Dict[Path, Future] = {}
+        self._writes: Dict[Path, Future] = {}
+
+    @classmethod
+    def from_config(cls, config: IoEngineConfig) -> "IoEngine":
+        return cls(config.maxInFlight)
+
+    def prefetch(self, filepaths: Iterable[Path]) -> None:
+        if self._executor is None:
+            return
+        self._queued_reads.extend(filepaths)
+        self._fill_read_window()
+
+    def _fill_read_window(self) -> None:
+        while self._queued_reads and len(self._reads) < self.max_in_flight:
+            filepath = self._queued_reads.popleft()
+            if filepath not in self._reads:
+                self._reads[filepath] = self._executor.submit(filepath.read_bytes)
+
+    def read_bytes(self, filepath: Path) -> bytes:
+        """Returns the content of ``filepath``, raising the errors of ``Path.read_bytes``."""
+        future = self._reads.pop(filepath, None)
+        if future is None:
+            return filepath.read_bytes()
+        self._fill_read_window()
+        if not future.done():
+            profiler.count("io reads waited for")
+        return future.result()
+
+    def write_text(self, filepath: Path, content: str) -> None:
+        self._submit_write(filepath, write_text_file, filepath, content)
+
+    def copy_file(self, source: Path, destination: Path) -> None:
+        self._submit_write(
+            destination, shutil.copyfile, source, destination, follow_symlinks=True
+        )
+
+    def run_write(self, filepath: Path, operation: Callable, *args) -> None:
+        """Runs an arbitrary write ``operation`` producing ``filepath``."""
+        self._submit_write(filepath, operation, *args)
+
+    def _submit_write(self, filepath: Path, operation: Callable, *args, **kwargs) -> None:
+        if self._executor is None:
+            operation(*args, **kwargs)
+            return
+        previous = self._writes.pop(filepath, None)
+        if previous is not None:
+            previous.result()
+        while len(self._writes) >= self.max_in_flight:
+            oldest = next(iter(self._writes))
+            self._writes.pop(oldest).result()
+        self._writes[filepath] = self._executor.submit(operation, *args, **kwargs)
+
+    def is_pending(self, filepath: Path) -> bool:
+        """Whether a write of ``filepath`` was submitted but not yet awaited."""
+        return filepath in self._writes
+
+    def wait(self) -> None:
+        """Waits for all submitted writes and raises the first error of any of them."""
+        with profiler.phase("wait for io"):
+            writes = list(self._writes.values())
+            self._writes.clear()
+            for future in writes:
+                future.result()
+
+    def close(self) -> None:
+        self.wait()
+        for future in self._reads.values():
+            future.cancel()
+        self._reads.clear()
+        self._queued_reads.clear()
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
@@ -1,10 +1,12 @@
 import json
+import os
 import sys
 from dataclasses import dataclass
 from json import JSONDecodeError
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional
 
+from .io_engine import IoEngine
 from .log import logger
 from .model import (
     TestCaseDetails,
@@ -12,6 +14,10 @@ from .model import (
     TestStructureElementType,
     TestStructureTree,
 )
+from .profiling import profiler
+from .report_cache import ReportCache
+from .selection import Selection
+from .tree_arrays import ArrayTree
 
 TEST_STRUCTURE_TREE_FILE = "cycle_structure.json"
 
@@ -31,9 +37,18 @@ class TestCaseSet:
 
 
 class TestBenchJsonReader:
-    def __init__(self, json_dir):
+    def __init__(
+        self,
+        json_dir,
+        cache: Optional[ReportCache] = None,
+        index=None,
+        io_engine: Optional[IoEngine] = None,
+    ):
         self.json_dir = json_dir
-        self._test_theme_tree: Optional[TestStructureTree] = None
+        self.cache = cache
+        self.index = index
+        self.io_engine = io_engine
+        self._tree_arrays: Optional[ArrayTree] = None
         self._test_case_sets: Dict[str, TestCaseSetDetails] = {}
         self._test_cases: Dict[str, TestCaseDetails] = {}
         if not json_dir:
@@ -41,19 +56,22 @@ class TestBenchJsonReader:
             sys.exit()
 
     @property
-    def test_theme_tree(self) -> TestStructureTree:
-        if not self._test_theme_tree:
+    def tree_arrays(self) -> ArrayTree:
+        if self._tree_arrays is None:
             test_theme_path = Path(self.json_dir) / TEST_STRUCTURE_TREE_FILE
             logger.debug(f"Loading TestThemeTree from {test_theme_path}")
-            test_structure_tree = read_json(str(test_theme_path))
-            self._test_theme_tree = TestStructureTree.from_dict(test_structure_tree)
-            logger.info(f"{len(self._test_theme_tree.nodes)} nodes from TestThemeTree loaded.")
-        return self._test_theme_tree
+            test_theme_tree = self.read_test_theme_dictionary() or {}
+            with profiler.phase("analyze tree"):
+                self._tree_arrays = ArrayTree.from_dict(test_theme_tree)
+            logger.info(f"{len(self._tree_arrays) - 1} nodes from TestThemeTree loaded.")
+        return self._tree_arrays
 
     @property
     def test_case_sets(self) -> Dict[str, TestCaseSetDetails]:
         if not self._test_case_sets:
-            for tcs_uid in self.get_test_case_set_uids():
+            tcs_uids = self.get_test_case_set_uids()
+            self.prefetch(tcs_uids)
+            for tcs_uid in tcs_uids:
                 test_case_set = self.read_test_case_set(tcs_uid)
                 if test_case_set is not None:
                     self._test_case_sets[tcs_uid] = test_case_set
@@ -72,6 +90,7 @@ class TestBenchJsonReader:
         return self._test_cases
 
     def _read_test_cases(self, tc_uids):
+        self.prefetch(tc_uids)
         for tc_uid in tc_uids:
             test_case = self.read_test_case(tc_uid)
             if test_case is not None:
@@ -87,14 +106,44 @@ class TestBenchJsonReader:
             tcs_catalog[tcs_uid] = TestCaseSet(tcs, tc_catalog)
         return tcs_catalog
 
+    def get_selected_test_case_set_catalog(self, selection: Selection) -> Dict[str, TestCaseSet]:
+        """Reads only the test case sets and test cases below the selected subtrees.
+
+        With a report index, the selection is resolved by the index, so test cases
+        that do not match the keyword and tag filters are not opened either.
+        """
+        tcs_catalog: Dict[str, TestCaseSet] = {}
+        if self.index is not None:
+            tcs_uids = self.index.select_test_case_sets(selection)
+        else:
+            tcs_uids = selection.select_test_case_sets(self.tree_arrays)
+        self.prefetch(tcs_uids)
+        for tcs_uid in tcs_uids:
+            tcs = self.read_test_case_set(tcs_uid)
+            if tcs is None:
+                logger.debug(f"TestCaseSetDetails {tcs_uid} not found.")
+                continue
+            self._test_case_sets[tcs_uid] = tcs
+            tc_catalog: Dict[str, TestCaseDetails] = {}
+            if self.index is not None:
+                tc_uids = self.index.select_test_cases(selection, tcs_uid)
+            else:
+                tc_uids = self.get_test_case_uids(tcs_uid)
+            self.prefetch(tc_uids)
+            for tc_uid in tc_uids:
+                test_case = self.read_test_case(tc_uid)
+                if test_case is not None and selection.selects_test_case(test_case):
+                    self._test_cases[tc_uid] = tc_catalog[tc_uid] = test_case
+            if tc_catalog or not selection.filters_test_cases:
+                tcs_catalog[tcs_uid] = TestCaseSet(tcs, tc_catalog)
+        logger.info(
+            f"{len(tcs_catalog)} TestCaseSetDetails with "
+            f"{sum(len(tcs.test_cases) for tcs in tcs_catalog.values())} test cases selected."
+        )
+        return tcs_catalog
+
     def get_test_case_set_uids(self) -> List[str]:
-        nodes = [self.test_theme_tree.root]
-        nodes.extend(self.test_theme_tree.nodes)
-        return [
-            tse.base.uniqueID
-            for tse in nodes
-            if tse.elementType == TestStructureElementType.TestCaseSetNode
-        ]
+        return self.tree_arrays.uids_of_type(TestStructureElementType.TestCaseSetNode)
 
     def get_test_case_uids(self, test_case_set_uid: str) -> List[str]:
         if not self._test_case_sets:
@@ -107,28 +156,81 @@ class TestBenchJsonReader:
         return [tc.uniqueID for tc in test_case_set.testCases]
 
     def read_test_case_set(self, uid) -> Optional[TestCaseSetDetails]:
-        tcs_dict = read_json(str(Path(self.json_dir, f"{uid}.json")))
-        if tcs_dict is None:
-            return None
-        return TestCaseSetDetails.from_dict(tcs_dict)
+        return self._read_model(f"{uid}.json", TestCaseSetDetails)
 
     def read_test_case(self, uid) -> Optional[TestCaseDetails]:
-        tc_dict = read_json(str(Path(self.json_dir, f"{uid}.json")))
-        if tc_dict is None:
-            return None
-            # return None  # TODO: wenn nicht da dann Fehler?
-        return TestCaseDetails.from_dict(tc_dict)
+        return self._read_model(f"{uid}.json", TestCaseDetails)
 
     def read_test_theme_tree(self) -> Optional[TestStructureTree]:
-        test_structure_tree = read_json(str(Path(self.json_dir, TEST_STRUCTURE_TREE_FILE)))
-        if test_structure_tree is None:
+        return self._read_model(TEST_STRUCTURE_TREE_FILE, TestStructureTree)
+
+    def read_test_theme_dictionary(self) -> Optional[Dict]:
+        """Reads ``cycle_structure.json`` without decoding it into model objects.
+
+        Bypasses the report cache, which stores decoded models under the content hash.
+        """
+        filepath = Path(self.json_dir, TEST_STRUCTURE_TREE_FILE)
+        if self.io_engine is None:
+            return read_json(str(filepath))
+        try:
+            content = self.io_engine.read_bytes(filepath)
+        except FileNotFoundError:
+            logger.debug(f"Cannot find json file {filepath}:")
+            return None
+        profiler.checkpoint("read report")
+        return decode_json(filepath, content)
+
+    def prefetch(self, uids: Iterable[str]) -> None:
+        """Starts reading the JSON files of the given uids in the background.
+
+        Only used without a report cache, which avoids reading the files at all.
+        """
+        if self.io_engine is not None and self.cache is None:
+            self.io_engine.prefetch(Path(self.json_dir, f"{uid}.json") for uid in uids)
+
+    def _read_model(self, filename: str, model):
+        filepath = Path(self.json_dir, filename)
+        if self.cache is not None:
+            return self.cache.load(filepath, lambda content: decode_model(filepath, content, model))
+        if self.io_engine is not None:
+            try:
+                content = self.io_engine.read_bytes(filepath)
+            except FileNotFoundError:
+                logger.debug(f"Cannot find json file {filepath}:")
+                return None
+            profiler.checkpoint("read report")
+            return decode_model(filepath, content, model)
+        dictionary = read_json(str(filepath))
+        if dictionary is None:
             return None
-        return TestStructureTree.from_dict(test_structure_tree)
+        return model.from_dict(dictionary)
+
+
+def decode_model(filepath: Path, content: bytes, model):
+    dictionary = decode_json(filepath, content)
+    if dictionary is None:
+        return None
+    return model.from_dict(dictionary)
+
+
+def decode_json(filepath: Path, content: bytes):
+    profiler.count("files read")
+    profiler.count("bytes read", len(content))
+    try:
+        return json.loads(content)
+    except JSONDecodeError as error:
+        logger.warning(f"Cannot decode json file {filepath}:")
+        logger.warning(error)
+        return None
 
 
 def read_json(filepath: str):  # ToDo Configure to run silent or raise
     try:
+        profiler.checkpoint("read report")
         with Path(filepath).open(encoding='utf-8') as json_file:
+            if profiler.enabled:
+                profiler.count("files read")
+                profiler.count("bytes read", os.fstat(json_file.fileno()).st_size)
             return json.load(json_file)
     except FileNotFoundError:
         logger.debug(f"Cannot find json file {filepath}:")
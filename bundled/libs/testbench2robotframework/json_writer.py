@@ -1,9 +1,11 @@
 import json
+import os
 from dataclasses import asdict
 from pathlib import Path
-from typing import List, Union
+from typing import Dict, List, Optional, Set, Union
 
-from .config import Configuration
+from .config import Configuration, FsyncPolicy, ResultWriterConfig
+from .io_engine import IoEngine
 from .log import logger
 from .model import (
     ProtocolTestCaseSetExecutionSummary,
@@ -11,29 +13,143 @@ from .model import (
     TestCaseSetDetails,
     TestStructureTree,
 )
+from .profiling import profiler
 
 TEST_STRUCTURE_TREE_FILE = "cycle_structure"
+MEBIBYTE = 1024 * 1024
+
+
+def replace_file(filepath: Path, content: bytes, sync: bool = False) -> None:
+    """Writes ``content`` to a temporary file next to ``filepath`` and renames it.
+
+    Readers and crashes never leave a partially written ``filepath`` behind.
+    """
+    temporary_path = filepath.with_name(f".{filepath.name}.{os.getpid()}.tmp")
+    with temporary_path.open("wb") as output_file:
+        output_file.write(content)
+        if sync:
+            output_file.flush()
+            os.fsync(output_file.fileno())
+    os.replace(temporary_path, filepath)
+
+
+def fsync_path(path: Path) -> None:
+    """Syncs a file or directory. Directories cannot be opened on every platform."""
+    try:
+        file_descriptor = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(file_descriptor)
+    except OSError:
+        pass
+    finally:
+        os.close(file_descriptor)
+
+
+class GroupCommitWriter:
+    """Writes result files in batches, each file atomically.
+
+    Serialized documents are kept in memory until ``batch_size`` bytes are pending
+    and then written together, every file to a temporary file that replaces the
+    target. With ``FsyncPolicy.BATCH`` the files and their directories are synced
+    after every batch, with ``FsyncPolicy.END`` once on :meth:`close`. Given an
+    :class:`IoEngine`, the files of a batch are written concurrently.
+    """
+
+    def __init__(
+        self,
+        batch_size: int,
+        fsync: FsyncPolicy = FsyncPolicy.NEVER,
+        io_engine: Optional[IoEngine] = None,
+    ) -> None:
+        self.batch_size = batch_size
+        self.fsync = fsync
+        self.io_engine = io_engine or IoEngine(0)
+        self.pending: Dict[Path, bytes] = {}
+        self.pending_size = 0
+        self.unsynced: Set[Path] = set()
+
+    @classmethod
+    def from_config(
+        cls, config: ResultWriterConfig, io_engine: Optional[IoEngine] = None
+    ) -> "GroupCommitWriter":
+        return cls(config.batchSize * MEBIBYTE, config.fsync, io_engine)
+
+    def write(self, filepath: Path, content: bytes) -> None:
+        previous = self.pending.pop(filepath, None)
+        if previous is not None:
+            self.pending_size -= len(previous)
+        self.pending[filepath] = content
+        self.pending_size += len(content)
+        if self.pending_size >= self.batch_size:
+            self.flush()
+
+    def flush_if_pending(self, filepath: Path) -> None:
+        """Writes the current batch if it contains ``filepath``, before it is read again."""
+        if filepath in self.pending:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.pending:
+            return
+        sync = self.fsync == FsyncPolicy.BATCH
+        with profiler.phase("commit result files"):
+            for filepath, content in self.pending.items():
+                self.io_engine.run_write(filepath, replace_file, filepath, content, sync)
+            self.io_engine.wait()
+            directories = {filepath.parent for filepath in self.pending}
+            if sync:
+                for directory in directories:
+                    fsync_path(directory)
+            elif self.fsync == FsyncPolicy.END:
+                self.unsynced.update(self.pending)
+                self.unsynced.update(directories)
+        profiler.count("result batches written")
+        self.pending.clear()
+        self.pending_size = 0
+
+    def close(self) -> None:
+        self.flush()
+        with profiler.phase("commit result files"):
+            for path in sorted(self.unsynced, key=lambda path: path.is_dir()):
+                fsync_path(path)
+        self.unsynced.clear()
+
+
+def write_json_file(
+    filepath: Path, document, writer: Optional[GroupCommitWriter] = None
+) -> Path:
+    content = json.dumps(document).encode("utf8")
+    if writer is None:
+        replace_file(filepath, content)
+    else:
+        writer.write(filepath, content)
+    return filepath
 
 
 def write_test_structure_element(
     json_dir: str,
     test_structure_element: Union[TestStructureTree, TestCaseSetDetails, TestCaseDetails],
-) -> None:
+    writer: Optional[GroupCommitWriter] = None,
+) -> Path:
     if isinstance(test_structure_element, TestStructureTree):
         filepath = Path(json_dir) / Path(TEST_STRUCTURE_TREE_FILE + ".json")
     else:
         filepath = Path(json_dir) / Path(f"{test_structure_element.uniqueID}.json")
-    with Path(filepath).open('w+', encoding="utf8") as output_file:
-        json.dump(asdict(test_structure_element), output_file)
+    with profiler.phase("write result json"):
+        write_json_file(filepath, asdict(test_structure_element), writer)
+    profiler.count("result files written")
+    return filepath
 
 
 def write_main_protocol(
-    json_dir: str, main_protocol: List[ProtocolTestCaseSetExecutionSummary]
-) -> None:
+    json_dir: str,
+    main_protocol: List[ProtocolTestCaseSetExecutionSummary],
+    writer: Optional[GroupCommitWriter] = None,
+) -> Path:
     protocol = [asdict(tcs) for tcs in main_protocol]
-    filepath = Path(json_dir) / Path("protocol.json")
-    with Path(filepath).open('w+', encoding="utf8") as output_file:
-        json.dump(protocol, output_file)
+    return write_json_file(Path(json_dir) / Path("protocol.json"), protocol, writer)
 
 
 def write_default_config(config_file):
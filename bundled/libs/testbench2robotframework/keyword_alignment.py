@@ -0,0 +1,109 @@
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+# The characters matched by ``[\s_]``: ``\s`` matches exactly the characters for which
+# ``str.isspace`` is true.
+WHITESPACE_AND_UNDERSCORE_TABLE = str.maketrans(
+    "",
+    "",
+    "\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f \x85\xa0\u1680\u2000\u2001\u2002\u2003\u2004"
+    "\u2005\u2006\u2007\u2008\u2009\u200a\u2028\u2029\u202f\u205f\u3000_",
+)
+
+
+@lru_cache(maxsize=None)
+def normalize_keyword_name(keyword_name: str) -> str:
+    """Lower cases ``keyword_name`` and removes whitespace and underscores."""
+    return keyword_name.lower().translate(WHITESPACE_AND_UNDERSCORE_TABLE)
+
+
+def get_keyword_name_variants(keyword_name: str) -> Tuple[str, ...]:
+    """Returns the normalized full name and, if qualified, the normalized short name."""
+    full_name = normalize_keyword_name(keyword_name)
+    short_name = normalize_keyword_name(keyword_name.split(".")[-1])
+    return (full_name,) if short_name == full_name else (full_name, short_name)
+
+
+@dataclass
+class Alignment:
+    """Result of aligning interactions with the keywords that executed them.
+
+    ``keyword_indices[i]`` is the index of the keyword that executed interaction ``i``
+    or ``None`` if no keyword could be assigned.
+    """
+
+    keyword_indices: List[Optional[int]]
+    extra_keywords: List[int] = field(default_factory=list)
+    missing_interactions: List[int] = field(default_factory=list)
+
+    @property
+    def is_exact(self) -> bool:
+        return not self.extra_keywords and not self.missing_interactions
+
+
+def align_keywords(interaction_names: Sequence[str], keyword_names: Sequence[str]) -> Alignment:
+    """Aligns interactions and keywords in order, tolerating extra and missing keywords.
+
+    Both sequences are walked once. On a mismatch the next occurrence of the current
+    interaction among the keywords and of the current keyword among the interactions
+    is looked up in precomputed position lists, and the shorter gap is skipped as
+    extra keywords or as interactions without a keyword. If neither name occurs again
+    both are skipped.
+    """
+    interactions = [normalize_keyword_name(name) for name in interaction_names]
+    keywords = [get_keyword_name_variants(name) for name in keyword_names]
+    interaction_positions = _get_positions((name,) for name in interactions)
+    keyword_positions = _get_positions(keywords)
+    alignment = Alignment([None] * len(interactions))
+    interaction_index = keyword_index = 0
+    while interaction_index < len(interactions) and keyword_index < len(keywords):
+        if interactions[interaction_index] in keywords[keyword_index]:
+            alignment.keyword_indices[interaction_index] = keyword_index
+            interaction_index += 1
+            keyword_index += 1
+            continue
+        next_keyword = _next_position(
+            keyword_positions, (interactions[interaction_index],), keyword_index
+        )
+        next_interaction = _next_position(
+            interaction_positions, keywords[keyword_index], interaction_index
+        )
+        if next_keyword is None and next_interaction is None:
+            alignment.missing_interactions.append(interaction_index)
+            alignment.extra_keywords.append(keyword_index)
+            interaction_index += 1
+            keyword_index += 1
+        elif next_interaction is None or (
+            next_keyword is not None
+            and next_keyword - keyword_index <= next_interaction - interaction_index
+        ):
+            alignment.extra_keywords.extend(range(keyword_index, next_keyword))
+            keyword_index = next_keyword
+        else:
+            alignment.missing_interactions.extend(range(interaction_index, next_interaction))
+            interaction_index = next_interaction
+    alignment.extra_keywords.extend(range(keyword_index, len(keywords)))
+    return alignment
+
+
+def _get_positions(names) -> Dict[str, List[int]]:
+    positions: Dict[str, List[int]] = {}
+    for index, variants in enumerate(names):
+        for name in variants:
+            positions.setdefault(name, []).append(index)
+    return positions
+
+
+def _next_position(
+    positions: Dict[str, List[int]], names: Tuple[str, ...], start: int
+) -> Optional[int]:
+    next_positions = []
+    for name in names:
+        indices = positions.get(name, [])
+        found = bisect_left(indices, start)
+        if found < len(indices):
+            next_positions.append(indices[found])
+    return min(next_positions, default=None)
@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+import hashlib
+import re
+from dataclasses import dataclass
+from pathlib import PurePath, PurePosixPath
+from typing import Dict, List, Tuple
+
+from robot.parsing.lexer.tokens import Token
+from robot.parsing.model.blocks import (
+    File,
+    Keyword,
+    KeywordSection,
+    SettingSection,
+    TestCaseSection,
+)
+from robot.parsing.model.statements import (
+    EmptyLine,
+    KeywordCall,
+    KeywordName,
+    LibraryImport,
+    ResourceImport,
+    SectionHeader,
+    Statement,
+    VariablesImport,
+)
+
+from .config import KeywordHoistingConfig
+from .generated_keywords import HOISTED_KEYWORD_PREFIX, HOISTED_RESOURCE
+from .log import logger
+from .profiling import profiler
+
+HOISTED_RESOURCE_KEY = "hoisted_keywords"
+MAX_HOISTED_SEQUENCE_LENGTH = 64
+VARIABLE_PATTERN = re.compile(r"[$@&]\{")
+SEPARATOR = "    "
+
+CallKey = Tuple[str, ...]
+
+
+@dataclass
+class SequenceCandidate:
+    sequence: Tuple[int, ...]
+    positions: List[Tuple[int, int]]
+
+    @property
+    def saved_lines(self) -> int:
+        length = len(self.sequence)
+        return len(self.positions) * (length - 1) - length - 2
+
+
+def is_hoistable(statement: Statement) -> bool:
+    """Only calls without assignments and variables can be moved into another keyword.
+
+    Variables assigned by call-by-reference parameters are local to the test and would
+    neither be visible in nor be returned from the hoisted keyword.
+    """
+    return (
+        isinstance(statement, KeywordCall)
+        and not statement.assign
+        and not VARIABLE_PATTERN.search(statement.keyword or "")
+        and not any(VARIABLE_PATTERN.search(argument) for argument in statement.args)
+    )
+
+
+def get_call_key(call: KeywordCall) -> CallKey:
+    return (call.keyword, *call.args)
+
+
+def get_test_case_bodies(test_suites: Dict[str, File]) -> List[Tuple[str, List[Statement]]]:
+    return [
+        (uid, test_case.body)
+        for uid, test_suite in test_suites.items()
+        for section in test_suite.sections
+        if isinstance(section, TestCaseSection)
+        for test_case in section.body
+        if hasattr(test_case, "body")
+    ]
+
+
+def get_indent(statement: Statement) -> str:
+    first_token = statement.tokens[0]
+    return first_token.value if first_token.type == Token.SEPARATOR else ""
+
+
+def find_call_runs(
+    bodies: List[Tuple[str, List[Statement]]], call_ids: Dict[CallKey, int]
+) -> Tuple[List[List[int]], List[Tuple[str, List[Statement], int]]]:
+    """Splits test case bodies into runs of consecutive hoistable calls.
+
+    Calls of a compound interaction are indented below its ``# <compound>`` comment, so
+    a run ends at every other statement and wherever the indent changes. A hoisted
+    sequence therefore never spans the boundary of a compound interaction.
+    """
+    runs: List[List[int]] = []
+    locations: List[Tuple[str, List[Statement], int]] = []
+    for uid, body in bodies:
+        run: List[int] = []
+        run_indent = None
+        for index, statement in enumerate([*body, None]):
+            hoistable = statement is not None and is_hoistable(statement)
+            indent = get_indent(statement) if hoistable else None
+            if run and indent != run_indent:
+                runs.append(run)
+                run = []
+            if hoistable:
+                if not run:
+                    locations.append((uid, body, index))
+                    run_indent = indent
+                run.append(call_ids.setdefault(get_call_key(statement), len(call_ids)))
+    return runs, locations
+
+
+def find_repeated_sequences(
+    runs: List[List[int]], min_length: int, min_occurrences: int
+) -> List[SequenceCandidate]:
+    """Returns all right-maximal call sequences that occur at least ``min_occurrences`` times.
+
+    Positions sharing a sequence of ``min_length`` calls are grouped and the groups are
+    refined by the following call, like walking down a suffix tree. A sequence is only
+    reported if not all of its occurrences continue with the same call.
+    """
+    groups: Dict[Tuple[int, ...], List[Tuple[int, int]]] = {}
+    for run_index, run in enumerate(runs):
+        for start in range(len(run) - min_length + 1):
+            groups.setdefault(tuple(run[start : start + min_length]), []).append(
+                (run_index, start)
+            )
+    candidates = []
+    pending = [
+        (sequence, positions)
+        for sequence, positions in groups.items()
+        if len(positions) >= min_occurrences
+    ]
+    while pending:
+        sequence, positions = pending.pop()
+        length = len(sequence)
+        extensions: Dict[int, List[Tuple[int, int]]] = {}
+        if length < MAX_HOISTED_SEQUENCE_LENGTH:
+            for run_index, start in positions:
+                run = runs[run_index]
+                if start + length < len(run):
+                    extensions.setdefault(run[start + length], []).append((run_index, start))
+        if not any(len(extension) == len(positions) for extension in extensions.values()):
+            candidates.append(SequenceCandidate(sequence, positions))
+        pending.extend(
+            ((*sequence, call_id), extension)
+            for call_id, extension in extensions.items()
+            if len(extension) >= min_occurrences
+        )
+    return candidates
+
+
+def select_sequences(
+    candidates: List[SequenceCandidate], runs: List[List[int]], min_occurrences: int
+) -> List[SequenceCandidate]:
+    """Greedily picks the sequences saving the most lines without overlapping occurrences."""
+    claimed = [bytearray(len(run)) for run in runs]
+    selected = []
+    for candidate in sorted(candidates, key=lambda c: (-c.saved_lines, c.positions[0])):
+        if candidate.saved_lines <= 0:
+            break
+        length = len(candidate.sequence)
+        positions = []
+        for run_index, start in sorted(candidate.positions):
+            if not any(claimed[run_index][start : start + length]):
+                positions.append((run_index, start))
+                claimed[run_index][start : start + length] = b"\1" * length
+        if len(positions) < min_occurrences:
+            for run_index, start in positions:
+                claimed[run_index][start : start + length] = bytes(length)
+            continue
+        selected.append(SequenceCandidate(candidate.sequence, positions))
+    return selected
+
+
+def create_hoisted_keyword(name: str, calls: List[KeywordCall]) -> Keyword:
+    keyword = Keyword(header=KeywordName.from_params(name))
+    keyword.body.extend(
+        KeywordCall.from_params(call.keyword, args=tuple(call.args), indent=SEPARATOR)
+        for call in calls
+    )
+    keyword.body.append(EmptyLine.from_params())
+    return keyword
+
+
+def get_hoisted_keyword_name(calls: List[KeywordCall]) -> str:
+    digest = hashlib.blake2b(digest_size=6)
+    for call in calls:
+        digest.update("\0".join(get_call_key(call)).encode())
+        digest.update(b"\n")
+    return f"{HOISTED_KEYWORD_PREFIX}{digest.hexdigest()}"
+
+
+def get_hoisted_resource_import(tcs_path: PurePath) -> str:
+    parent_directories = [".."] * len(PurePath(tcs_path).parent.parts)
+    return PurePosixPath(*parent_directories, HOISTED_RESOURCE).as_posix()
+
+
+def add_resource_import(test_suite: File, resource: str) -> None:
+    for section in test_suite.sections:
+        if isinstance(section, SettingSection):
+            imports = [
+                index
+                for index, statement in enumerate(section.body)
+                if isinstance(statement, (LibraryImport, ResourceImport, VariablesImport))
+            ]
+            section.body.insert(
+                imports[-1] + 1 if imports else 0, ResourceImport.from_params(resource)
+            )
+            return
+
+
+def hoist_keyword_sequences(
+    test_suites: Dict[str, File], config: KeywordHoistingConfig
+) -> Dict[str, File]:
+    """Moves call sequences repeated across all suites into one generated resource file.
+
+    Every occurrence of a selected sequence is replaced by a call of the keyword
+    ``Hoisted-<digest>`` defined in ``hoisted_keywords.resource`` in the generation
+    directory, which the suites using it import. The returned dictionary contains the
+    resource file under ``hoisted_keywords``, or nothing if no sequence was hoisted.
+    """
+    min_length = max(config.minLength, 2)
+    min_occurrences = max(config.minOccurrences, 2)
+    bodies = get_test_case_bodies(test_suites)
+    call_ids: Dict[CallKey, int] = {}
+    runs, locations = find_call_runs(bodies, call_ids)
+    candidates = find_repeated_sequences(runs, min_length, min_occurrences)
+    selected = select_sequences(candidates, runs, min_occurrences)
+    if not selected:
+        return {}
+    replacements: Dict[int, List[Tuple[int, int, str]]] = {}
+    keywords = []
+    for candidate in selected:
+        run_index, start = candidate.positions[0]
+        _, body, offset = locations[run_index]
+        length = len(candidate.sequence)
+        calls = body[offset + start : offset + start + length]
+        name = get_hoisted_keyword_name(calls)
+        keywords.append(create_hoisted_keyword(name, calls))
+        for run_index, start in candidate.positions:
+            _, body, offset = locations[run_index]
+            replacements.setdefault(id(body), []).append((offset + start, length, name))
+        profiler.count("hoisted keywords")
+        profiler.count("hoisted calls", len(candidate.positions) * length)
+    importing_suites = set()
+    for uid, body, _ in locations:
+        for start, length, name in sorted(replacements.pop(id(body), []), reverse=True):
+            indent = get_indent(body[start]) or SEPARATOR
+            body[start : start + length] = [KeywordCall.from_params(name, indent=indent)]
+            importing_suites.add(uid)
+    for uid in importing_suites:
+        add_resource_import(test_suites[uid], get_hoisted_resource_import(test_suites[uid].source))
+    keyword_section = KeywordSection(header=SectionHeader.from_params(Token.KEYWORD_HEADER))
+    keyword_section.body.extend(keywords)
+    logger.info(
+        f"Hoisted {len(keywords)} repeated call sequences used by "
+        f"{len(importing_suites)} suites into {HOISTED_RESOURCE}."
+    )
+    return {HOISTED_RESOURCE_KEY: File([keyword_section], source=HOISTED_RESOURCE)}
@@ -0,0 +1,68 @@
+from pathlib import Path
+from typing import Optional
+
+from robot import result, running
+from robot.libraries.BuiltIn import BuiltIn
+
+from .config import Configuration
+from .json_reader import read_json
+from .log import logger, setup_logger
+from .result_writer import ResultWriter
+
+NONE_VALUES = ("", "NONE")
+
+
+class TestBenchListener:
+    """Robot Framework listener that writes TestBench JSON results while the tests run.
+
+    Every finished test and test case set is mapped immediately by the same
+    ``ResultWriter`` that ``read`` uses on an output.xml, so the results are complete
+    as soon as the execution ends.
+
+    Usage::
+
+        robot --listener testbench2robotframework.listener.TestBenchListener:JSON_REPORT:JSON_RESULT:CONFIG:LISTENER_UID Generated
+
+    With ``LISTENER_UID``, the result files of that uniqueID are also exported to
+    ``<LISTENER_UID>.zip`` in the result directory as soon as their test case set
+    ends. Trailing arguments can be omitted, every argument but ``JSON_REPORT`` can
+    be ``NONE``.
+    """
+
+    ROBOT_LISTENER_API_VERSION = 3
+
+    def __init__(
+        self,
+        json_report: str,
+        json_result: Optional[str] = None,
+        config: Optional[str] = None,
+        listener_uid: Optional[str] = None,
+    ) -> None:
+        configuration = Configuration.from_dict(
+            read_json(config) if config not in (None, *NONE_VALUES) else {}
+        )
+        setup_logger(configuration)
+        self.result_writer = ResultWriter(
+            json_report,
+            None if json_result in NONE_VALUES else json_result,
+            configuration,
+            None,
+            None if listener_uid in NONE_VALUES else listener_uid,
+        )
+
+    def start_suite(self, data: running.TestSuite, suite: result.TestSuite):
+        if self.result_writer.output_xml is None:
+            self.result_writer.output_xml = str(
+                Path(BuiltIn().get_variable_value("${OUTPUT DIR}"), "output.xml")
+            )
+        self.result_writer.start_suite(suite)
+
+    def end_test(self, data: running.TestCase, test: result.TestCase):
+        self.result_writer.end_test(test)
+
+    def end_suite(self, data: running.TestSuite, suite: result.TestSuite):
+        self.result_writer.end_suite(suite)
+
+    def close(self):
+        self.result_writer.end_result(None)
+        logger.debug("TestBench listener closed.")
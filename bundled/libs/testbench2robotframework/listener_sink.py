@@ -0,0 +1,91 @@
+import glob
+import json
+from dataclasses import asdict
+from pathlib import Path
+from typing import Iterable, Optional, Set
+from zipfile import ZIP_DEFLATED, ZipFile
+
+from .log import logger
+from .model import ProtocolTestCaseSetExecutionSummary
+
+PROTOCOL_FILE = "protocol.json"
+PROJECT_FILE = "project.json"
+
+
+class IncrementalProtocolWriter:
+    """Keeps ``protocol.json`` a valid JSON list while appending one entry at a time.
+
+    Each append only writes the new entry over the closing bracket of the list,
+    so the cost per test case set does not depend on the size of the protocol.
+    """
+
+    def __init__(self, filepath: Path) -> None:
+        self.filepath = filepath
+        self._file = filepath.open("w+", encoding="utf8")
+        self._file.write("[]")
+        self._file.flush()
+        self._has_entries = False
+
+    def append(self, protocol_test_case_set: ProtocolTestCaseSetExecutionSummary) -> None:
+        self._file.seek(self._file.tell() - 1)
+        if self._has_entries:
+            self._file.write(",")
+        json.dump(asdict(protocol_test_case_set), self._file)
+        self._file.write("]")
+        self._file.flush()
+        self._has_entries = True
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class ListenerProtocolSink:
+    """Append-only export of listener mode results into ``<listener_uid>.zip``.
+
+    The ZIP file stays open during the whole run and only receives the files of
+    each newly finished test case set. ``protocol.json`` is maintained on disk
+    incrementally and added to the archive when the sink is closed, together with
+    all remaining result files of the listener that were not exported yet.
+    """
+
+    def __init__(self, json_dir: str, json_result: str, json_result_path: str, listener_uid: str):
+        self.listener_uid = listener_uid
+        self.json_result = Path(json_result)
+        self.zip_path = Path(json_result_path) / f"{listener_uid}.zip"
+        self.zip_path.parent.mkdir(parents=True, exist_ok=True)
+        self._zip: Optional[ZipFile] = ZipFile(self.zip_path, "w", ZIP_DEFLATED)
+        self._added_files: Set[str] = set()
+        self._protocol = IncrementalProtocolWriter(self.json_result / PROTOCOL_FILE)
+        project_file = Path(json_dir) / PROJECT_FILE
+        if project_file.exists():
+            self._zip.write(project_file, PROJECT_FILE)
+
+    def add_test_case_set(
+        self,
+        protocol_test_case_set: ProtocolTestCaseSetExecutionSummary,
+        result_files: Iterable[Path],
+    ) -> None:
+        self._protocol.append(protocol_test_case_set)
+        for result_file in result_files:
+            self._add_result_file(Path(result_file))
+
+    def _add_result_file(self, result_file: Path) -> None:
+        name = result_file.name
+        if not name.startswith(self.listener_uid) or not name.endswith(".json"):
+            return
+        if name in self._added_files:
+            logger.debug(f"'{name}' was already added to '{self.zip_path}'.")
+            return
+        self._zip.write(result_file, name)
+        self._added_files.add(name)
+
+    def close(self) -> None:
+        if self._zip is None:
+            return
+        self._protocol.close()
+        for result_file in self.json_result.glob(f"{glob.escape(self.listener_uid)}*.json"):
+            if result_file.name not in self._added_files:
+                self._add_result_file(result_file)
+        self._zip.write(self._protocol.filepath, PROTOCOL_FILE)
+        self._zip.close()
+        self._zip = None
@@ -7,6 +7,9 @@ logger = logging.Logger("iTB2RF", logging.DEBUG)
 
 
 def setup_logger(config: Configuration):
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
     console_handler = logging.StreamHandler()
     console_handler.setLevel(config.loggingConfiguration.console.logLevel)
     console_handler.setFormatter(logging.Formatter(config.loggingConfiguration.console.logFormat))
@@ -0,0 +1,172 @@
+import gc
+import os
+import sys
+import tracemalloc
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+MEBIBYTE = 1024 * 1024
+TRACKED_MODULES = (
+    "testbench2robotframework.model",
+    "robot.parsing.model.blocks",
+    "robot.parsing.model.statements",
+    "robot.result.model",
+)
+
+
+@dataclass
+class PhaseMemory:
+    name: str
+    peak: int = 0
+    retained: int = 0
+    top_allocations: List[str] = field(default_factory=list)
+    object_counts: List[Tuple[str, int]] = field(default_factory=list)
+
+
+@dataclass
+class _PhaseFrame:
+    name: str
+    max_peak: int
+    snapshot: Optional[tracemalloc.Snapshot]
+
+
+class MemoryTracker:
+    """Records traced memory per phase.
+
+    Peak and retained memory are recorded for every call of a phase, the comparatively
+    expensive snapshots, allocation sites and object counts only for its first call.
+    """
+
+    def __init__(self, top: int = 10) -> None:
+        self.top = top
+        self.phases: Dict[str, PhaseMemory] = {}
+        self._stack: List[_PhaseFrame] = []
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def stop(self) -> None:
+        tracemalloc.stop()
+
+    def enter(self, name: str) -> None:
+        _, peak = tracemalloc.get_traced_memory()
+        if self._stack:
+            self._stack[-1].max_peak = max(self._stack[-1].max_peak, peak)
+        snapshot = None if name in self.phases else take_snapshot()
+        self._stack.append(_PhaseFrame(name, 0, snapshot))
+        tracemalloc.reset_peak()
+
+    def exit(self) -> None:
+        frame = self._stack.pop()
+        current, peak = tracemalloc.get_traced_memory()
+        peak = max(frame.max_peak, peak)
+        if self._stack:
+            self._stack[-1].max_peak = max(self._stack[-1].max_peak, peak)
+        phase = self.phases.setdefault(frame.name, PhaseMemory(frame.name))
+        phase.peak = max(phase.peak, peak)
+        if frame.snapshot is not None:
+            snapshot = take_snapshot()
+            differences = snapshot.compare_to(frame.snapshot, "lineno")
+            phase.retained = sum(difference.size_diff for difference in differences)
+            phase.top_allocations = [
+                str(difference) for difference in differences[: self.top] if difference.size_diff
+            ]
+            phase.object_counts = count_model_objects().most_common(self.top)
+        del frame
+
+    def report(self) -> str:
+        lines = [f"{'Phase':<30}  {'Peak MiB':>10}  {'Retained MiB':>12}"]
+        lines.append("-" * 56)
+        lines.extend(
+            f"{phase.name:<30}  {phase.peak / MEBIBYTE:>10.1f}  "
+            f"{phase.retained / MEBIBYTE:>12.1f}"
+            for phase in self.phases.values()
+        )
+        for phase in self.phases.values():
+            if not phase.top_allocations and not phase.object_counts:
+                continue
+            lines.append("")
+            lines.append(f"[{phase.name}] top allocation sites:")
+            lines.extend(f"  {allocation}" for allocation in phase.top_allocations)
+            if phase.object_counts:
+                lines.append(f"[{phase.name}] live model objects:")
+                lines.extend(f"  {count:>10}  {name}" for name, count in phase.object_counts)
+        return "\n".join(lines)
+
+
+def take_snapshot() -> tracemalloc.Snapshot:
+    return tracemalloc.take_snapshot().filter_traces(
+        [tracemalloc.Filter(False, tracemalloc.__file__)]
+    )
+
+
+def count_model_objects() -> Counter:
+    counter: Counter = Counter()
+    for obj in gc.get_objects():
+        cls = type(obj)
+        if cls.__module__ in TRACKED_MODULES:
+            counter[f"{cls.__module__}.{cls.__qualname__}"] += 1
+    return counter
+
+
+def get_resident_memory() -> Optional[int]:
+    """Returns the resident set size of the current process in bytes, if available."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    if sys.platform == "win32":
+        return _get_windows_working_set()
+    try:
+        import resource  # noqa: PLC0415
+    except ImportError:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def _get_windows_working_set() -> Optional[int]:
+    import ctypes  # noqa: PLC0415
+    from ctypes import wintypes  # noqa: PLC0415
+
+    class ProcessMemoryCounters(ctypes.Structure):
+        _fields_ = [
+            ("cb", wintypes.DWORD),
+            ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+
+    counters = ProcessMemoryCounters()
+    counters.cb = ctypes.sizeof(counters)
+    process = ctypes.windll.kernel32.GetCurrentProcess()
+    if not ctypes.windll.psapi.GetProcessMemoryInfo(
+        process, ctypes.byref(counters), counters.cb
+    ):
+        return None
+    return counters.WorkingSetSize
+
+
+class MemoryGuard:
+    def __init__(self, max_memory_mb: int) -> None:
+        self.max_memory = max_memory_mb * MEBIBYTE
+
+    def check(self, phase: str) -> None:
+        resident_memory = get_resident_memory()
+        if resident_memory is None or resident_memory <= self.max_memory:
+            return
+        sys.exit(
+            f"Memory limit exceeded during '{phase}': the process uses "
+            f"{resident_memory / MEBIBYTE:.0f} MiB but --max-memory allows "
+            f"{self.max_memory / MEBIBYTE:.0f} MiB. Aborted before further results "
+            f"were written."
+        )
@@ -911,7 +911,7 @@ class ProtocolTestCaseSetExecutionSummary:
             testCases=[
                 ProtocolTestCaseExecutionSummary.from_dict(tc) for tc in dictionary.get("testCases")
             ],
-            comments=ProtocolComments.from_dict(dictionary.get("comments", {})),
+            comments=ProtocolComments.from_dict(dictionary.get("comments") or {}),
         )
 
 
@@ -925,16 +925,12 @@ class ProtocolTestCaseExecutionSummary:
 
     @classmethod
     def from_dict(cls, dictionary) -> ProtocolTestCaseExecutionSummary:
-        dict_udfs = dictionary.get("udfs")
         return cls(
             uniqueID=dictionary.get("uniqueID"),
             testCaseExecutionKey=dictionary.get("testCaseExecutionKey"),
             durationMillis=dictionary.get("durationMillis"),
             result=ProtocolTestCaseResult.from_dict(dictionary.get("result", {})),
-            comments=ProtocolComments.from_dict(dictionary.get("comments", {})),
-            # testerKey=dictionary.get("testerKey"),
-            defects=dictionary.get("defects"),
-            udfs=[ProtocolUdf.from_dict(udf) for udf in dict_udfs] if dict_udfs else None,
+            comments=ProtocolComments.from_dict(dictionary.get("comments") or {}),
         )
 
 
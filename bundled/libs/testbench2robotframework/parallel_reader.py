@@ -0,0 +1,123 @@
+import heapq
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Tuple
+
+from robot.result import Result, TestSuite
+
+from .config import Configuration
+from .log import logger, setup_logger
+from .model import ProtocolTestCaseSetExecutionSummary
+from .profiling import profiler
+from .result_writer import OutputXmlKey, ResultWriter
+
+
+@dataclass
+class ShardResult:
+    protocol_test_case_sets: List[Tuple[int, ProtocolTestCaseSetExecutionSummary]] = field(
+        default_factory=list
+    )
+    mapped_test_cases: int = 0
+
+
+def iter_test_case_set_suites(suite: TestSuite) -> Iterator[TestSuite]:
+    """Yields all suites that ``ResultWriter.end_suite`` maps to a test case set."""
+    if not suite.suites:
+        if suite.metadata.get("uniqueID"):
+            yield suite
+        return
+    for child in suite.suites:
+        yield from iter_test_case_set_suites(child)
+
+
+def iter_suites(suite: TestSuite) -> Iterator[TestSuite]:
+    yield suite
+    for child in suite.suites:
+        yield from iter_suites(child)
+
+
+def split_into_shards(suites: List[TestSuite], jobs: int) -> List[List[int]]:
+    """Distributes suite indices over ``jobs`` shards, largest suites first."""
+    shards: List[List[int]] = [[] for _ in range(min(jobs, len(suites)))]
+    if not shards:
+        return []
+    loads = [(0, shard_index) for shard_index in range(len(shards))]
+    by_size = sorted(range(len(suites)), key=lambda index: -suites[index].test_count)
+    for suite_index in by_size:
+        load, shard_index = heapq.heappop(loads)
+        shards[shard_index].append(suite_index)
+        heapq.heappush(loads, (load + max(suites[suite_index].test_count, 1), shard_index))
+    return [sorted(shard) for shard in shards if shard]
+
+
+def _init_worker(config: Dict) -> None:
+    setup_logger(Configuration.from_dict(config))
+
+
+def _map_shard(
+    json_dir: str,
+    json_result: str,
+    config: Dict,
+    output_xml: str,
+    test_output_xmls: Dict[OutputXmlKey, str],
+    suites: List[Tuple[int, Dict]],
+) -> ShardResult:
+    result_writer = ResultWriter.for_shard(
+        json_dir, json_result, Configuration.from_dict(config), output_xml, test_output_xmls
+    )
+    shard_result = ShardResult()
+    for suite_index, suite_data in suites:
+        suite = TestSuite.from_dict(suite_data)
+        suite.visit(result_writer)
+        protocol = result_writer.main_protocol.protocolTestCaseSetExecutionSummary
+        shard_result.protocol_test_case_sets.extend((suite_index, entry) for entry in protocol)
+        protocol.clear()
+    result_writer.result_files.close()
+    result_writer.io_engine.close()
+    shard_result.mapped_test_cases = result_writer.mapped_test_cases
+    return shard_result
+
+
+def write_results_in_parallel(
+    result: Result, result_writer: ResultWriter, config: Dict, jobs: int
+) -> None:
+    """Maps the test case sets of ``result`` in ``jobs`` worker processes.
+
+    Every worker writes the JSON files of its test case sets directly into the
+    result directory. The protocol entries are merged in suite order afterwards and
+    ``end_result`` of the main writer rolls the verdicts up into the test theme tree.
+    """
+    if not hasattr(TestSuite, "to_dict"):
+        logger.warning("Parallel import requires Robot Framework 7 or newer, using one job.")
+        result.visit(result_writer)
+        return
+    for suite in iter_suites(result.suite):
+        result_writer.start_suite(suite)
+    suites = list(iter_test_case_set_suites(result.suite))
+    shards = split_into_shards(suites, jobs)
+    logger.debug(f"Importing {len(suites)} test case sets in {len(shards)} shards.")
+    protocol_test_case_sets: List[Tuple[int, ProtocolTestCaseSetExecutionSummary]] = []
+    with profiler.phase("map shards"), ProcessPoolExecutor(
+        max_workers=len(shards) or 1, initializer=_init_worker, initargs=(config,)
+    ) as executor:
+        futures = [
+            executor.submit(
+                _map_shard,
+                result_writer.json_dir,
+                result_writer.json_result,
+                config,
+                result_writer.output_xml,
+                result_writer.test_output_xmls,
+                [(index, suites[index].to_dict()) for index in shard],
+            )
+            for shard in shards
+        ]
+        for future in futures:
+            shard_result = future.result()
+            protocol_test_case_sets.extend(shard_result.protocol_test_case_sets)
+            result_writer.mapped_test_cases += shard_result.mapped_test_cases
+    protocol_test_case_sets.sort(key=lambda entry: entry[0])
+    result_writer.main_protocol.protocolTestCaseSetExecutionSummary.extend(
+        entry for _, entry in protocol_test_case_sets
+    )
+    result_writer.end_result(result)
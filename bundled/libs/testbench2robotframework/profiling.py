@@ -0,0 +1,160 @@
+import cProfile
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .memory import MemoryGuard, MemoryTracker
+
+CHROME_TRACE_SUFFIX = ".json"
+
+
+@dataclass
+class PhaseTiming:
+    name: str
+    calls: int = 0
+    seconds: float = 0.0
+
+
+class _Phase:
+    def __init__(self, profiler: "Profiler", name: str) -> None:
+        self._profiler = profiler
+        self._name = name
+        self._start = 0.0
+
+    def __enter__(self):
+        self._profiler.enter_phase(self._name)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        end = time.perf_counter()
+        self._profiler.exit_phase(self._name, self._start, end)
+        return False
+
+
+class Profiler:
+    def __init__(self) -> None:
+        self.enabled = False
+        self.output: Optional[str] = None
+        self.phases: Dict[str, PhaseTiming] = {}
+        self.counters: Dict[str, int] = {}
+        self._trace_events: List[Dict] = []
+        self._cprofile: Optional[cProfile.Profile] = None
+        self._started = 0.0
+        self._stopped = 0.0
+        self.memory: Optional[MemoryTracker] = None
+        self.memory_guard: Optional[MemoryGuard] = None
+
+    @property
+    def active(self) -> bool:
+        return self.enabled or self.memory is not None or self.memory_guard is not None
+
+    def enable(self, output: Optional[str] = None) -> None:
+        self.enabled = True
+        self.output = output
+        self._started = time.perf_counter()
+        if output and not output.lower().endswith(CHROME_TRACE_SUFFIX):
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def enable_memory_report(self, top: int = 10) -> None:
+        self.memory = MemoryTracker(top)
+        self.memory.start()
+
+    def set_memory_limit(self, max_memory_mb: int) -> None:
+        self.memory_guard = MemoryGuard(max_memory_mb)
+
+    def phase(self, name: str):
+        if not self.active:
+            return nullcontext()
+        return _Phase(self, name)
+
+    def checkpoint(self, name: str) -> None:
+        if self.memory_guard is not None:
+            self.memory_guard.check(name)
+
+    def enter_phase(self, name: str) -> None:
+        self.checkpoint(name)
+        if self.memory is not None:
+            self.memory.enter(name)
+
+    def exit_phase(self, name: str, start: float, end: float) -> None:
+        if self.memory is not None:
+            self.memory.exit()
+        self.add_phase_time(name, start, end)
+        self.checkpoint(name)
+
+    def add_phase_time(self, name: str, start: float, end: float) -> None:
+        timing = self.phases.setdefault(name, PhaseTiming(name))
+        timing.calls += 1
+        timing.seconds += end - start
+        if self.output and self._cprofile is None:
+            self._trace_events.append(
+                {
+                    "name": name,
+                    "ph": "X",
+                    "ts": (start - self._started) * 1_000_000,
+                    "dur": (end - start) * 1_000_000,
+                    "pid": os.getpid(),
+                    "tid": threading.get_ident(),
+                }
+            )
+
+    def count(self, name: str, value: int = 1) -> None:
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def stop(self) -> None:
+        if self.memory is not None:
+            self.memory.stop()
+        if not self.enabled:
+            return
+        self._stopped = time.perf_counter()
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self._cprofile.dump_stats(self.output)
+        elif self.output:
+            with Path(self.output).open("w", encoding="utf-8") as trace_file:
+                json.dump({"traceEvents": self._trace_events}, trace_file)
+
+    def report(self) -> str:
+        sections = []
+        if self.enabled:
+            sections.append(self._timing_report())
+        if self.memory is not None:
+            sections.append(self.memory.report())
+        return "\n\n".join(sections)
+
+    def _timing_report(self) -> str:
+        total = (self._stopped or time.perf_counter()) - self._started
+        name_width = max([len(name) for name in [*self.phases, *self.counters, "Phase"]])
+        lines = [
+            f"{'Phase':<{name_width}}  {'Calls':>8}  {'Seconds':>10}  {'Share':>6}",
+            "-" * (name_width + 30),
+        ]
+        for timing in self.phases.values():
+            share = timing.seconds / total * 100 if total else 0.0
+            lines.append(
+                f"{timing.name:<{name_width}}  {timing.calls:>8}  "
+                f"{timing.seconds:>10.3f}  {share:>5.1f}%"
+            )
+        lines.append(f"{'Total':<{name_width}}  {'':>8}  {total:>10.3f}")
+        if self.counters:
+            lines.append("")
+            lines.append(f"{'Counter':<{name_width}}  {'Value':>8}")
+            lines.append("-" * (name_width + 10))
+            lines.extend(
+                f"{name:<{name_width}}  {value:>8}" for name, value in self.counters.items()
+            )
+        if self.output:
+            lines.append("")
+            lines.append(f"Profile written to '{Path(self.output).absolute()}'.")
+        return "\n".join(lines)
+
+
+profiler = Profiler()
@@ -0,0 +1,170 @@
+import hashlib
+import os
+import pickle
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from .config import ReportCacheConfig
+from .log import logger
+from .profiling import profiler
+
+CACHE_FORMAT_VERSION = 1
+DEFAULT_CACHE_DIRECTORY = Path("~", ".cache", "tb2robot")
+MEBIBYTE = 1024 * 1024
+EVICTION_TARGET_RATIO = 0.8
+LRU_RESOLUTION = 60
+STAT_DIRECTORY = "stat"
+OBJECT_DIRECTORY = "objects"
+
+
+def get_default_cache_directory() -> Path:
+    xdg_cache_home = os.environ.get("XDG_CACHE_HOME")
+    if xdg_cache_home:
+        return Path(xdg_cache_home, "tb2robot")
+    return DEFAULT_CACHE_DIRECTORY.expanduser()
+
+
+class ReportCache:
+    """On-disk cache of model objects decoded from the JSON files of a report.
+
+    Decoded objects are pickled under the blake2b hash of the file content, so
+    re-extracted or copied reports hit the cache as well. The content hash of a file
+    is remembered under its path, size and mtime, so unchanged files are not even
+    read. Cache hits refresh the mtime of the entry at most once a minute, and the
+    least recently used entries are evicted once the cache grows beyond ``max_size``
+    bytes.
+    """
+
+    def __init__(self, directory: Path, max_size: int) -> None:
+        self.directory = directory
+        self.max_size = max_size
+        self.stat_directory = directory / STAT_DIRECTORY
+        self.object_directory = directory / OBJECT_DIRECTORY
+        self.stat_directory.mkdir(parents=True, exist_ok=True)
+        self.object_directory.mkdir(parents=True, exist_ok=True)
+        self._version = f"{CACHE_FORMAT_VERSION}-{get_package_version()}\0".encode()
+        self._size: Optional[int] = None
+
+    def load(self, filepath: Path, decode: Callable[[bytes], Any]) -> Any:
+        """Returns the cached object for ``filepath`` or decodes and caches the file.
+
+        ``decode`` gets the file content and returns a picklable object or ``None``
+        if the content cannot be decoded. ``None`` is not cached.
+        """
+        filename = os.path.abspath(filepath)
+        try:
+            stat = os.stat(filename)
+        except FileNotFoundError:
+            logger.debug(f"Cannot find json file {filepath}:")
+            return None
+        stat_path = os.path.join(
+            self.stat_directory,
+            self._hash(f"{filename}\0{stat.st_size}\0{stat.st_mtime_ns}".encode()),
+        )
+        content = None
+        digest = self._read_text(stat_path)
+        if digest is None:
+            content = Path(filename).read_bytes()
+            digest = self._hash(content)
+        object_path = os.path.join(self.object_directory, f"{digest}.pickle")
+        cached = self._read_object(object_path)
+        if cached is not None:
+            profiler.count("report cache hits")
+            if content is not None:
+                self._write(stat_path, digest.encode())
+            return cached
+        profiler.count("report cache misses")
+        if content is None:
+            content = Path(filename).read_bytes()
+            digest = self._hash(content)
+            object_path = os.path.join(self.object_directory, f"{digest}.pickle")
+        decoded = decode(content)
+        if decoded is not None:
+            self._write(object_path, pickle.dumps(decoded, pickle.HIGHEST_PROTOCOL))
+            self._write(stat_path, digest.encode())
+        return decoded
+
+    def _hash(self, content: bytes) -> str:
+        digest = hashlib.blake2b(self._version, digest_size=20)
+        digest.update(content)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _read_text(path: str) -> Optional[str]:
+        try:
+            with open(path, encoding="ascii") as text_file:
+                return text_file.read()
+        except (FileNotFoundError, UnicodeDecodeError):
+            return None
+
+    @staticmethod
+    def _read_object(path: str) -> Any:
+        try:
+            with open(path, "rb") as cache_file:
+                cached = pickle.load(cache_file)
+                last_used = os.fstat(cache_file.fileno()).st_mtime
+        except FileNotFoundError:
+            return None
+        except (pickle.UnpicklingError, EOFError) as error:
+            logger.debug(f"Discarding unreadable cache entry {path}: {error}")
+            Path(path).unlink(missing_ok=True)
+            return None
+        if time.time() - last_used > LRU_RESOLUTION:
+            os.utime(path)
+        return cached
+
+    def _write(self, path: str, content: bytes) -> None:
+        temporary_path = Path(f"{path}.{os.getpid()}.tmp")
+        try:
+            temporary_path.write_bytes(content)
+            os.replace(temporary_path, path)
+        except OSError as error:
+            logger.debug(f"Could not write cache entry {path}: {error}")
+            temporary_path.unlink(missing_ok=True)
+            return
+        if self._size is None:
+            self._size = self._get_size()
+        else:
+            self._size += len(content)
+        if self._size > self.max_size:
+            self.evict()
+
+    def _get_size(self) -> int:
+        return sum(
+            entry.stat().st_size
+            for directory in (self.stat_directory, self.object_directory)
+            for entry in os.scandir(directory)
+        )
+
+    def evict(self) -> None:
+        """Deletes the least recently used entries until the cache is below its limit."""
+        entries = sorted(
+            (entry.stat().st_mtime_ns, entry.stat().st_size, entry.path)
+            for directory in (self.stat_directory, self.object_directory)
+            for entry in os.scandir(directory)
+        )
+        size = sum(entry_size for _, entry_size, _ in entries)
+        target_size = self.max_size * EVICTION_TARGET_RATIO
+        evicted = 0
+        for _, entry_size, path in entries:
+            if size <= target_size:
+                break
+            Path(path).unlink(missing_ok=True)
+            size -= entry_size
+            evicted += 1
+        self._size = size
+        logger.debug(f"Evicted {evicted} report cache entries.")
+
+
+def create_report_cache(config: ReportCacheConfig) -> Optional[ReportCache]:
+    if not config.enabled:
+        return None
+    directory = Path(config.directory).expanduser() if config.directory else None
+    return ReportCache(directory or get_default_cache_directory(), config.maxSize * MEBIBYTE)
+
+
+def get_package_version() -> str:
+    from testbench2robotframework import __version__  # pylint: disable=import-outside-toplevel
+
+    return __version__
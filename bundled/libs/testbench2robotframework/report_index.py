@@ -0,0 +1,354 @@
+import hashlib
+import os
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from zipfile import ZipFile
+
+from .json_reader import TEST_STRUCTURE_TREE_FILE, read_json
+from .log import logger
+from .model import TestStructureElementType, UserDefinedField
+from .profiling import profiler
+from .selection import Selection
+from .tree_arrays import NO_PARENT, ArrayTree
+
+INDEX_SUFFIX = ".index.sqlite"
+INDEX_SCHEMA_VERSION = 2
+INDEX_SCHEMA = """
+CREATE TABLE meta (name TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE nodes (
+    uid TEXT, key TEXT PRIMARY KEY, parent_key TEXT, numbering TEXT, name TEXT,
+    element_type TEXT, position INTEGER, preorder INTEGER, preorder_end INTEGER
+);
+CREATE TABLE test_cases (
+    uid TEXT, test_case_set_uid TEXT, position INTEGER, PRIMARY KEY (test_case_set_uid, uid)
+);
+CREATE TABLE test_case_tags (test_case_uid TEXT, kind TEXT, tag TEXT);
+CREATE TABLE interaction_usage (
+    test_case_uid TEXT, interaction_uid TEXT, name TEXT, path TEXT, interaction_type TEXT
+);
+CREATE TABLE parameter_values (
+    test_case_uid TEXT, interaction_uid TEXT, name TEXT, value TEXT
+);
+CREATE INDEX nodes_uid ON nodes (uid);
+CREATE INDEX nodes_preorder ON nodes (element_type, preorder);
+CREATE INDEX test_cases_uid ON test_cases (uid);
+CREATE INDEX test_case_tags_uid ON test_case_tags (test_case_uid);
+CREATE INDEX interaction_usage_name ON interaction_usage (name);
+CREATE INDEX interaction_usage_uid ON interaction_usage (interaction_uid);
+CREATE INDEX parameter_values_name ON parameter_values (name, value);
+"""
+SUBTREE_INTERVAL_QUERY = """
+SELECT preorder, preorder_end, position, uid, element_type FROM nodes WHERE {condition}
+"""
+SUBTREE_RANGE_QUERY = """
+SELECT position, uid FROM nodes WHERE element_type = ? AND preorder BETWEEN ? AND ?
+"""
+STAT_FINGERPRINT = "statFingerprint"
+CONTENT_FINGERPRINT = "contentFingerprint"
+MEBIBYTE = 1024 * 1024
+TAG_KIND_KEYWORD = "keyword"
+TAG_KIND_UDF = "udf"
+
+
+def get_index_path(json_dir: str) -> Path:
+    return Path(f"{Path(json_dir)}{INDEX_SUFFIX}")
+
+
+def get_report_stat_fingerprint(json_dir: str, report_zip: Optional[str] = None) -> str:
+    """Hashes the names, sizes and modification times of all report files.
+
+    Extracting a ZIP report does not keep the modification times of its files, so
+    for ZIP reports the path, size and modification time of the ZIP file are hashed.
+    """
+    fingerprint = hashlib.blake2b(f"{INDEX_SCHEMA_VERSION}".encode(), digest_size=16)
+    if report_zip:
+        stat = os.stat(report_zip)
+        path = Path(report_zip).resolve()
+        fingerprint.update(f"{path}\0{stat.st_size}\0{stat.st_mtime_ns}\0".encode())
+        return fingerprint.hexdigest()
+    for entry in sorted(os.scandir(json_dir), key=lambda entry: entry.name):
+        if entry.is_file():
+            stat = entry.stat()
+            fingerprint.update(f"{entry.name}\0{stat.st_size}\0{stat.st_mtime_ns}\0".encode())
+    return fingerprint.hexdigest()
+
+
+def get_report_content_fingerprint(json_dir: str, report_zip: Optional[str] = None) -> str:
+    """Hashes the names and contents of all report files.
+
+    For ZIP reports the names, sizes and CRCs of the central directory are hashed
+    instead, which does not read any file contents.
+    """
+    fingerprint = hashlib.blake2b(f"{INDEX_SCHEMA_VERSION}".encode(), digest_size=16)
+    if report_zip:
+        with ZipFile(report_zip) as archive:
+            for info in sorted(archive.infolist(), key=lambda info: info.filename):
+                fingerprint.update(f"{info.filename}\0{info.file_size}\0{info.CRC}\0".encode())
+        return fingerprint.hexdigest()
+    for entry in sorted(os.scandir(json_dir), key=lambda entry: entry.name):
+        if entry.is_file():
+            fingerprint.update(f"{entry.name}\0{entry.stat().st_size}\0".encode())
+            with open(entry.path, "rb") as report_file:
+                while chunk := report_file.read(MEBIBYTE):
+                    fingerprint.update(chunk)
+    return fingerprint.hexdigest()
+
+
+class ReportIndex:
+    """SQLite index over the test theme tree, test cases, interactions and parameters.
+
+    The index is stored next to the report as ``<report>.index.sqlite`` and rebuilt if
+    the files of the report changed.
+    """
+
+    def __init__(self, connection: sqlite3.Connection) -> None:
+        self.connection = connection
+
+    @classmethod
+    def open(
+        cls, json_dir: str, build: bool = True, report_zip: Optional[str] = None
+    ) -> Optional["ReportIndex"]:
+        """Opens the index of ``json_dir`` and rebuilds it if the report changed.
+
+        Names, sizes and modification times of the report files are compared first. If
+        they differ, the contents are hashed and the index is only rebuilt if they
+        changed as well. ``report_zip`` is the ZIP file ``json_dir`` was extracted
+        from, if any; it is fingerprinted instead of the extracted files.
+        """
+        index_path = get_index_path(json_dir)
+        stat_fingerprint = get_report_stat_fingerprint(json_dir, report_zip)
+        content_fingerprint = None
+        if index_path.exists():
+            index = cls(sqlite3.connect(str(index_path)))
+            if index.get_meta(STAT_FINGERPRINT) == stat_fingerprint:
+                return index
+            content_fingerprint = get_report_content_fingerprint(json_dir, report_zip)
+            if index.get_meta(CONTENT_FINGERPRINT) == content_fingerprint:
+                index.set_meta(STAT_FINGERPRINT, stat_fingerprint)
+                return index
+            index.close()
+            logger.info(f"Report index '{index_path}' is outdated.")
+        if not build:
+            return None
+        with profiler.phase("build report index"):
+            build_report_index(
+                json_dir,
+                index_path,
+                stat_fingerprint,
+                content_fingerprint or get_report_content_fingerprint(json_dir, report_zip),
+            )
+        return cls(sqlite3.connect(str(index_path)))
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def get_meta(self, name: str) -> Optional[str]:
+        try:
+            row = self.connection.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        except sqlite3.DatabaseError:
+            return None
+        return row[0] if row else None
+
+    def set_meta(self, name: str, value: str) -> None:
+        with self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (name, value))
+
+    def get_test_case_set_uids_below(
+        self, uids: Iterable[str] = (), numberings: Iterable[str] = ()
+    ) -> List[str]:
+        """Returns the test case sets in the subtrees of the given nodes in tree order."""
+        conditions, parameters = [], []
+        for uid in uids:
+            conditions.append("uid = ?")
+            parameters.append(uid)
+        for numbering in numberings:
+            conditions.append("(numbering = ? OR numbering LIKE ? ESCAPE '\\')")
+            parameters.extend([numbering, f"{escape_like(numbering)}.%"])
+        if not conditions:
+            conditions.append("element_type = ?")
+            parameters.append(TestStructureElementType.RootNode.value)
+        query = SUBTREE_INTERVAL_QUERY.format(condition=" OR ".join(conditions))
+        element_type = TestStructureElementType.TestCaseSetNode.value
+        test_case_sets: Dict[int, str] = {}
+        intervals = []
+        for start, end, position, uid, node_type in self.connection.execute(query, parameters):
+            if start is not None:
+                intervals.append((start, end))
+            elif node_type == element_type:
+                test_case_sets[position] = uid
+        for start, end in merge_intervals(intervals):
+            test_case_sets.update(
+                self.connection.execute(SUBTREE_RANGE_QUERY, (element_type, start, end))
+            )
+        return [uid for _, uid in sorted(test_case_sets.items())]
+
+    def get_test_case_uids(self, test_case_set_uid: str) -> List[str]:
+        return [
+            row[0]
+            for row in self.connection.execute(
+                "SELECT uid FROM test_cases WHERE test_case_set_uid = ? ORDER BY position",
+                (test_case_set_uid,),
+            )
+        ]
+
+    def get_test_case_tags(self, test_case_uids: List[str]) -> Dict[str, Tuple[List[str], List[str]]]:
+        """Returns the keywords and UDF tags of the given test cases."""
+        tags: Dict[str, Tuple[List[str], List[str]]] = {uid: ([], []) for uid in test_case_uids}
+        for uid, kind, tag in self._select_in(
+            "SELECT test_case_uid, kind, tag FROM test_case_tags WHERE test_case_uid IN ({})",
+            test_case_uids,
+        ):
+            tags[uid][0 if kind == TAG_KIND_KEYWORD else 1].append(tag)
+        return tags
+
+    def find_test_cases_using_interaction(self, interaction: str) -> List[str]:
+        """Returns the test cases calling an interaction, given by uniqueID, name or path."""
+        return [
+            row[0]
+            for row in self.connection.execute(
+                "SELECT DISTINCT test_case_uid FROM interaction_usage "
+                "WHERE interaction_uid = ? OR name = ? OR path = ? ORDER BY test_case_uid",
+                (interaction, interaction, interaction),
+            )
+        ]
+
+    def find_test_cases_with_parameter_value(self, name: str, value: str) -> List[str]:
+        return [
+            row[0]
+            for row in self.connection.execute(
+                "SELECT DISTINCT test_case_uid FROM parameter_values "
+                "WHERE name = ? AND value = ? ORDER BY test_case_uid",
+                (name, value),
+            )
+        ]
+
+    def select_test_case_sets(self, selection: Selection) -> List[str]:
+        return self.get_test_case_set_uids_below(selection.uids, selection.numberings)
+
+    def select_test_cases(self, selection: Selection, test_case_set_uid: str) -> List[str]:
+        test_case_uids = self.get_test_case_uids(test_case_set_uid)
+        if not selection.filters_test_cases:
+            return test_case_uids
+        tags = self.get_test_case_tags(test_case_uids)
+        return [uid for uid in test_case_uids if selection.selects_tags(*tags[uid])]
+
+    def _select_in(self, query: str, values: List[str], chunk_size: int = 500):
+        for start in range(0, len(values), chunk_size):
+            chunk = values[start : start + chunk_size]
+            yield from self.connection.execute(
+                query.format(", ".join("?" * len(chunk))), chunk
+            )
+
+
+def merge_intervals(intervals: Iterable[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Merges overlapping and adjacent closed intervals."""
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(end, merged[-1][1]))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def build_report_index(
+    json_dir: str, index_path: Path, stat_fingerprint: str, content_fingerprint: str
+) -> None:
+    temporary_path = index_path.with_name(f"{index_path.name}.{os.getpid()}.tmp")
+    temporary_path.unlink(missing_ok=True)
+    connection = sqlite3.connect(str(temporary_path))
+    try:
+        connection.executescript(INDEX_SCHEMA)
+        with connection:
+            _insert_report(connection, json_dir)
+            connection.executemany(
+                "INSERT INTO meta VALUES (?, ?)",
+                [
+                    (STAT_FINGERPRINT, stat_fingerprint),
+                    (CONTENT_FINGERPRINT, content_fingerprint),
+                    ("schemaVersion", str(INDEX_SCHEMA_VERSION)),
+                ],
+            )
+    finally:
+        connection.close()
+    os.replace(temporary_path, index_path)
+    logger.info(f"Report index written to '{index_path}'.")
+
+
+def _insert_report(connection: sqlite3.Connection, json_dir: str) -> None:
+    tree = read_json(str(Path(json_dir, TEST_STRUCTURE_TREE_FILE))) or {}
+    nodes = [tree["root"], *tree.get("nodes", [])] if tree.get("root") else []
+    tree_arrays = ArrayTree.from_dict(tree) if nodes else None
+    indexed_test_cases = set()
+    for position, node in enumerate(nodes):
+        base = node.get("base", {})
+        uid = base.get("uniqueID", "")
+        preorder = preorder_end = None
+        if tree_arrays.preorder_position[position] != NO_PARENT:
+            preorder = tree_arrays.preorder_position[position]
+            preorder_end = preorder + tree_arrays.subtree_size[position] - 1
+        connection.execute(
+            "INSERT OR REPLACE INTO nodes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                uid,
+                base.get("key"),
+                base.get("parentKey"),
+                base.get("numbering"),
+                base.get("name"),
+                node.get("elementType"),
+                position,
+                preorder,
+                preorder_end,
+            ),
+        )
+        if node.get("elementType") != TestStructureElementType.TestCaseSetNode.value:
+            continue
+        test_case_set = read_json(str(Path(json_dir, f"{uid}.json"))) or {}
+        for test_case_position, test_case in enumerate(test_case_set.get("testCases", [])):
+            test_case_uid = test_case.get("uniqueID")
+            connection.execute(
+                "INSERT OR REPLACE INTO test_cases VALUES (?, ?, ?)",
+                (test_case_uid, uid, test_case_position),
+            )
+            if test_case_uid not in indexed_test_cases:
+                indexed_test_cases.add(test_case_uid)
+                _insert_test_case(connection, json_dir, test_case_uid)
+
+
+def _insert_test_case(connection: sqlite3.Connection, json_dir: str, uid: str) -> None:
+    test_case = read_json(str(Path(json_dir, f"{uid}.json")))
+    if test_case is None:
+        return
+    spec = test_case.get("spec") or {}
+    tags = [(uid, TAG_KIND_KEYWORD, keyword.get("name")) for keyword in spec.get("keywords", [])]
+    for udf in spec.get("udfs", []):
+        robot_tag = UserDefinedField.from_dict(udf).robot_tag
+        if robot_tag:
+            tags.append((uid, TAG_KIND_UDF, robot_tag))
+    connection.executemany("INSERT INTO test_case_tags VALUES (?, ?, ?)", tags)
+    usages, parameters = [], []
+    pending = list(test_case.get("interactions", []))
+    while pending:
+        interaction = pending.pop()
+        interaction_uid = interaction.get("uniqueID")
+        usages.append(
+            (
+                uid,
+                interaction_uid,
+                interaction.get("name"),
+                interaction.get("path"),
+                interaction.get("interactionType"),
+            )
+        )
+        parameters.extend(
+            (uid, interaction_uid, parameter.get("name"), parameter.get("value"))
+            for parameter in interaction.get("parameters", [])
+        )
+        pending.extend(interaction.get("interactions", []))
+    connection.executemany("INSERT INTO interaction_usage VALUES (?, ?, ?, ?, ?)", usages)
+    connection.executemany("INSERT INTO parameter_values VALUES (?, ?, ?, ?)", parameters)
@@ -0,0 +1,76 @@
+from typing import Dict, List, Tuple
+
+from robot.api import ExecutionResult
+from robot.result import Result, TestCase, TestSuite
+
+from .log import logger
+from .profiling import profiler
+from .result_writer import OutputXmlKey, get_output_xml_key, get_suite_key, get_test_chain
+
+TestKey = Tuple[str, int]
+
+
+def merge_output_xmls(
+    output_xmls: List[str], phase_pattern: str
+) -> Tuple[Result, Dict[OutputXmlKey, str]]:
+    """Merges several output.xml files into one in-memory result.
+
+    The files are parsed one after another and merged into the result of the first
+    file at test case granularity: a test of a later file replaces the test with the
+    same name in the same suite, i.e. the last result wins. Split phases of a test
+    case are replaced one by one and kept in phase order, so that the phase chains
+    stay complete for the ``ResultWriter``.
+
+    Also returns the output.xml of every test taken from a later file, keyed by
+    :func:`get_output_xml_key`. All other tests come from the first file.
+    """
+    test_output_xmls: Dict[OutputXmlKey, str] = {}
+    with profiler.phase("load output xml"):
+        merged = ExecutionResult(output_xmls[0])
+    for output_xml in output_xmls[1:]:
+        with profiler.phase("load output xml"):
+            result = ExecutionResult(output_xml)
+        with profiler.phase("merge output xml"):
+            for test in result.suite.all_tests:
+                test_output_xmls[get_output_xml_key(test)] = output_xml
+            merge_suite(merged.suite, result.suite, phase_pattern)
+        logger.debug(f"Merged results of '{output_xml}'.")
+    return merged, test_output_xmls
+
+
+def merge_suite(target: TestSuite, source: TestSuite, phase_pattern: str) -> None:
+    if source.tests:
+        _merge_tests(target, source, phase_pattern)
+    target_suites = {get_suite_key(suite): suite for suite in target.suites}
+    for suite in list(source.suites):
+        target_suite = target_suites.get(get_suite_key(suite))
+        if target_suite is None:
+            target.suites.append(suite)
+        else:
+            merge_suite(target_suite, suite, phase_pattern)
+
+
+def _get_test_key(test: TestCase, phase_pattern: str) -> TestKey:
+    test_chain = get_test_chain(test.name, phase_pattern)
+    if test_chain:
+        return test_chain.name, test_chain.index
+    return test.name, 0
+
+
+def _merge_tests(target: TestSuite, source: TestSuite, phase_pattern: str) -> None:
+    keyed_tests: List[Tuple[TestKey, TestCase]] = [
+        (_get_test_key(test, phase_pattern), test) for test in target.tests
+    ]
+    positions: Dict[TestKey, int] = {key: position for position, (key, _) in enumerate(keyed_tests)}
+    for test in source.tests:
+        key = _get_test_key(test, phase_pattern)
+        if key in positions:
+            keyed_tests[positions[key]] = (key, test)
+        else:
+            positions[key] = len(keyed_tests)
+            keyed_tests.append((key, test))
+    group_positions: Dict[str, int] = {}
+    for (name, _), _ in keyed_tests:
+        group_positions.setdefault(name, len(group_positions))
+    keyed_tests.sort(key=lambda keyed_test: (group_positions[keyed_test[0][0]], keyed_test[0][1]))
+    target.tests = [test for _, test in keyed_tests]
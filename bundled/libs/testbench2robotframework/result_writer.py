@@ -1,21 +1,48 @@
 import html
 import os
 import re
-import shutil
 import tempfile
 import uuid
-from datetime import datetime, timedelta, timezone
+from datetime import timedelta
 from pathlib import Path
 from shutil import copytree
-from typing import Dict, List, Optional, Union
+from typing import Dict, List, Optional, Tuple, Union
 from urllib.parse import unquote
 
+from robot.api import get_resource_model
+from robot.parsing.model.blocks import Keyword as KeywordDefinition
+from robot.parsing.model.statements import KeywordCall
 from robot.result import Keyword, ResultVisitor, TestCase, TestSuite
-from robot.result.model import Body
 
 from .config import AttachmentConflictBehaviour, Configuration, ReferenceBehaviour
+from .generated_keywords import (
+    HOISTED_KEYWORD_PREFIX,
+    HOISTED_RESOURCE,
+    SHARED_SETUP_PREFIX,
+    SHARED_TEARDOWN_PREFIX,
+)
+from .html_comments import (
+    KEYWORD_COMMENT_TEMPLATE,
+    MESSAGE_ROW_TEMPLATE,
+    ROW_SEPARATOR,
+    SUITE_COMMENT_TEMPLATE,
+    SUITE_ROW_TEMPLATE,
+    TEST_COMMENT_TEMPLATE,
+    TEST_PHASE_COMMENT_TEMPLATE,
+    TRUNCATED_PHASES_TEMPLATE,
+    TRUNCATED_TESTS_ROW_TEMPLATE,
+    BoundedHtmlBuilder,
+    escape_within,
+    render_message_rows,
+    truncate_text,
+)
+from .html_comments import render_status as render_status_style
+from .incremental_import import IncrementalImport, patch_result_zip
+from .io_engine import IoEngine
 from .json_reader import TestBenchJsonReader
-from .json_writer import write_main_protocol, write_test_structure_element
+from .json_writer import GroupCommitWriter, write_main_protocol, write_test_structure_element
+from .keyword_alignment import Alignment, align_keywords, normalize_keyword_name
+from .listener_sink import ListenerProtocolSink
 from .log import logger
 from .model import (
     ActivityStatus,
@@ -36,39 +63,45 @@ from .model import (
     TestCaseExecutionDetails,
     VerdictStatus,
 )
+from .profiling import profiler
+from .timestamps import (
+    DATE_TIME_FORMAT,
+    TIME_FORMAT,
+    format_robot_timestamp,
+    format_utc_timestamp,
+)
 from .utils import directory_to_zip, ensure_dir_exists, get_directory
 
-BACKGROUND_COLOR = {
-    "PASS": "#04AF91",
-    "FAIL": "#ce3e01",
-    "ERROR": "#ce3e01",
-    "SKIP": "#F3E96A",
-    "WARN": "#D48627",
-    "INFO": "#ddd",
-}
-COLOR = {
-    "PASS": "#fff",
-    "FAIL": "#fff",
-    "ERROR": "#fff",
-    "SKIP": "#000",
-    "WARN": "#fff",
-    "INFO": "#000",
-}
-
 MEGABYTE = 1000 * 1000
+OutputXmlKey = Tuple[str, str]
+
+
+def read_hoisted_keyword_calls(resource: Path) -> Dict[str, List[str]]:
+    """Returns the names of the keywords called by every hoisted keyword of ``resource``."""
+    return {
+        keyword.name: [
+            statement.keyword for statement in keyword.body if isinstance(statement, KeywordCall)
+        ]
+        for section in get_resource_model(resource).sections
+        for keyword in section.body
+        if isinstance(keyword, KeywordDefinition)
+    }
 
 
 class ResultWriter(ResultVisitor):
     def __init__(
-        self, json_report: str, json_result: Optional[str], config: Configuration, output_xml, listener_uid=None
+        self,
+        json_report: str,
+        json_result: Optional[str],
+        config: Configuration,
+        output_xml,
+        listener_uid=None,
+        incremental: bool = False,
+        test_output_xmls: Optional[Dict[OutputXmlKey, str]] = None,
     ) -> None:
         self.listener_uid = listener_uid
         self.json_dir = get_directory(json_report)
-        self.output_xml = output_xml
-        self.reference_behaviour = config.referenceBehaviour
-        self.attachment_conflict_behaviour = config.attachmentConflictBehaviour
         self.tempdir = tempfile.TemporaryDirectory(dir=os.curdir)
-        self._test_setup_passed: Optional[bool] = None
         if json_result is None:
             self.json_result = self.json_dir
             self.json_result_path = self.json_dir
@@ -77,9 +110,53 @@ class ResultWriter(ResultVisitor):
             self.create_zip = bool(Path(json_result).suffix == ".zip")
             self.json_result_path = str(Path(json_result).parent / Path(json_result).stem)
             self.json_result = self.tempdir.name
-            if self.create_zip:
-                copytree(self.json_dir, self.json_result, dirs_exist_ok=True)
+        self._init_mapping_state(config, output_xml, test_output_xmls)
+        if incremental:
+            self.incremental_import = IncrementalImport.open(self.json_result_path, self.create_zip)
+        if self.json_result != self.json_dir and self.create_zip and not self.is_patching_result:
+            copytree(self.json_dir, self.json_result, dirs_exist_ok=True)
+        if listener_uid:
+            self.listener_sink = ListenerProtocolSink(
+                self.json_dir, self.json_result, self.json_result_path, listener_uid
+            )
+
+    @classmethod
+    def for_shard(
+        cls,
+        json_dir: str,
+        json_result: str,
+        config: Configuration,
+        output_xml,
+        test_output_xmls: Optional[Dict[OutputXmlKey, str]] = None,
+    ) -> "ResultWriter":
+        """Creates a writer that only maps test case sets into ``json_result``.
+
+        Used by worker processes of a parallel import; collecting the protocol and
+        writing the test theme tree is left to the writer of the main process.
+        """
+        result_writer = cls.__new__(cls)
+        result_writer.listener_uid = None
+        result_writer.json_dir = json_dir
+        result_writer.json_result = json_result
+        result_writer._init_mapping_state(config, output_xml, test_output_xmls)
+        return result_writer
+
+    def _init_mapping_state(
+        self,
+        config: Configuration,
+        output_xml,
+        test_output_xmls: Optional[Dict[OutputXmlKey, str]] = None,
+    ):
+        self.output_xml = output_xml
+        self.test_output_xmls = test_output_xmls or {}
+        self.reference_behaviour = config.referenceBehaviour
+        self.attachment_conflict_behaviour = config.attachmentConflictBehaviour
+        self.max_keyword_comment_size = config.maxKeywordCommentSize
+        self.max_test_comment_size = config.maxTestCommentSize
+        self._test_setup_passed: Optional[bool] = None
         self.json_reader = TestBenchJsonReader(self.json_dir)
+        self.io_engine = IoEngine.from_config(config.ioEngine)
+        self.result_files = GroupCommitWriter.from_config(config.resultWriter, self.io_engine)
         self.attachments_path = Path(self.json_result, "attachments")
         # if self.attachments_path.exists():  TODO: RR Sollten wir löschen????
         #     shutil.rmtree(self.attachments_path)
@@ -87,14 +164,26 @@ class ResultWriter(ResultVisitor):
         self.test_suites: Dict[str, TestSuite] = {}
         self.keywords: List[Keyword] = []
         self.itb_test_case_catalog: Dict[str, TestCaseDetails] = {}
+        self.mapped_test_cases = 0
         self.phase_pattern = config.phasePattern
         self.test_chain: List[TestCase] = []
         self.main_protocol = MainProtocol.from_list([])
+        self.listener_sink: Optional[ListenerProtocolSink] = None
+        self.incremental_import: Optional[IncrementalImport] = None
+        self.written_files: List[Path] = []
+        self.suite_changed = False
+        self.hoisted_keyword_calls: Dict[Path, Dict[str, List[str]]] = {}
+
+    @property
+    def is_patching_result(self) -> bool:
+        return self.incremental_import is not None and self.incremental_import.has_previous_result
 
     def start_suite(self, suite: TestSuite):
         if suite.metadata:
             self.test_suites[suite.metadata["uniqueID"]] = suite
         self.protocol_test_cases: list[ProtocolTestCaseExecutionSummary] = []
+        self.suite_result_files: List[Path] = []
+        self.suite_changed = False
 
     def _get_interactions_by_type(
         self, interactions: List[InteractionDetails], interaction_type: InteractionType
@@ -113,6 +202,10 @@ class ResultWriter(ResultVisitor):
             self._propergate_sequence_phase(child, sequence_phase)
 
     def end_test(self, test: TestCase):
+        with profiler.phase("map test results"):
+            self._write_test_result(test)
+
+    def _write_test_result(self, test: TestCase):
         self._test_setup_passed = None
         test_chain = get_test_chain(test.name, self.phase_pattern)
         if test_chain:
@@ -126,6 +219,16 @@ class ResultWriter(ResultVisitor):
             self.test_chain = [test]
 
         test_uid = test_chain.name if test_chain else test.name
+        if self.incremental_import and self.incremental_import.is_unchanged(
+            test_uid, self.test_chain
+        ):
+            self.protocol_test_cases.append(
+                self.incremental_import.get_previous_test_protocol(test_uid)
+            )
+            return
+        self.suite_changed = True
+        if self.json_result == self.json_dir:
+            self.result_files.flush_if_pending(Path(self.json_result, f"{test_uid}.json"))
         itb_test_case = self.json_reader.read_test_case(test_uid)  # TODO What if name != UID
         for interaction in itb_test_case.interactions:
             self._propergate_sequence_phase(interaction, interaction.spec.sequencePhase)
@@ -159,8 +262,13 @@ class ResultWriter(ResultVisitor):
                 "to the given Robot Framework testcase."
             )
         self.itb_test_case_catalog[test_uid] = itb_test_case
+        self.mapped_test_cases += 1
+        profiler.count("tests read", len(self.test_chain))
         self.protocol_test_cases.append(self.protocol_test_case)
-        write_test_structure_element(self.json_result, itb_test_case)
+        self.suite_result_files.append(
+            write_test_structure_element(self.json_result, itb_test_case, self.result_files)
+        )
+        self.written_files.append(self.suite_result_files[-1])
         logger.debug(
             f"Successfully wrote the result from test "
             f"{itb_test_case.uniqueID} to TestBench's Json Report."
@@ -170,17 +278,20 @@ class ResultWriter(ResultVisitor):
         self, itb_test_case: TestCaseDetails, test_chain: List[TestCase]
     ):
         for test in test_chain:
-            itb_references = self._get_itb_reference(test.message)
+            itb_references = self._get_itb_reference(test.message, self._get_output_dir(test))
             for reference in itb_references:
                 if reference not in itb_test_case.exec.references:
                     itb_test_case.exec.references.append(reference)
 
-    def _get_itb_reference(self, test_message: str) -> List[Reference]:
+    def _get_output_dir(self, test: TestCase) -> Path:
+        """Returns the directory of the output.xml the result of ``test`` was read from."""
+        return Path(self.test_output_xmls.get(get_output_xml_key(test), self.output_xml)).parent
+
+    def _get_itb_reference(self, test_message: str, output_dir: Path) -> List[Reference]:
         references = []
         for path in re.findall(r"itb-reference:\s*(\S*)", test_message):
             if path.startswith("file:///"):
                 file_path = Path(unquote(path[len("file:///") :]))
-                output_dir = Path(self.output_xml).parent
                 if file_path.exists():
                     reference_path = file_path
                 elif Path(output_dir, file_path).exists():
@@ -222,16 +333,16 @@ class ResultWriter(ResultVisitor):
         ensure_dir_exists(self.attachments_path)
         filename = Path(filepath).name
         if (
-            not Path(self.attachments_path, filename).exists()
+            not self._attachment_exists(self.attachments_path / filename)
             or self.attachment_conflict_behaviour == AttachmentConflictBehaviour.USE_NEW
         ):
-            shutil.copyfile(filepath, self.attachments_path / filename, follow_symlinks=True)
+            self.io_engine.copy_file(filepath, self.attachments_path / filename)
             return Reference(ReferenceType.Attachment, f"attachments/{filename}")
         if self.attachment_conflict_behaviour == AttachmentConflictBehaviour.USE_EXISTING:
             return Reference(ReferenceType.Attachment, f"attachments/{filename}")
         if self.attachment_conflict_behaviour == AttachmentConflictBehaviour.RENAME_NEW:
             unique_path = self._create_unique_path(self.attachments_path / filename)
-            shutil.copyfile(filepath, unique_path, follow_symlinks=True)
+            self.io_engine.copy_file(filepath, unique_path)
             unique_file = Path(unique_path).name
             logger.info(
                 f"Attachment '{filename}' does already exist. "
@@ -243,11 +354,13 @@ class ResultWriter(ResultVisitor):
             return None
         return None
 
-    @staticmethod
-    def _create_unique_path(attachement_path: Path) -> Path:
+    def _attachment_exists(self, attachment_path: Path) -> bool:
+        return self.io_engine.is_pending(attachment_path) or attachment_path.exists()
+
+    def _create_unique_path(self, attachement_path: Path) -> Path:
         counter = 1
         attachment_stem = attachement_path.stem
-        while attachement_path.exists():
+        while self._attachment_exists(attachement_path):
             attachement_path = Path(
                 f"{attachement_path.parent}",
                 f"{attachment_stem}_{counter}{attachement_path.suffix}",
@@ -255,15 +368,26 @@ class ResultWriter(ResultVisitor):
             counter += 1
         return attachement_path
 
+    @staticmethod
+    def _render_test_message(message: str, budget: int, line_break: str = "<br/>") -> str:
+        """Renders a test message for the test and test case set comments.
+
+        ``*HTML*`` messages are kept as markup if they fit into ``budget``, all other
+        messages are cut to the budget and escaped.
+        """
+        if message.startswith("*HTML*") and (not budget or len(message) <= budget):
+            return (
+                message[len("*HTML*") :]
+                .replace("<hr>", line_break)
+                .replace("<br>", line_break)
+                .strip()
+            )
+        return escape_within(message, budget)
+
     def _set_itb_testcase_execution_comment(self, itb_test_case, test_chain: List[TestCase]):
-        exec_comments = []
+        exec_comments = BoundedHtmlBuilder(self.max_test_comment_size)
         for test in test_chain:
             message = re.sub(r"\s*itb-reference:\s*(\S*)", "", test.message)
-            html_message = (
-                message[len("*HTML*") :].replace("<hr>", "<br/>").replace("<br>", "<br/>").strip()
-                if test.message.startswith("*HTML*")
-                else html.escape(message)
-            )
             test_chain_obj = get_test_chain(test.name, self.phase_pattern)
             test_phase_name = (
                 f"<b>Phase {test_chain_obj.index}/{test_chain_obj.length} : "
@@ -271,23 +395,30 @@ class ResultWriter(ResultVisitor):
                 if test_chain_obj
                 else f"<b><span {self.render_status(test.status)}>{test.status}</span></b>"
             )
-            exec_comment = (
-                f"{test_phase_name}"
-                "<pre>"
-                f"Start Time:   {self.get_isotime_from_robot_timestamp(test.starttime)}\n"
-                f"End Time:     {self.get_isotime_from_robot_timestamp(test.endtime)}\n"
-                f"Elapsed Time: {timedelta(milliseconds=test.elapsedtime)!s}\n"
-                "</pre>"
-                f"Message: <p><pre>{html_message}</pre></p>\n"
+            phase_comment = {
+                "phase_name": test_phase_name,
+                "start_time": self.get_isotime_from_robot_timestamp(test.starttime),
+                "end_time": self.get_isotime_from_robot_timestamp(test.endtime),
+                "elapsed_time": str(timedelta(milliseconds=test.elapsedtime)),
+            }
+            message_budget = 0
+            if self.max_test_comment_size:
+                frame_size = len(TEST_PHASE_COMMENT_TEMPLATE(message="", **phase_comment))
+                message_budget = max(exec_comments.remaining - frame_size, 1)
+            html_message = self._render_test_message(message, message_budget)
+            if not exec_comments.add(
+                TEST_PHASE_COMMENT_TEMPLATE(message=html_message, **phase_comment)
+            ):
+                break
+        if exec_comments.truncated:
+            exec_comments.fragments.append(
+                TRUNCATED_PHASES_TEMPLATE(budget=self.max_test_comment_size)
             )
-            exec_comments.append(exec_comment)
-        itb_test_case.exec.comments = f"<html><body>{''.join(exec_comments)}</body></html>"
-        self.protocol_test_case.comments = ProtocolComments(
-            html=f"<html><body>{''.join(exec_comments)}</body></html>"
-        )
-        end_time=test.end_time.replace(tzinfo=timezone(datetime.now(timezone.utc).astimezone().utcoffset()))
+        comments = TEST_COMMENT_TEMPLATE(comments=exec_comments.build())
+        itb_test_case.exec.comments = comments
+        self.protocol_test_case.comments = ProtocolComments(html=comments)
         # self.protocol_test_case.result.timestamp = end_time.isoformat() # Isoformat currently not suported by server
-        self.protocol_test_case.result.timestamp = f"{end_time.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3]}Z"
+        self.protocol_test_case.result.timestamp = format_utc_timestamp(test.end_time)
         self.protocol_test_case.durationMillis = test.elapsedtime
 
     def _set_itb_testcase_execution_result(self, itb_test_case, test_chain):
@@ -306,40 +437,88 @@ class ResultWriter(ResultVisitor):
             protocol_result = self._set_itb_test_case_status(itb_test_case, "undef")
             self.protocol_test_case.result = protocol_result
 
-    def _get_test_phase_body(self, test_phase: TestCase) -> Body:
-        return test_phase.body
+    def _get_test_phase_body(self, test_phase: TestCase) -> List[Keyword]:
+        """Returns the test body with calls of hoisted keywords replaced by their body."""
+        test_phase_body = []
+        for keyword in test_phase.body:
+            keyword_name = getattr(keyword, "kwname", None) or getattr(keyword, "name", "")
+            if isinstance(keyword, Keyword) and keyword_name.startswith(HOISTED_KEYWORD_PREFIX):
+                test_phase_body.extend(
+                    self._get_hoisted_keyword_body(keyword, keyword_name, test_phase.source)
+                )
+            else:
+                test_phase_body.append(keyword)
+        return test_phase_body
+
+    def _get_hoisted_keyword_body(
+        self, keyword: Keyword, keyword_name: str, source
+    ) -> List[Keyword]:
+        """Returns the calls of a hoisted keyword.
+
+        A hoisted keyword that was not run has no body in the result, its calls are then
+        read from the generated resource and reported with the status of the keyword.
+        """
+        keyword_body = [kw for kw in keyword.body if isinstance(kw, Keyword) and kw.parent is keyword]
+        if keyword_body:
+            return keyword_body
+        calls = self._get_hoisted_keyword_calls(source).get(keyword_name)
+        if calls is None:
+            logger.warning(f"Calls of hoisted keyword '{keyword_name}' not found.")
+            return []
+        return [keyword.copy(name=call, body=[]) for call in calls]
+
+    def _get_hoisted_keyword_calls(self, source) -> Dict[str, List[str]]:
+        """Returns the calls of the hoisted keywords in the resource next to ``source``.
+
+        The resource is searched from the directory of the suite upwards and parsed once.
+        """
+        if not source:
+            return {}
+        directory = Path(source).parent
+        if directory not in self.hoisted_keyword_calls:
+            resource = next(
+                (
+                    path / HOISTED_RESOURCE
+                    for path in (directory, *directory.parents)
+                    if (path / HOISTED_RESOURCE).is_file()
+                ),
+                None,
+            )
+            self.hoisted_keyword_calls[directory] = (
+                read_hoisted_keyword_calls(resource) if resource else {}
+            )
+        return self.hoisted_keyword_calls[directory]
 
     def _get_test_phase_setup(self, test_phase: TestCase) -> List[Keyword]:
         test_phase_setup = []
         if test_phase.has_setup and test_phase.setup:
             self._test_setup_passed = test_phase.setup.passed
-            if test_phase.setup.name == f"Setup-{test_phase.name}":
-                test_phase_setup = list(
-                    filter(
-                        lambda kw: isinstance(kw, Keyword)
-                        and kw.parent.name == f"Setup-{test_phase.name}",
-                        test_phase.setup.body,
-                    )
-                )
-            else:
-                test_phase_setup = [test_phase.setup]
+            test_phase_setup = self._get_generated_keyword_body(
+                test_phase.setup, f"Setup-{test_phase.name}", SHARED_SETUP_PREFIX
+            )
         return test_phase_setup
 
     def _get_test_phase_teardown(self, test_phase: TestCase) -> List[Keyword]:
         test_phase_teardown = []
         if test_phase.has_teardown and test_phase.teardown:
-            if test_phase.teardown.name == f"Teardown-{test_phase.name}":
-                test_phase_teardown = list(
-                    filter(
-                        lambda kw: isinstance(kw, Keyword)
-                        and kw.parent.name == f"Teardown-{test_phase.name}",
-                        test_phase.teardown.body,
-                    )
-                )
-            else:
-                test_phase_teardown = [test_phase.teardown]
+            test_phase_teardown = self._get_generated_keyword_body(
+                test_phase.teardown, f"Teardown-{test_phase.name}", SHARED_TEARDOWN_PREFIX
+            )
         return test_phase_teardown
 
+    @staticmethod
+    def _get_generated_keyword_body(
+        keyword: Keyword, test_keyword_name: str, shared_prefix: str
+    ) -> List[Keyword]:
+        """Returns the interaction keywords of a generated setup or teardown keyword.
+
+        Setups and teardowns with more than one interaction call a keyword that is
+        named after the test or, if shared by several tests, after its content.
+        """
+        if keyword.name != test_keyword_name and not keyword.name.startswith(shared_prefix):
+            return [keyword]
+        return [kw for kw in keyword.body if isinstance(kw, Keyword) and kw.parent is keyword]
+
     def _set_atomic_interactions_execution_result(
         self, atomic_interactions: List[InteractionDetails], test_chain: List[TestCase]
     ):
@@ -382,15 +561,27 @@ class ResultWriter(ResultVisitor):
         test_chain_body: List[Keyword],
         sequence_phase: SequencePhase,
     ):
-        for index, interaction in enumerate(interaction_list):
+        keyword_indices: List[Optional[int]] = [None] * len(interaction_list)
+        if interaction_list and (
+            sequence_phase != SequencePhase.TestStep or self._test_setup_passed
+        ):
+            alignment = align_keywords(
+                [interaction.name for interaction in interaction_list],
+                [getattr(keyword, "kwname", None) or "" for keyword in test_chain_body],
+            )
+            if not alignment.is_exact:
+                self._warn_about_keyword_drift(
+                    alignment, interaction_list, test_chain_body, sequence_phase
+                )
+            keyword_indices = alignment.keyword_indices
+        for interaction, keyword_index in zip(interaction_list, keyword_indices):
             if interaction.exec is None:
                 interaction.exec = InteractionExecutionSummary.from_dict({})
             if sequence_phase == SequencePhase.TestStep and not self._test_setup_passed:
                 interaction.exec.verdict = InteractionVerdict.Skipped
                 continue
-            if index < len(test_chain_body):
-                keyword = test_chain_body[index]
-                self._check_matching_interaction_and_keyword_name(keyword, interaction)
+            if keyword_index is not None:
+                keyword = test_chain_body[keyword_index]
                 interaction.exec = self._get_interaction_exec_from_keyword(keyword)
                 continue
             if sequence_phase == SequencePhase.Setup and not self._test_setup_passed:
@@ -398,6 +589,32 @@ class ResultWriter(ResultVisitor):
                 continue
             interaction.exec.verdict = InteractionVerdict.Undefined
 
+    def _warn_about_keyword_drift(
+        self,
+        alignment: Alignment,
+        interaction_list: List[InteractionDetails],
+        test_chain_body: List[Keyword],
+        sequence_phase: SequencePhase,
+    ) -> None:
+        test_case = self.protocol_test_case.uniqueID
+        if alignment.extra_keywords:
+            keyword_names = [
+                getattr(keyword, "kwname", None) or type(keyword).__name__
+                for keyword in (test_chain_body[index] for index in alignment.extra_keywords)
+            ]
+            logger.warning(
+                f"{sequence_phase} of test case {test_case}: the keywords {keyword_names} "
+                f"do not match any interaction and are ignored."
+            )
+        if alignment.missing_interactions:
+            interaction_names = [
+                interaction_list[index].name for index in alignment.missing_interactions
+            ]
+            logger.warning(
+                f"{sequence_phase} of test case {test_case}: no keyword was found for the "
+                f"interactions {interaction_names}."
+            )
+
     def _filter_atomic_interactions_by_sequence_phase(
         self, atomic_interactions: List[InteractionDetails], sequence_phase: SequencePhase
     ):
@@ -409,8 +626,7 @@ class ResultWriter(ResultVisitor):
         )
 
     def _get_interaction_exec_from_keyword(self, keyword: Keyword) -> InteractionExecutionSummary:
-        end_time=keyword.end_time.replace(tzinfo=timezone(datetime.now(timezone.utc).astimezone().utcoffset()))
-
+        profiler.count("keywords mapped")
         return InteractionExecutionSummary.from_dict(
             {
                 'verdict': self._get_interaction_result(keyword.status),
@@ -420,18 +636,6 @@ class ResultWriter(ResultVisitor):
             }
         )
 
-    def _check_matching_interaction_and_keyword_name(
-        self, keyword: Keyword, interaction: InteractionDetails
-    ) -> None:
-        if not is_normalized_equal(keyword.kwname, interaction.name) and not is_normalized_equal(
-            keyword.kwname.split('.')[-1], interaction.name
-        ):
-            raise NameError(
-                f"Execution can not be parsed, "
-                f"because keyword name '{keyword.kwname}' does not match with "
-                f"interaction '{interaction.name}' name."
-            )
-
     def _get_keyword_messages(self, keyword: Keyword):
         if self.listener_uid:
             yield keyword.message
@@ -443,26 +647,13 @@ class ResultWriter(ResultVisitor):
                 yield from self._get_keyword_messages(kw)
 
     def get_html_keyword_comment(self, keyword: Keyword):
-        messages = list(self._get_keyword_messages(keyword))
-        return (
-            "<html>"
-            "<body>"
-            "<style>"
-            "td {padding: 5px; border: none;} "
-            "table {font-family: monospace; border: none;}"
-            "</style>"
-            "<pre>"
-            f"Start Time:   {self.get_isotime_from_robot_timestamp(keyword.starttime)}\n"
-            f"End Time:     {self.get_isotime_from_robot_timestamp(keyword.endtime)}\n"
-            f"Elapsed Time: {timedelta(milliseconds=keyword.elapsedtime)!s}\n"
-            "</pre>"
-            "<table>"
-            "<tr>"
-            f"{'</tr><tr>'.join(messages)}"
-            "</tr>"
-            "</table>"
-            "</body>"
-            "</html>"
+        return KEYWORD_COMMENT_TEMPLATE(
+            start_time=self.get_isotime_from_robot_timestamp(keyword.starttime),
+            end_time=self.get_isotime_from_robot_timestamp(keyword.endtime),
+            elapsed_time=str(timedelta(milliseconds=keyword.elapsedtime)),
+            rows=render_message_rows(
+                self._get_keyword_messages(keyword), self.max_keyword_comment_size
+            ),
         )
 
     def _create_itb_exec_comment(
@@ -470,24 +661,21 @@ class ResultWriter(ResultVisitor):
         message,
     ) -> str:  # Todo: low prio: pattern für message in config festlegen
         message_time = self.get_isotime_from_robot_timestamp(
-            message.timestamp, time_format="%H:%M:%S.%f"
+            message.timestamp, time_format=TIME_FORMAT
         )
         msg = message.html_message.replace("<hr>", "<br/>").replace("<br>", "<br/>").strip()
-        return (
-            f"<td {self.render_status(message.level)}><b>{message.level}</b></td>"
-            f"<td><pre>{msg}</pre></td><td>{message_time}</td>"
+        if self.max_keyword_comment_size and len(msg) > self.max_keyword_comment_size:
+            msg = html.escape(truncate_text(message.message, self.max_keyword_comment_size))
+        return MESSAGE_ROW_TEMPLATE(
+            style=self.render_status(message.level),
+            level=message.level,
+            message=msg,
+            time=message_time,
         )
 
     @staticmethod
-    def get_isotime_from_robot_timestamp(timestamp, time_format="%Y-%m-%d %H:%M:%S.%f"):
-        try:
-            return timestamp.astimezone().strftime(time_format)[:-3]
-        except AttributeError:
-            return (
-                datetime.strptime(timestamp, "%Y%m%d %H:%M:%S.%f")
-                .astimezone()
-                .strftime(time_format)[:-3]
-            )
+    def get_isotime_from_robot_timestamp(timestamp, time_format=DATE_TIME_FORMAT):
+        return format_robot_timestamp(timestamp, time_format)
 
     def _set_compound_interaction_execution_result(self, compound_interaction: InteractionDetails):
         atomic_interactions = list(
@@ -542,13 +730,28 @@ class ResultWriter(ResultVisitor):
     def end_suite(self, suite: TestSuite):
         if not suite.metadata.get("uniqueID") or len(suite.suites):
             return
+        with profiler.phase("map suite results"):
+            self._write_test_case_set_result(suite)
+
+    def _write_test_case_set_result(self, suite: TestSuite):
         test_case_set = self.json_reader.read_test_case_set(suite.metadata["uniqueID"])
         if not test_case_set:
             return
+        if self.incremental_import and not self.suite_changed:
+            previous_protocol = self.incremental_import.get_previous_test_case_set_protocol(
+                test_case_set.key
+            )
+            if previous_protocol is not None:
+                self.main_protocol.protocolTestCaseSetExecutionSummary.append(previous_protocol)
+                return
         test_case_set.exec.verdict = suite.status
 
         for testcase in test_case_set.testCases:
             current_itb_test_case = self.itb_test_case_catalog.get(testcase.uniqueID)
+            if current_itb_test_case is None and self.incremental_import:
+                current_itb_test_case = self.incremental_import.read_previous_test_case(
+                    testcase.uniqueID
+                )
             if current_itb_test_case is None:
                 continue
             testcase.exec.verdict = current_itb_test_case.exec.verdict
@@ -557,10 +760,11 @@ class ResultWriter(ResultVisitor):
             testcase.exec.comments = current_itb_test_case.exec.comments
         suite_start_time = "99999999 00:00:00.000"
         suite_end_time = "00000000 00:00:00.000"
-        table_content = []
         for test in suite.tests:
             suite_start_time = min(suite_start_time, test.starttime)
             suite_end_time = max(suite_end_time, test.endtime)
+        table_rows = BoundedHtmlBuilder(self.max_test_comment_size, ROW_SEPARATOR)
+        for test in suite.tests:
             test_chain = get_test_chain(test.name, self.phase_pattern)
 
             if test_chain:
@@ -571,45 +775,37 @@ class ResultWriter(ResultVisitor):
                 phase = ""
             if test.status != "PASS":
                 message = re.sub(r"\s*itb-reference:\s*(\S*)", "", test.message)
-                message = (
-                    message[len("*HTML*") :]
-                    .replace('<hr>', '<br />')
-                    .replace('<br>', '<br />')
-                    .strip()
-                    if message.startswith("*HTML*")
-                    else message
-                )
             else:
                 message = self.get_isotime_from_robot_timestamp(test.endtime)
-
-            table_content.append(
-                f"<td>{name}</td>"
-                f"<td>{phase}</td>"
-                f"<td {self.render_status(test.status)}><b>{test.status}</b></td>"
-                f"<td><pre>{message}</pre></td>"
+            row = {
+                "name": name,
+                "phase": phase,
+                "style": self.render_status(test.status),
+                "status": test.status,
+            }
+            message_budget = 0
+            if self.max_test_comment_size:
+                frame_size = len(SUITE_ROW_TEMPLATE(message="", **row)) + len(ROW_SEPARATOR)
+                message_budget = max(table_rows.remaining - frame_size, 1)
+            message = self._render_test_message(message, message_budget, line_break="<br />")
+            if not table_rows.add(SUITE_ROW_TEMPLATE(message=message, **row)):
+                break
+        if table_rows.truncated:
+            table_rows.fragments.append(
+                TRUNCATED_TESTS_ROW_TEMPLATE(
+                    count=len(table_rows.fragments), budget=self.max_test_comment_size
+                )
             )
 
-        test_case_set.exec.comments = (
-            "<html>"
-            "<head>"
-            "<style>"
-            "td {padding: 5px; border: none; white-space: pre-wrap;} "
-            "table {font-family: monospace; border: none;}"
-            "</style>"
-            "</head>"
-            "<body>"
-            "<pre>"
-            f"Start Time:   {self.get_isotime_from_robot_timestamp(suite_start_time)}\n"
-            f"End Time:     {self.get_isotime_from_robot_timestamp(suite_end_time)}\n"
-            "</pre>"
-            "<table>"
-            "<tr>"
-            f"{'</tr><tr>'.join(table_content)}"
-            "</tr>"
-            "</table>"
-            "</body>"
-            "</html>"
+        test_case_set.exec.comments = SUITE_COMMENT_TEMPLATE(
+            start_time=self.get_isotime_from_robot_timestamp(suite_start_time),
+            end_time=self.get_isotime_from_robot_timestamp(suite_end_time),
+            rows=table_rows.build(),
         )
+        if self.incremental_import:
+            self.protocol_test_cases = self.incremental_import.merge_test_protocols(
+                test_case_set.key, self.protocol_test_cases
+            )
         self.protocol_test_case_set = ProtocolTestCaseSetExecutionSummary(
             test_case_set.key,
             suite.elapsedtime,
@@ -618,38 +814,36 @@ class ResultWriter(ResultVisitor):
             ProtocolComments(html=test_case_set.exec.comments),
         )
         self.main_protocol.protocolTestCaseSetExecutionSummary.append(self.protocol_test_case_set)
-        write_test_structure_element(self.json_result, test_case_set)
+        self.suite_result_files.append(
+            write_test_structure_element(self.json_result, test_case_set, self.result_files)
+        )
+        self.written_files.append(self.suite_result_files[-1])
         logger.debug(
             f"Successfully wrote the result from suite "
             f"{test_case_set.uniqueID} to TestBench's Json Report."
         )
-        if self.listener_uid:
-            self.write_listener_mode_protocols()
-
-    def write_listener_mode_protocols(self):
-        write_main_protocol(
-                self.json_result, self.main_protocol.protocolTestCaseSetExecutionSummary
-            )
-        os.makedirs(Path(self.json_result_path)/self.listener_uid)
-        shutil.copy(Path(self.json_result)/"protocol.json", Path(self.json_result_path)/self.listener_uid/"protocol.json")
-        shutil.copy(Path(self.json_dir)/"project.json", Path(self.json_result_path)/self.listener_uid/"project.json")
-        for filename in os.listdir(self.json_result):
-            if filename.startswith(self.listener_uid) and filename.endswith(".json"):
-                shutil.copy(Path(self.json_result)/filename, Path(self.json_result_path)/self.listener_uid/filename)
-        directory_to_zip(Path(self.json_result_path)/self.listener_uid)
-        shutil.rmtree(Path(self.json_result_path)/self.listener_uid)
+        if self.listener_sink:
+            self.result_files.flush()
+            with profiler.phase("export listener results"):
+                self.listener_sink.add_test_case_set(
+                    self.protocol_test_case_set, self.suite_result_files
+                )
 
+    def close_listener_sink(self):
+        if self.listener_sink:
+            self.listener_sink.close()
+            self.listener_sink = None
 
     @staticmethod
     def render_status(status):
-        return (
-            "style='"
-            f"background-color: {BACKGROUND_COLOR.get(status, '#fff')}; "
-            f"color: {COLOR.get(status, '#000')};'"
-        )
+        return render_status_style(status)
 
     def end_result(self, result):
-        tt_tree = self.json_reader.read_test_theme_tree()
+        self.close_listener_sink()
+        tt_tree = None
+        if self.incremental_import:
+            tt_tree = self.incremental_import.read_previous_test_theme_tree()
+        tt_tree = tt_tree or self.json_reader.read_test_theme_tree()
         if tt_tree:
             test_suite_counter = 0
             for tse in [tt_tree.root, *tt_tree.nodes]:
@@ -661,23 +855,54 @@ class ResultWriter(ResultVisitor):
                 tse.exec.verdict = execution_result["execution_verdict"]
                 tse.exec.status = execution_result["activity_status"]
                 test_suite_counter += 1
-            write_test_structure_element(self.json_result, tt_tree)
-            write_main_protocol(
-                self.json_result, self.main_protocol.protocolTestCaseSetExecutionSummary
+            self.written_files.append(
+                write_test_structure_element(self.json_result, tt_tree, self.result_files)
             )
-            if test_suite_counter and self.itb_test_case_catalog:
+            protocol = self.main_protocol.protocolTestCaseSetExecutionSummary
+            if self.incremental_import:
+                protocol = self.incremental_import.merge_protocol(protocol)
+            with profiler.phase("write protocol"):
+                self.written_files.append(
+                    write_main_protocol(self.json_result, protocol, self.result_files)
+                )
+            self.result_files.close()
+            self.io_engine.close()
+            if test_suite_counter and (
+                self.mapped_test_cases
+                or (self.incremental_import and self.incremental_import.unchanged_tests)
+            ):
                 logger.info(f"Successfully read {test_suite_counter} test suites.")
             else:
                 logger.warning("No test suites with execution information found.")
-            if self.create_zip:
-                directory_to_zip(Path(self.json_result), self.json_result_path)
+            if self.incremental_import:
+                self.incremental_import.close()
+            if self.create_zip and self.is_patching_result:
+                with profiler.phase("patch result zip"):
+                    patch_result_zip(
+                        Path(f"{self.json_result_path}.zip"),
+                        Path(self.json_result),
+                        self._get_written_result_files(),
+                    )
+            elif self.create_zip:
+                with profiler.phase("zip results"):
+                    directory_to_zip(Path(self.json_result), self.json_result_path)
             elif self.json_result != self.json_result_path:
                 # if not self.create_zip:
-                copytree(self.json_dir, self.json_result_path, dirs_exist_ok=True)
-                copytree(self.json_result, self.json_result_path, dirs_exist_ok=True)
+                with profiler.phase("copy results"):
+                    if not self.is_patching_result:
+                        copytree(self.json_dir, self.json_result_path, dirs_exist_ok=True)
+                    copytree(self.json_result, self.json_result_path, dirs_exist_ok=True)
+            if self.incremental_import:
+                self.incremental_import.save(result.suite)
             self.tempdir.cleanup()
         logger.info(f"Successfully wrote the robot execution results to TestBench's Json Report: '{Path(self.json_result_path).absolute()}{self.create_zip*'.zip'}'")
 
+    def _get_written_result_files(self) -> List[Path]:
+        written_files = set(self.written_files)
+        if self.attachments_path.is_dir():
+            written_files.update(self.attachments_path.iterdir())
+        return sorted(written_files)
+
     @staticmethod
     def _get_execution_result(robot_status: str) -> Dict:
         robot_status = robot_status.lower()
@@ -708,6 +933,14 @@ class ResultWriter(ResultVisitor):
         return InteractionVerdict.Skipped
 
 
+def get_suite_key(suite: TestSuite) -> str:
+    return suite.metadata.get("uniqueID") or suite.name
+
+
+def get_output_xml_key(test: TestCase) -> OutputXmlKey:
+    return get_suite_key(test.parent), test.name
+
+
 class TestChain:
     def __init__(self, name, index, length):
         self.name = str(name)
@@ -741,10 +974,8 @@ def get_test_chain_pattern(phase_pattern: str) -> str:
 
 
 def get_normalized_keyword_name(keyword_name: str) -> str:
-    return re.sub(r"[\s_]", "", keyword_name.lower())
+    return normalize_keyword_name(keyword_name)
 
 
 def is_normalized_equal(kw_one: str, kw_two: str) -> bool:
-    norm_kw_one = get_normalized_keyword_name(kw_one)
-    norm_kw_two = get_normalized_keyword_name(kw_two)
-    return norm_kw_one == norm_kw_two
+    return normalize_keyword_name(kw_one) == normalize_keyword_name(kw_two)
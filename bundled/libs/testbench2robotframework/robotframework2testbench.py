@@ -1,29 +1,55 @@
 import sys
 from pathlib import Path
-from typing import Dict, Optional
-
-from robot.api import ExecutionResult
+from typing import Dict, List, Optional, Union
 
 from .config import Configuration
 from .log import logger, setup_logger
+from .parallel_reader import write_results_in_parallel
+from .profiling import profiler
+from .result_merger import merge_output_xmls, merge_suite
 from .result_writer import ResultWriter
 
 
 def robot2testbench(
     json_input_report: str,
-    robot_result_xml: str,
+    robot_result_xml: Union[str, List[str]],
     json_output_result: Optional[str] = None,
     config: Optional[Dict] = None,
+    jobs: int = 1,
+    incremental: bool = False,
 ):
     if not Path(json_input_report).exists():
         sys.exit("Could not find json directory or zip file at the given path.")
-    if not Path(robot_result_xml).exists():
-        sys.exit("Robot result xml does not exist at the given path.")
+    robot_result_xmls = (
+        [robot_result_xml] if isinstance(robot_result_xml, str) else list(robot_result_xml)
+    )
+    for output_xml in robot_result_xmls:
+        if not Path(output_xml).exists():
+            sys.exit(f"Robot result xml '{output_xml}' does not exist at the given path.")
     configuration = Configuration.from_dict(config)
     setup_logger(configuration)
     logger.debug("Config file loaded.")
-    result = ExecutionResult(robot_result_xml)
+    result, test_output_xmls = merge_output_xmls(robot_result_xmls, configuration.phasePattern)
     logger.debug("Robot framework result xml loaded.")
-    result.visit(
-        ResultWriter(json_input_report, json_output_result, configuration, robot_result_xml)
-    )
+    with profiler.phase("prepare result writer"):
+        result_writer = ResultWriter(
+            json_input_report,
+            json_output_result,
+            configuration,
+            robot_result_xmls[0],
+            incremental=incremental,
+            test_output_xmls=test_output_xmls,
+        )
+    if result_writer.incremental_import:
+        with profiler.phase("merge previous result"):
+            previous_suite = result_writer.incremental_import.read_previous_suite()
+            if previous_suite is not None:
+                merge_suite(previous_suite, result.suite, configuration.phasePattern)
+                result.suite = previous_suite
+    if jobs > 1 and incremental:
+        logger.warning("Incremental imports are not parallelized, ignoring --jobs.")
+        result.visit(result_writer)
+    elif jobs > 1:
+        write_results_in_parallel(result, result_writer, config or {}, jobs)
+    else:
+        result.visit(result_writer)
@@ -0,0 +1,83 @@
+import sys
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from robot.model import TagPatterns
+
+from .model import TestCaseDetails, TestStructureElementType
+from .tree_arrays import ArrayTree
+
+SELECTOR_TYPES = ("uid", "numbering", "keyword", "tag")
+
+
+@dataclass
+class Selection:
+    """Filters of ``write --select``.
+
+    ``uid`` and ``numbering`` filters select subtrees of the test theme tree and are
+    resolved against ``cycle_structure.json`` only. ``keyword`` and ``tag`` filters
+    select single test cases by their TestBench keywords and UDF tags and are applied
+    to the test cases below the selected subtrees. Filters of the same kind are
+    combined with OR, structure and test case filters with AND.
+    """
+
+    uids: List[str] = field(default_factory=list)
+    numberings: List[str] = field(default_factory=list)
+    keywords: List[str] = field(default_factory=list)
+    tags: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_list(cls, selectors: Optional[List[str]]) -> Optional["Selection"]:
+        if not selectors:
+            return None
+        selection = cls()
+        for selector in selectors:
+            selector_type, separator, value = selector.partition(":")
+            if not separator or selector_type.lower() not in SELECTOR_TYPES or not value:
+                sys.exit(
+                    f"Invalid selector '{selector}'. "
+                    f"Expected one of {', '.join(t + ':<value>' for t in SELECTOR_TYPES)}."
+                )
+            getattr(selection, f"{selector_type.lower()}s").append(value)
+        return selection
+
+    @property
+    def filters_structure(self) -> bool:
+        return bool(self.uids or self.numberings)
+
+    @property
+    def filters_test_cases(self) -> bool:
+        return bool(self.keywords or self.tags)
+
+    def select_test_case_sets(self, tree_arrays: ArrayTree) -> List[str]:
+        """Returns the uniqueIDs of all test case sets in the selected subtrees in tree order."""
+        roots = [row for row in range(len(tree_arrays)) if self._selects_subtree(tree_arrays, row)]
+        return [
+            tree_arrays.get_uid(row)
+            for row in tree_arrays.rows_in_subtrees(
+                roots, TestStructureElementType.TestCaseSetNode
+            )
+        ]
+
+    def _selects_subtree(self, tree_arrays: ArrayTree, row: int) -> bool:
+        if not self.filters_structure:
+            return tree_arrays.is_type(row, TestStructureElementType.RootNode)
+        numbering = tree_arrays.numbering[row]
+        return tree_arrays.get_uid(row) in self.uids or any(
+            numbering == prefix or numbering.startswith(f"{prefix}.")
+            for prefix in self.numberings
+        )
+
+    def selects_test_case(self, test_case_details: TestCaseDetails) -> bool:
+        if not self.filters_test_cases:
+            return True
+        keywords = [keyword.name for keyword in test_case_details.spec.keywords]
+        udf_tags = [udf.robot_tag for udf in test_case_details.spec.udfs if udf.robot_tag]
+        return self.selects_tags(keywords, udf_tags)
+
+    def selects_tags(self, keywords: List[str], udf_tags: List[str]) -> bool:
+        if not self.filters_test_cases:
+            return True
+        return TagPatterns(self.keywords).match(keywords) or TagPatterns(self.tags).match(
+            udf_tags
+        )
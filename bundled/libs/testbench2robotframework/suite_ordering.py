@@ -0,0 +1,186 @@
+import heapq
+from dataclasses import dataclass, field
+from pathlib import Path, PurePath
+from typing import Dict, Iterable, List
+
+from robot.api import SuiteVisitor
+
+from .json_reader import TestCaseSet
+from .log import logger
+from .model import InteractionDetails, InteractionType, TestCaseDetails
+
+DEFAULT_INTERACTION_DURATION = 1000
+SUITE_OPTION = "--suite "
+GROUP_START = "{"
+GROUP_END = "}"
+
+
+@dataclass
+class SuiteDuration:
+    longname: str
+    duration: int
+    estimated: bool
+
+
+@dataclass(order=True)
+class Worker:
+    duration: int
+    index: int
+    suites: List[SuiteDuration] = field(default_factory=list, compare=False)
+
+
+def count_atomic_interactions(interactions: Iterable[InteractionDetails]) -> int:
+    count = 0
+    pending = list(interactions)
+    while pending:
+        interaction = pending.pop()
+        if interaction.interactionType == InteractionType.Atomic:
+            count += 1
+        pending.extend(interaction.interactions)
+    return count
+
+
+def get_suite_name(file_name: str) -> str:
+    """Returns the suite name Robot Framework creates for a file or directory name."""
+    name = file_name
+    if "__" in name:
+        name = name.split("__", 1)[1] or name
+    name = name.replace("_", " ").strip()
+    return name.title() if name.islower() else name
+
+
+def get_suite_longname(generation_directory: Path, tcs_path: str) -> str:
+    return ".".join(
+        get_suite_name(part) for part in (generation_directory.name, *PurePath(tcs_path).parts)
+    )
+
+
+def get_historical_duration(test_case: TestCaseDetails) -> int:
+    return test_case.exec.actualDuration if test_case.exec and test_case.exec.actualDuration else 0
+
+
+def estimate_suite_durations(
+    test_case_set_catalog: Dict[str, TestCaseSet],
+    tcs_paths: Dict[str, str],
+    generation_directory: Path,
+) -> List[SuiteDuration]:
+    """Sums the last ``actualDuration`` of the test cases of every test case set.
+
+    Test cases without a recorded duration are estimated from their number of atomic
+    interactions, weighted by the average duration of an interaction in the test
+    cases that have one.
+    """
+    measured_duration = measured_interactions = 0
+    for test_case_set in test_case_set_catalog.values():
+        for test_case in test_case_set.test_cases.values():
+            duration = get_historical_duration(test_case)
+            if duration:
+                measured_duration += duration
+                measured_interactions += count_atomic_interactions(test_case.interactions)
+    interaction_duration = (
+        measured_duration // measured_interactions
+        if measured_interactions
+        else DEFAULT_INTERACTION_DURATION
+    )
+    suite_durations = []
+    for uid, test_case_set in test_case_set_catalog.items():
+        duration, estimated = 0, False
+        for test_case in test_case_set.test_cases.values():
+            test_duration = get_historical_duration(test_case)
+            if not test_duration:
+                estimated = True
+                test_duration = interaction_duration * max(
+                    count_atomic_interactions(test_case.interactions), 1
+                )
+            duration += test_duration
+        suite_durations.append(
+            SuiteDuration(
+                get_suite_longname(generation_directory, tcs_paths[uid]), duration, estimated
+            )
+        )
+    return suite_durations
+
+
+def balance_suites(suite_durations: List[SuiteDuration], processes: int) -> List[Worker]:
+    """Assigns the longest suite to the least loaded worker until all suites are assigned."""
+    workers = [Worker(0, index) for index in range(max(processes, 1))]
+    for suite in sorted(suite_durations, key=lambda suite: (-suite.duration, suite.longname)):
+        worker = heapq.heappop(workers)
+        worker.suites.append(suite)
+        worker.duration += suite.duration
+        heapq.heappush(workers, worker)
+    return sorted((worker for worker in workers if worker.suites), reverse=True)
+
+
+def write_suite_ordering(
+    test_case_set_catalog: Dict[str, TestCaseSet],
+    tcs_paths: Dict[str, str],
+    generation_directory: Path,
+    ordering_file: str,
+    processes: int = 1,
+) -> None:
+    """Writes a pabot ``--ordering`` file with the longest suites first.
+
+    With more than one process the suites are balanced over the processes and every
+    process gets its own ``{ }`` group, so that pabot runs them as planned.
+    """
+    suite_durations = estimate_suite_durations(
+        test_case_set_catalog, tcs_paths, generation_directory
+    )
+    workers = balance_suites(suite_durations, processes)
+    lines = []
+    for worker in workers:
+        if processes > 1:
+            lines.append(GROUP_START)
+        lines.extend(f"{SUITE_OPTION}{suite.longname}" for suite in worker.suites)
+        if processes > 1:
+            lines.append(GROUP_END)
+    Path(ordering_file).write_text("\n".join(lines) + "\n", encoding="utf-8")
+    estimated = sum(suite.estimated for suite in suite_durations)
+    logger.info(
+        f"Suite ordering for {len(suite_durations)} suites written to '{ordering_file}' "
+        f"({estimated} with estimated durations, longest process "
+        f"{max((worker.duration for worker in workers), default=0) / 1000:.1f}s)."
+    )
+
+
+def read_suite_ordering(ordering_file: str) -> List[str]:
+    longnames = []
+    for line in Path(ordering_file).read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if line.startswith(SUITE_OPTION):
+            longnames.append(line[len(SUITE_OPTION):].strip())
+    return longnames
+
+
+class SuiteOrdering(SuiteVisitor):
+    """Pre-run modifier that runs suites in the order of a suite ordering file.
+
+    Usage: ``robot --prerunmodifier testbench2robotframework.suite_ordering.SuiteOrdering:<file>``
+    Child suites are sorted by the first position of any of their descendants in the
+    file, suites that are not listed keep their order after all listed suites.
+    """
+
+    def __init__(self, ordering_file: str) -> None:
+        self.positions = {
+            longname.lower(): position
+            for position, longname in enumerate(read_suite_ordering(ordering_file))
+        }
+        self._suite_positions: Dict[int, int] = {}
+
+    def start_suite(self, suite) -> None:
+        suite.suites = sorted(suite.suites, key=self._get_position)
+
+    def _get_position(self, suite) -> int:
+        if id(suite) not in self._suite_positions:
+            longname = getattr(suite, "full_name", None) or suite.longname
+            self._suite_positions[id(suite)] = min(
+                [
+                    self.positions.get(longname.lower(), len(self.positions)),
+                    *(self._get_position(child) for child in suite.suites),
+                ]
+            )
+        return self._suite_positions[id(suite)]
+
+    def visit_test(self, test) -> None:
+        pass
@@ -0,0 +1,134 @@
+import os
+import re
+from io import StringIO
+from pathlib import Path
+from typing import Dict, List
+
+from robot.api import TestSuite
+from robot.parsing.model.blocks import File, TestCaseSection
+
+from .log import logger
+from .profiling import profiler
+
+ERROR_SOURCE_PATTERN = re.compile(
+    r"Error in (?:file|resource file) '(?P<source>[^']+)'(?: on line -?\d+)?: "
+)
+VALIDATION_SUITE_NAME = "Validation"
+INIT_FILE_STEM = "__init__"
+PARENT_SETUP_FAILED = "Parent suite setup failed"
+
+
+class DryRunProblemCollector:
+    """Listener collecting import errors, failed suite setups and teardowns and failed
+    tests of a dry run per source file.
+
+    Tests failing only because the setup of a parent suite failed are not reported
+    again, the setup is reported for the ``__init__`` file defining it. The keywords
+    of such tests are not dry run either.
+    """
+
+    ROBOT_LISTENER_API_VERSION = 3
+
+    def __init__(self) -> None:
+        self.problems: Dict[str, List[str]] = {}
+
+    def end_test(self, data, result) -> None:
+        if not result.passed and not result.message.startswith(PARENT_SETUP_FAILED):
+            self._add(data.parent.source, f"{result.name}: {result.message}")
+
+    def end_suite(self, data, result) -> None:
+        for fixture in (result.setup, result.teardown):
+            if fixture and fixture.failed:
+                self._add(data.source, f"Suite {fixture.type.title()}: {fixture.message}")
+
+    def message(self, message) -> None:
+        if message.level not in ("ERROR", "WARN"):
+            return
+        match = ERROR_SOURCE_PATTERN.search(message.message)
+        if match:
+            self._add(match.group("source"), message.message[match.end() :])
+
+    def _add(self, source, problem: str) -> None:
+        self.problems.setdefault(os.path.normpath(str(source)), []).append(problem)
+
+
+def has_test_cases(test_suite: File) -> bool:
+    return any(isinstance(section, TestCaseSection) for section in test_suite.sections)
+
+
+def is_init_file(test_suite: File) -> bool:
+    return Path(test_suite.source).stem == INIT_FILE_STEM
+
+
+def build_validation_suite(test_suites: Dict[str, File], generation_directory: Path) -> TestSuite:
+    """Nests the suites like the directories of the generation directory.
+
+    Every directory becomes a suite, created from its ``__init__`` file if there is
+    one, so that imports, Suite Setup and Suite Teardown of init files are validated
+    together with the suites below them.
+    """
+    generation_directory = Path(generation_directory)
+    init_files = {
+        Path(test_suite.source).parent: test_suite
+        for test_suite in test_suites.values()
+        if is_init_file(test_suite)
+    }
+    directory_suites: Dict[Path, TestSuite] = {}
+
+    def get_directory_suite(directory: Path) -> TestSuite:
+        if directory not in directory_suites:
+            if directory in init_files:
+                suite = TestSuite.from_model(init_files[directory])
+            else:
+                suite = TestSuite(source=str(directory))
+            if directory == generation_directory:
+                suite.name = VALIDATION_SUITE_NAME
+            else:
+                suite.name = directory.name
+                get_directory_suite(directory.parent).suites.append(suite)
+            directory_suites[directory] = suite
+        return directory_suites[directory]
+
+    root_suite = get_directory_suite(generation_directory)
+    for test_suite in test_suites.values():
+        if has_test_cases(test_suite):
+            directory = Path(test_suite.source).parent
+            if generation_directory not in (directory, *directory.parents):
+                directory = generation_directory
+            get_directory_suite(directory).suites.append(TestSuite.from_model(test_suite))
+    return root_suite
+
+
+def validate_test_suites(test_suites: Dict[str, File], generation_directory: Path) -> int:
+    """Dry runs the written suites from their in-memory models instead of reparsing them.
+
+    Every suite and init file is converted to a running suite with
+    ``TestSuite.from_model``, the suites are nested like their directories and run
+    with ``dryrun`` in this process. Unresolved keywords and imports are logged per
+    file. Returns the number of files with problems.
+    """
+    with profiler.phase("validate suites"):
+        root_suite = build_validation_suite(test_suites, generation_directory)
+        collector = DryRunProblemCollector()
+        root_suite.run(
+            dryrun=True,
+            output="NONE",
+            log="NONE",
+            report="NONE",
+            console="none",
+            listener=[collector],
+            stdout=StringIO(),
+            stderr=StringIO(),
+        )
+    for source, problems in sorted(collector.problems.items()):
+        details = "".join(f"\n    {problem}" for problem in problems)
+        logger.error(
+            f"Validation of {os.path.relpath(source)} found {len(problems)} problems:{details}"
+        )
+    validated_suites = sum(1 for test_suite in test_suites.values() if has_test_cases(test_suite))
+    profiler.count("suites validated", validated_suites)
+    logger.info(
+        f"Validated {validated_suites} suites, "
+        f"{len(collector.problems)} files with problems."
+    )
+    return len(collector.problems)
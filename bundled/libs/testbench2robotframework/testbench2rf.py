@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import hashlib
 import os
 import re
 from dataclasses import dataclass
@@ -37,8 +38,10 @@ try:
 except ImportError:
     from robot.parsing.model.statements import ForceTags as TestTags
 
-from .config import Configuration
+from .config import CompiledConfiguration
+from .generated_keywords import SHARED_SETUP_PREFIX, SHARED_TEARDOWN_PREFIX
 from .json_reader import TestCaseSet
+from .keyword_hoisting import hoist_keyword_sequences
 from .log import logger
 from .model import (
     InteractionDetails,
@@ -50,11 +53,11 @@ from .model import (
     UDFType,
     UserDefinedField,
 )
+from .profiling import profiler
 from .utils import PathResolver
 
 SEPARATOR = "    "
-ROBOT_PATH_SEPARATOR = "/"
-RELATIVE_RESOURCE_INDICATOR = r"^{root}"
+RESOURCE_EXTENSION_PATTERN = re.compile(".resource")
 SECTION_SEPARATOR = [EmptyLine.from_params()] * 2
 LINE_SEPARATOR = [EmptyLine.from_params()]
 UNKNOWN_IMPORT_TYPE = str(uuid4())
@@ -85,18 +88,18 @@ class CompoundInteractionCall(InteractionCall):
 
 
 class RfTestCase:
-    def __init__(self, test_case_details: TestCaseDetails, config: Configuration) -> None:
+    def __init__(self, test_case_details: TestCaseDetails, config: CompiledConfiguration) -> None:
         self.uid: str = test_case_details.uniqueID
         self.interaction_calls: list[InteractionCall] = []
         self.used_imports: dict[str, set[str]] = {}
         self.config = config
-        self.lib_pattern_list = [re.compile(pattern) for pattern in config.rfLibraryRegex]
-        self.res_pattern_list = [re.compile(pattern) for pattern in config.rfResourceRegex]
         for interaction in test_case_details.interactions:
             self._get_interaction_calls(interaction)
         self.rf_tags = self._get_tags(test_case_details)
         self.setup_keyword: Optional[Keyword] = None
         self.teardown_keyword: Optional[Keyword] = None
+        self.setup_call: Optional[Setup] = None
+        self.teardown_call: Optional[Teardown] = None
         # TODO description
 
     @staticmethod
@@ -161,11 +164,11 @@ class RfTestCase:
         )
 
     def _get_keyword_import(self, interaction) -> tuple[str, str]:
-        for pattern in self.lib_pattern_list:
+        for pattern in self.config.library_patterns:
             match = pattern.search(interaction.path)
             if match:
                 return LIBRARY_IMPORT_TYPE, match[1].strip()
-        for pattern in self.res_pattern_list:
+        for pattern in self.config.resource_patterns:
             match = pattern.search(interaction.path)
             if match:
                 return RESOURCE_IMPORT_TYPE, match[1].strip()
@@ -174,9 +177,9 @@ class RfTestCase:
         if len(ia_path_parts) == 1:
             return UNKNOWN_IMPORT_TYPE, ia_path_parts[0]
         root_subdivision, import_prefix = ia_path_parts[:2]
-        if root_subdivision in self.config.rfLibraryRoots:
+        if root_subdivision in self.config.library_roots:
             return LIBRARY_IMPORT_TYPE, import_prefix
-        if root_subdivision in self.config.rfResourceRoots:
+        if root_subdivision in self.config.resource_roots:
             return RESOURCE_IMPORT_TYPE, import_prefix
 
         return root_subdivision, import_prefix
@@ -219,19 +222,17 @@ class RfTestCase:
                 keyword_lists[tc_index].append(self._create_rf_keyword(interaction_call))
             elif (
                 isinstance(interaction_call, CompoundInteractionCall)
-                and self.config.logCompoundInteractions
+                and self.config.log_compound_interactions
             ):
                 keyword_lists[tc_index].append(self._create_rf_compound_keyword(interaction_call))
         return keyword_lists
 
     def is_splitting_ia(self, interaction_call, keyword_lists, tc_index):
+        split_pattern = self.config.test_case_split_pattern
         return (
-            re.search(
-                self.config.testCaseSplitPathRegEx,
-                f"{interaction_call.import_prefix}.{interaction_call.name}",
-            )
+            split_pattern is not None
             and keyword_lists[tc_index]
-            and self.config.testCaseSplitPathRegEx
+            and split_pattern.search(f"{interaction_call.import_prefix}.{interaction_call.name}")
         )
 
     def _create_rf_setup_call(
@@ -286,6 +287,7 @@ class RfTestCase:
                 f"Setup-{self.uid}", setup_interactions
             )
             rf_setup = Setup.from_params(name=self.setup_keyword.name)
+            self.setup_call = rf_setup
         return rf_setup
 
     def _get_teardown_params(self, interaction_calls: list[InteractionCall]):
@@ -309,6 +311,7 @@ class RfTestCase:
                 f"Teardown-{self.uid}", teardown_interactions
             )
             rf_teardown = Teardown.from_params(name=self.teardown_keyword.name)
+            self.teardown_call = rf_teardown
         return rf_teardown
 
     def to_robot_ast_test_cases(
@@ -340,7 +343,7 @@ class RfTestCase:
         rf_test_cases: list[TestCase] = []
         multiple_tests = len(rf_keyword_call_lists) > 1
         for index, rf_keywords in enumerate(rf_keyword_call_lists):
-            phase_pattern = self.config.phasePattern
+            phase_pattern = self.config.phase_pattern
             tc_name = (
                 phase_pattern.format(
                     testcase=self.uid, index=index + 1, length=len(rf_keyword_call_lists)
@@ -410,18 +413,19 @@ class RfTestCase:
         return cbr_parameters
 
     def _get_interaction_import_prefix(self, interaction: AtomicInteractionCall) -> str:
-        return (self.config.fullyQualified or False) * f"{interaction.import_prefix}."
+        return self.config.fully_qualified * f"{interaction.import_prefix}."
 
     def _get_interaction_indent(
         self, interaction: Union[AtomicInteractionCall, CompoundInteractionCall]
     ) -> str:
-        return SEPARATOR * interaction.indent if self.config.logCompoundInteractions else SEPARATOR
+        return SEPARATOR * interaction.indent if self.config.log_compound_interactions else SEPARATOR
 
     def _create_rf_keyword(self, interaction: AtomicInteractionCall) -> KeywordCall:
         import_prefix = self._get_interaction_import_prefix(interaction)
         interaction_indent = self._get_interaction_indent(interaction)
         cbv_parameters = self._create_cbv_parameters(interaction)
         cbr_parameters = self._create_cbr_parameters(interaction)
+        profiler.count("keyword calls")
         return KeywordCall.from_params(
             assign=tuple(cbr_parameters),
             name=f"{import_prefix}{interaction.name}",
@@ -472,25 +476,31 @@ class RfTestCase:
 def create_test_suites(
     test_case_set_catalog: dict[str, TestCaseSet],
     path_resolver: PathResolver,
-    config: Configuration,
+    config: CompiledConfiguration,
 ) -> dict[str, File]:
     tcs_paths = path_resolver.tcs_paths
     test_suites = {}
-    for uid, test_case_set in test_case_set_catalog.items():
-        test_suites[uid] = RobotSuiteFileBuilder(
-            test_case_set, tcs_paths[uid], config
-        ).create_test_suite_file()
-    tt_paths = path_resolver.tt_paths
-    for uid, test_theme in path_resolver.tt_catalog.items():
-        test_suites[uid] = RobotInitFileBuilder(
-            test_theme, tt_paths[uid], config
-        ).create_init_file()
+    with profiler.phase("build suites"):
+        for uid, test_case_set in test_case_set_catalog.items():
+            profiler.checkpoint("build suites")
+            test_suites[uid] = RobotSuiteFileBuilder(
+                test_case_set, tcs_paths[uid], config
+            ).create_test_suite_file()
+        tt_paths = path_resolver.tt_paths
+        for uid, test_theme in path_resolver.tt_catalog.items():
+            test_suites[uid] = RobotInitFileBuilder(
+                test_theme, tt_paths[uid], config
+            ).create_init_file()
+    if config.keyword_hoisting.enabled:
+        with profiler.phase("hoist keyword sequences"):
+            test_suites.update(hoist_keyword_sequences(test_suites, config.keyword_hoisting))
+    profiler.count("suites built", len(test_suites))
     return test_suites
 
 
 class RobotInitFileBuilder:
     def __init__(
-        self, test_theme: TestStructureTreeNode, tt_path: PurePath, config: Configuration
+        self, test_theme: TestStructureTreeNode, tt_path: str, config: CompiledConfiguration
     ) -> None:
         self.test_theme = test_theme
         self.tt_path = PurePath(tt_path)
@@ -533,12 +543,46 @@ def create_meta_data(name, value):
     return Metadata(tokens)
 
 
+def render_body(node) -> str:
+    if isinstance(node, Statement):
+        return "".join(token.value for token in node.tokens)
+    return "".join(render_body(child) for child in getattr(node, "body", ()))
+
+
+def share_identical_keywords(
+    keywords_and_calls: list[tuple[Optional[Keyword], Optional[Statement]]], shared_prefix: str
+) -> list[Keyword]:
+    """Replaces keywords with identical bodies by one shared keyword.
+
+    Keywords used by a single test keep their name. Keywords whose rendered body
+    occurs more than once are emitted once as ``<shared_prefix><digest>`` and the
+    setup or teardown calls of all tests using them are renamed accordingly.
+    """
+    groups: dict[str, list[tuple[Keyword, Statement]]] = {}
+    for keyword, call in keywords_and_calls:
+        if keyword is not None:
+            digest = hashlib.blake2b(render_body(keyword).encode(), digest_size=6).hexdigest()
+            groups.setdefault(digest, []).append((keyword, call))
+    keywords = []
+    for digest, group in groups.items():
+        keyword = group[0][0]
+        if len(group) > 1:
+            shared_name = f"{shared_prefix}{digest}"
+            keyword.header.get_token(Token.TESTCASE_NAME).value = shared_name
+            for _, call in group:
+                call.get_token(Token.NAME).value = shared_name
+            profiler.count("shared keywords", 1)
+            profiler.count("keywords shared", len(group))
+        keywords.append(keyword)
+    return keywords
+
+
 class RobotSuiteFileBuilder:
     def __init__(
-        self, test_case_set: TestCaseSet, tcs_path: PurePath, config: Configuration
+        self, test_case_set: TestCaseSet, tcs_path: str, config: CompiledConfiguration
     ) -> None:
         self.test_case_set = test_case_set
-        self.tcs_path = tcs_path
+        self.tcs_path = PurePath(tcs_path)
         self.config = config
         self._rf_test_cases: list[RfTestCase] = [
             RfTestCase(test_case_details=test_case, config=config)
@@ -562,11 +606,18 @@ class RobotSuiteFileBuilder:
             robot_ast_test_cases.extend(test_case.to_robot_ast_test_cases())
             if index != len(self._rf_test_cases) - 1:
                 robot_ast_test_cases[-1].body.extend(LINE_SEPARATOR)
-            if test_case.setup_keyword:
-                self.setup_keywords.append(test_case.setup_keyword)
-            if test_case.teardown_keyword:
-                self.teardown_keywords.append(test_case.teardown_keyword)
         test_case_section.body.extend(robot_ast_test_cases)
+        self.setup_keywords = share_identical_keywords(
+            [(test_case.setup_keyword, test_case.setup_call) for test_case in self._rf_test_cases],
+            SHARED_SETUP_PREFIX,
+        )
+        self.teardown_keywords = share_identical_keywords(
+            [
+                (test_case.teardown_keyword, test_case.teardown_call)
+                for test_case in self._rf_test_cases
+            ],
+            SHARED_TEARDOWN_PREFIX,
+        )
         return test_case_section
 
     def _create_keywords_section(self) -> Union[KeywordSection, None]:
@@ -590,7 +641,7 @@ class RobotSuiteFileBuilder:
     def _create_rf_variable_imports(self) -> list[VariablesImport]:
         return [
             VariablesImport.from_params(name=variable_file)
-            for variable_file in self.config.forcedImport.variables
+            for variable_file in self.config.forced_variables
         ]
 
     def _create_rf_resource_imports(self, import_dict: dict[str, set[str]]) -> list[ResourceImport]:
@@ -600,58 +651,35 @@ class RobotSuiteFileBuilder:
             for resource in resources
             if not self._is_library(resource_root) and self._is_resource(resource_root)
         }
-        resources.update(self.config.forcedImport.resources)
+        resources.update(self.config.forced_resources)
         resource_paths = {
             self._create_resource_path(resource) for resource in sorted(resources)
         }  # TODO Fix Paths to correct models
         return [ResourceImport.from_params(res) for res in sorted(resource_paths)]
 
     def _create_resource_path(self, resource: str) -> str:
-        subdivision_mapping = self.config.subdivisionsMapping.resources.get(resource)
-        resource = re.sub(".resource", "", resource)
-        if not subdivision_mapping:
-            if not self.config.resourceDirectory:
-                return f"{resource}.resource"
-            if not re.match(RELATIVE_RESOURCE_INDICATOR, self.config.resourceDirectory):
-                return Path(self.config.resourceDirectory, f"{resource}.resource").as_posix()
-            generation_directory = self._replace_relative_resource_indicator(
-                self.config.generationDirectory
-            )
-            robot_file_path = Path(generation_directory) / self.tcs_path.parent
-            resource_directory = self._replace_relative_resource_indicator(
-                self.config.resourceDirectory
-            )
-            resource_import = (
-                Path(os.path.relpath(Path(resource_directory), robot_file_path))
-                / f"{resource}.resource"
-            )
-            return resource_import.as_posix()
-        root_path = Path(os.curdir).absolute()
-        subdivision_mapping = re.sub(
-            r"^{resourceDirectory}", self.config.resourceDirectory, subdivision_mapping
+        cache_key = (self.tcs_path.parent, resource)
+        resource_path = self.config.resource_import_cache.get(cache_key)
+        if resource_path is None:
+            resource_path = self._resolve_resource_path(resource)
+            self.config.resource_import_cache[cache_key] = resource_path
+        return resource_path
+
+    def _resolve_resource_path(self, resource: str) -> str:
+        subdivision_mapping = self.config.resource_mappings.get(resource)
+        if subdivision_mapping is not None:
+            return subdivision_mapping
+        resource = RESOURCE_EXTENSION_PATTERN.sub("", resource)
+        if not self.config.resource_directory:
+            return f"{resource}.resource"
+        if self.config.resolved_resource_directory is None:
+            return Path(self.config.resource_directory, f"{resource}.resource").as_posix()
+        robot_file_path = Path(self.config.resolved_generation_directory) / self.tcs_path.parent
+        resource_import = (
+            Path(os.path.relpath(Path(self.config.resolved_resource_directory), robot_file_path))
+            / f"{resource}.resource"
         )
-        subdivision_mapping = re.sub(
-            RELATIVE_RESOURCE_INDICATOR, str(root_path).replace('\\', '/'), subdivision_mapping
-        )
-        return str(subdivision_mapping)
-
-    def _replace_relative_resource_indicator(self, path: Union[Path, str]) -> str:
-        root_path = Path(os.curdir).absolute()
-        return re.sub(
-            RELATIVE_RESOURCE_INDICATOR,
-            str(root_path).replace('\\', ROBOT_PATH_SEPARATOR),
-            str(path),
-            flags=re.IGNORECASE,
-        ).replace('\\', ROBOT_PATH_SEPARATOR)
-
-    def _get_relative_resource_directory(self) -> str:
-        root_path = Path(os.curdir).absolute()
-        return re.sub(
-            RELATIVE_RESOURCE_INDICATOR,
-            str(root_path).replace('\\', ROBOT_PATH_SEPARATOR),
-            self.config.resourceDirectory,
-            flags=re.IGNORECASE,
-        ).replace('\\', ROBOT_PATH_SEPARATOR)
+        return resource_import.as_posix()
 
     @staticmethod
     def _is_library(root_subdivision: str) -> bool:
@@ -668,10 +696,8 @@ class RobotSuiteFileBuilder:
             for library in libraries
             if self._is_library(library_root)
         }
-        libraries.update(self.config.forcedImport.libraries)
-        lib_imports = {
-            self.config.subdivisionsMapping.libraries.get(library, library) for library in libraries
-        }
+        libraries.update(self.config.forced_libraries)
+        lib_imports = {self.config.library_mappings.get(library, library) for library in libraries}
         return [LibraryImport.from_params(lib) for lib in sorted(lib_imports)]
 
     def _create_rf_test_tags(self) -> Union[TestTags, None]:
@@ -1,32 +1,92 @@
-from typing import Dict
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
 
-from .config import Configuration
+from .catalog_snapshot import SNAPSHOT_SUFFIX, SnapshotJsonReader, write_catalog_snapshot
+from .config import CompiledConfiguration, Configuration
+from .io_engine import IoEngine
 from .json_reader import TestBenchJsonReader
 from .log import logger, setup_logger
+from .profiling import profiler
+from .report_cache import create_report_cache
+from .report_index import ReportIndex
+from .selection import Selection
 
 # from .robot_run import RobotSuiteRunner
+from .suite_ordering import write_suite_ordering
+from .suite_validation import validate_test_suites
 from .testbench2rf import create_test_suites
 from .testsuite_write import write_test_suites
-from .utils import PathResolver, get_directory
+from .utils import PathResolver, get_directory, paused_garbage_collection
 
 
-def testbench2robotframework(json_report: str, config: Dict):
+def testbench2robotframework(
+    json_report: str,
+    config: Dict,
+    select: Optional[List[str]] = None,
+    ordering_file: Optional[str] = None,
+    processes: int = 1,
+    snapshot: Optional[str] = None,
+    use_index: bool = False,
+    validate: bool = False,
+):
     configuration = Configuration.from_dict(config)
     setup_logger(configuration)
     logger.debug("Config file loaded.")
-    json_report = get_directory(json_report)
-    reader = TestBenchJsonReader(json_report)
-    path_resolver = PathResolver(
-        reader.test_theme_tree,
-        tuple(reader.get_test_case_set_catalog().keys()),
-        configuration.logSuiteNumbering,
-    )
+    compiled_configuration = CompiledConfiguration.from_configuration(configuration)
+    io_engine = IoEngine.from_config(configuration.ioEngine)
+    selection = Selection.from_list(select)
+    if use_index and not selection:
+        logger.warning("The report index is only used by --select, --index is ignored.")
+    if Path(json_report).suffix == SNAPSHOT_SUFFIX:
+        reader = SnapshotJsonReader(json_report)
+    else:
+        report_zip = json_report if Path(json_report).is_file() else None
+        json_report = get_directory(json_report)
+        if snapshot:
+            with profiler.phase("write snapshot"):
+                write_catalog_snapshot(json_report, snapshot)
+        report_index = None
+        if use_index and selection:
+            report_index = ReportIndex.open(json_report, report_zip=report_zip)
+        reader = TestBenchJsonReader(
+            json_report,
+            create_report_cache(configuration.reportCache),
+            report_index,
+            io_engine,
+        )
+    with profiler.phase("read report"), paused_garbage_collection():
+        if selection:
+            test_case_set_catalog = reader.get_selected_test_case_set_catalog(selection)
+        else:
+            test_case_set_catalog = reader.get_test_case_set_catalog()
+    with profiler.phase("resolve paths"):
+        path_resolver = PathResolver(
+            reader.tree_arrays,
+            tuple(test_case_set_catalog.keys()),
+            compiled_configuration.log_suite_numbering,
+        )
     test_suites = create_test_suites(
-        reader.get_test_case_set_catalog(), path_resolver, configuration
+        test_case_set_catalog, path_resolver, compiled_configuration
     )
     # suite_runner = RobotSuiteRunner(test_suites, path_resolver)
     # suite_runner.run_suites()
     if not test_suites:
         logger.warning("There are no test suites in the exported TestBench Project.")
+        io_engine.close()
         return
-    write_test_suites(test_suites, configuration)
+    write_test_suites(test_suites, compiled_configuration, io_engine)
+    io_engine.close()
+    if ordering_file:
+        with profiler.phase("write suite ordering"):
+            write_suite_ordering(
+                test_case_set_catalog,
+                path_resolver.tcs_paths,
+                compiled_configuration.generation_directory,
+                ordering_file,
+                processes,
+            )
+    if validate and validate_test_suites(
+        test_suites, compiled_configuration.generation_directory
+    ):
+        sys.exit("Validation of the generated robot files failed.")
@@ -1,41 +1,36 @@
 import os
-import re
 import shutil
+from io import StringIO
 from pathlib import Path
 from typing import Dict
 
 from robot.parsing.model.blocks import File
 
-from .config import Configuration
+from .config import CompiledConfiguration
+from .io_engine import IoEngine
 from .log import logger
+from .profiling import profiler
 from .utils import directory_to_zip
 
-
-def write_test_suites(test_suites: Dict[str, File], config: Configuration) -> None:
-    generation_directory = get_generation_directory(config.generationDirectory)
-    if config.clearGenerationDirectory:
-        clear_generation_directory(generation_directory)
-    write_test_suite_files(test_suites, generation_directory)
-    if config.createOutputZip:
-        directory_to_zip(generation_directory)
+RESOURCE_SUFFIX = ".resource"
+
+
+def write_test_suites(
+    test_suites: Dict[str, File], config: CompiledConfiguration, io_engine: IoEngine
+) -> None:
+    generation_directory = config.generation_directory
+    if config.clear_generation_directory:
+        with profiler.phase("clear generation directory"):
+            clear_generation_directory(generation_directory)
+    with profiler.phase("write files"):
+        write_test_suite_files(test_suites, generation_directory, io_engine)
+    if config.create_output_zip:
+        with profiler.phase("zip generation directory"):
+            directory_to_zip(generation_directory)
     logger.info(f"Successfully wrote {len(test_suites)} robot files.")
     logger.info(f"Path: {Path(generation_directory).resolve()!s}")
 
 
-def get_generation_directory(generation_directory: str) -> Path:
-    root_path = Path(os.curdir).absolute()
-    if not generation_directory:
-        return root_path / "Generated"
-    return Path(
-        re.sub(
-            r"^{root}",
-            str(root_path).replace('\\', '\\\\'),
-            generation_directory,
-            flags=re.IGNORECASE,
-        )
-    )
-
-
 def clear_generation_directory(generation_dir: Path) -> None:
     if generation_dir.is_dir():
         shutil.rmtree(str(generation_dir))
@@ -44,8 +39,19 @@ def clear_generation_directory(generation_dir: Path) -> None:
     Path(zip_file).unlink(missing_ok=True)
 
 
-def write_test_suite_files(test_suites: Dict[str, File], generation_directory: Path) -> None:
+def write_test_suite_files(
+    test_suites: Dict[str, File], generation_directory: Path, io_engine: IoEngine
+) -> None:
+    """Renders the suites in this thread and lets the I/O engine write them."""
     for test_suite_file in test_suites.values():
-        test_suite_file.source = Path(generation_directory / f"{test_suite_file.source}.robot")
+        profiler.checkpoint("write files")
+        source = Path(generation_directory / test_suite_file.source)
+        if source.suffix != RESOURCE_SUFFIX:
+            source = source.with_name(f"{source.name}.robot")
+        test_suite_file.source = source
         logger.debug(f"File written to {os.path.relpath(test_suite_file.source)}")
-        test_suite_file.save()
+        content = StringIO()
+        test_suite_file.save(content)
+        io_engine.write_text(source, content.getvalue())
+        profiler.count("files written")
+    io_engine.wait()
@@ -0,0 +1,86 @@
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Union
+
+DATE_TIME_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+TIME_FORMAT = "%H:%M:%S.%f"
+ROBOT_TIMESTAMP_FORMAT = "%Y%m%d %H:%M:%S.%f"
+ROBOT_TIMESTAMP_LENGTH = len("20240101 12:00:00.000")
+LOCAL_TIMEZONE = timezone(datetime.now(timezone.utc).astimezone().utcoffset())
+TIMESTAMP_CACHE_SIZE = 1 << 16
+
+Timestamp = Union[str, datetime]
+
+
+@lru_cache(maxsize=TIMESTAMP_CACHE_SIZE)
+def format_robot_timestamp(timestamp: Timestamp, time_format: str = DATE_TIME_FORMAT) -> str:
+    """Formats a Robot Framework timestamp as local time with millisecond precision.
+
+    Accepts datetimes and Robot's fixed-width ``YYYYMMDD HH:MM:SS.mmm`` strings.
+    The two formats used for execution comments are assembled from slices of the
+    string, everything else falls back to ``strftime``.
+    """
+    if isinstance(timestamp, str):
+        if _is_robot_timestamp(timestamp):
+            if time_format == DATE_TIME_FORMAT:
+                return (
+                    f"{timestamp[0:4]}-{timestamp[4:6]}-{timestamp[6:8]} "
+                    f"{timestamp[9:ROBOT_TIMESTAMP_LENGTH]}"
+                )
+            if time_format == TIME_FORMAT:
+                return timestamp[9:ROBOT_TIMESTAMP_LENGTH]
+        timestamp = parse_robot_timestamp(timestamp)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone()
+    if time_format == DATE_TIME_FORMAT:
+        return (
+            f"{timestamp.year:04d}-{timestamp.month:02d}-{timestamp.day:02d} "
+            f"{timestamp.hour:02d}:{timestamp.minute:02d}:{timestamp.second:02d}."
+            f"{timestamp.microsecond // 1000:03d}"
+        )
+    if time_format == TIME_FORMAT:
+        return (
+            f"{timestamp.hour:02d}:{timestamp.minute:02d}:{timestamp.second:02d}."
+            f"{timestamp.microsecond // 1000:03d}"
+        )
+    return timestamp.strftime(time_format)[:-3]
+
+
+def parse_robot_timestamp(timestamp: str) -> datetime:
+    """Parses Robot's ``YYYYMMDD HH:MM:SS.mmm`` timestamps without ``strptime``."""
+    if not _is_robot_timestamp(timestamp):
+        return datetime.strptime(timestamp, ROBOT_TIMESTAMP_FORMAT)
+    return datetime(
+        int(timestamp[0:4]),
+        int(timestamp[4:6]),
+        int(timestamp[6:8]),
+        int(timestamp[9:11]),
+        int(timestamp[12:14]),
+        int(timestamp[15:17]),
+        int(timestamp[18:21]) * 1000,
+    )
+
+
+@lru_cache(maxsize=TIMESTAMP_CACHE_SIZE)
+def format_utc_timestamp(timestamp: Timestamp) -> str:
+    """Formats a local Robot Framework timestamp as ``YYYY-MM-DDTHH:MM:SS.mmmZ`` in UTC."""
+    if isinstance(timestamp, str):
+        timestamp = parse_robot_timestamp(timestamp)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=LOCAL_TIMEZONE)
+    utc_time = timestamp.astimezone(timezone.utc)
+    return (
+        f"{utc_time.year:04d}-{utc_time.month:02d}-{utc_time.day:02d}T"
+        f"{utc_time.hour:02d}:{utc_time.minute:02d}:{utc_time.second:02d}."
+        f"{utc_time.microsecond // 1000:03d}Z"
+    )
+
+
+def _is_robot_timestamp(timestamp: str) -> bool:
+    return (
+        len(timestamp) == ROBOT_TIMESTAMP_LENGTH
+        and timestamp[8] == " "
+        and timestamp[11] == ":"
+        and timestamp[14] == ":"
+        and timestamp[17] == "."
+    )
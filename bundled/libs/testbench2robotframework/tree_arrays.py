@@ -0,0 +1,203 @@
+from array import array
+from collections import Counter
+from itertools import accumulate, compress, repeat
+from typing import Dict, Iterable, List
+
+from .model import TestStructureElementType, TestStructureTreeNode
+
+NO_PARENT = -1
+# Keyed by the plain string values, which are faster to look up than the enum members.
+ELEMENT_TYPE_CODES = {
+    element_type.value: code for code, element_type in enumerate(TestStructureElementType)
+}
+MISSING_KEY = "-1"
+
+
+class ArrayTree:
+    """Column-wise representation of a test theme tree.
+
+    Row 0 is the root, the other rows follow the ``nodes`` of ``cycle_structure.json``.
+    The columns are read from the undecoded node dictionaries, ``get_node`` decodes
+    single rows on demand. Numeric columns are :mod:`array` objects, string columns
+    are lists that share the strings of the dictionaries. The tree is analysed in a
+    few linear passes over the columns instead of walking node objects: parents are
+    resolved by key once, child counts and the highest child indices are scattered to
+    the parents, and a preorder numbering turns every subtree into a contiguous range
+    of ``preorder``.
+
+    Every row reachable from a root gets the interval ``[preorder_position,
+    postorder_position]``; a row is in the subtree of another row if its interval is
+    nested in the other one. Rows on parent cycles are not numbered and only belong to
+    their own subtree.
+    """
+
+    def __init__(self, nodes: List[Dict]) -> None:
+        self.nodes = nodes
+        bases = [node.get("base") or {} for node in nodes]
+        keys = [base.get("key", MISSING_KEY) for base in bases]
+        rows_by_key = dict(zip(keys, range(len(keys))))
+        self.parent_key = [base.get("parentKey", MISSING_KEY) for base in bases]
+        self.parent = array("i", map(rows_by_key.get, self.parent_key, repeat(NO_PARENT)))
+        if nodes:
+            self.parent[0] = NO_PARENT
+        self.element_type = array(
+            "B",
+            map(
+                ELEMENT_TYPE_CODES.__getitem__,
+                [node.get("elementType", TestStructureElementType.TestThemeNode) for node in nodes],
+            ),
+        )
+        self.uid = [base.get("uniqueID", "") for base in bases]
+        self.name = [base.get("name", "") for base in bases]
+        self.numbering = [base.get("numbering", MISSING_KEY) for base in bases]
+        self.index_text = [numbering.rpartition(".")[2] for numbering in self.numbering]
+        self.child_index = array("i", [0] * min(len(nodes), 1))
+        self.child_index.extend(map(int, self.index_text[1:]))
+        # Nodes whose parent is not part of the tree are grouped by their parentKey.
+        self.orphan_max_child_index: Dict[str, int] = {}
+        self._scatter_to_parents()
+        self._number_preorder()
+
+    @classmethod
+    def from_dict(cls, test_theme_tree: Dict) -> "ArrayTree":
+        """Builds the columns from the undecoded dictionary of ``cycle_structure.json``."""
+        return cls([test_theme_tree.get("root") or {}, *test_theme_tree.get("nodes", [])])
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def _scatter_to_parents(self) -> None:
+        parent = self.parent.tolist()
+        child_index = self.child_index.tolist()
+        child_count = [0] * len(self)
+        self.orphan_count = 0
+        for row, count in Counter(parent[1:]).items():
+            if row == NO_PARENT:
+                self.orphan_count = count
+            else:
+                child_count[row] = count
+        max_child_index = [0] * len(self)
+        for row in range(1, len(self)):
+            parent_row = parent[row]
+            if parent_row == NO_PARENT:
+                parent_key = self.parent_key[row]
+                self.orphan_max_child_index[parent_key] = max(
+                    child_index[row], self.orphan_max_child_index.get(parent_key, 0)
+                )
+            elif child_index[row] > max_child_index[parent_row]:
+                max_child_index[parent_row] = child_index[row]
+        self.child_count = array("I", child_count)
+        self.max_child_index = array("i", max_child_index)
+
+    def _number_preorder(self) -> None:
+        """Numbers the rows in preorder with an explicit stack over CSR child lists.
+
+        Sorting the rows by parent groups the children of every row in their original
+        order, so the child lists are built by one sort instead of a Python loop.
+        """
+        row_count = len(self)
+        parent = self.parent.tolist()
+        # Rows without a parent sort first, they are roots and not children.
+        children = sorted(range(1, row_count), key=parent.__getitem__)[self.orphan_count :]
+        offsets = [0, *accumulate(self.child_count)]
+        depth = [0] * row_count
+        position = [NO_PARENT] * row_count
+        preorder: List[int] = []
+        append = preorder.append
+        stack = [row for row in range(row_count) if parent[row] == NO_PARENT][::-1]
+        while stack:
+            row = stack.pop()
+            if position[row] != NO_PARENT:
+                continue
+            position[row] = len(preorder)
+            append(row)
+            if parent[row] != NO_PARENT:
+                depth[row] = depth[parent[row]] + 1
+            stack.extend(reversed(children[offsets[row] : offsets[row + 1]]))
+        subtree_size = [0] * row_count
+        for row in reversed(preorder):
+            subtree_size[row] += 1
+            if parent[row] != NO_PARENT:
+                subtree_size[parent[row]] += subtree_size[row]
+        self.depth = array("I", depth)
+        self.preorder = array("i", preorder)
+        self.preorder_position = array("i", position)
+        self.subtree_size = array("I", subtree_size)
+        # In a forest numbered root by root, the postorder number of a row is its
+        # preorder number plus its descendants minus its ancestors.
+        self.postorder_position = array(
+            "i",
+            [
+                NO_PARENT if start == NO_PARENT else start + size - 1 - row_depth
+                for start, size, row_depth in zip(position, subtree_size, depth)
+            ],
+        )
+
+    def get_uid(self, row: int) -> str:
+        return self.uid[row]
+
+    def get_index_text(self, row: int) -> str:
+        return self.index_text[row]
+
+    def get_node(self, row: int) -> TestStructureTreeNode:
+        return TestStructureTreeNode.from_dict(self.nodes[row])
+
+    def is_type(self, row: int, element_type: TestStructureElementType) -> bool:
+        return self.element_type[row] == ELEMENT_TYPE_CODES[element_type]
+
+    def rows_of_type(self, element_type: TestStructureElementType) -> List[int]:
+        mask = bytearray(256)
+        mask[ELEMENT_TYPE_CODES[element_type]] = 1
+        return list(compress(range(len(self)), self.element_type.tobytes().translate(mask)))
+
+    def uids_of_type(self, element_type: TestStructureElementType) -> List[str]:
+        return [self.uid[row] for row in self.rows_of_type(element_type)]
+
+    def subtree_rows(self, row: int) -> array:
+        """Returns the rows of the subtree of ``row`` in preorder, ``row`` first."""
+        start = self.preorder_position[row]
+        if start == NO_PARENT:
+            return array("i", [row])
+        return self.preorder[start : start + self.subtree_size[row]]
+
+    def contains(self, ancestor: int, row: int) -> bool:
+        """Whether ``row`` is ``ancestor`` or one of its descendants."""
+        if ancestor == row:
+            return True
+        start = self.preorder_position[ancestor]
+        return (
+            start != NO_PARENT
+            and start < self.preorder_position[row]
+            and self.postorder_position[row] < self.postorder_position[ancestor]
+        )
+
+    def rows_in_subtrees(
+        self, roots: Iterable[int], element_type: TestStructureElementType
+    ) -> List[int]:
+        """Returns the rows of ``element_type`` in the subtrees of ``roots`` in row order.
+
+        The preorder range of every root is marked in a byte mask with one slice
+        assignment, so overlapping and nested roots cost nothing extra.
+        """
+        selected = bytearray(len(self))
+        selected_roots = set()
+        for root in roots:
+            start = self.preorder_position[root]
+            if start == NO_PARENT:
+                selected_roots.add(root)
+                continue
+            size = self.subtree_size[root]
+            selected[start : start + size] = b"\x01" * size
+        position = self.preorder_position
+        return [
+            row
+            for row in self.rows_of_type(element_type)
+            if row in selected_roots or (position[row] != NO_PARENT and selected[position[row]])
+        ]
+
+    def get_sibling_max_child_index(self, row: int) -> int:
+        """Returns the highest child index among ``row`` and its siblings."""
+        parent = self.parent[row]
+        if parent == NO_PARENT:
+            return self.orphan_max_child_index.get(self.parent_key[row], 0)
+        return self.max_child_index[parent]
@@ -1,17 +1,17 @@
 import argparse
+import gc
 import os
 import re
 import shutil
 import sys
-from pathlib import Path, PurePath
-from typing import Dict, Optional, Tuple
+from contextlib import contextmanager
+from functools import cached_property
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 from zipfile import ZipFile
 
-from testbench2robotframework.model import (
-    TestStructureElementType,
-    TestStructureTree,
-    TestStructureTreeNode,
-)
+from testbench2robotframework.model import TestStructureElementType, TestStructureTreeNode
+from testbench2robotframework.tree_arrays import ELEMENT_TYPE_CODES, NO_PARENT, ArrayTree
 
 CONVERTER_DESCRIPTION = """tB2Robot converts TestBench JSON report to Robot Framework Code
                         and Robot Result Model to JSON full report."""
@@ -23,9 +23,48 @@ CONFIG_ARGUMENT_HELP = """Path to a config json file to generate robot files
                         based on the given configuration.
                         If no path is given testbench2robot will search for a file
                         named \"config.json\" in the current working directory."""
-ROBOT_OUTPUT_HELP = """Path to an XML file containing the robot results."""
+ROBOT_OUTPUT_HELP = """Path to an XML file containing the robot results.
+                        Can be given multiple times, e.g. for pabot outputs and reruns.
+                        Tests are merged in the given order, the last result wins."""
 ROBOT_RESULT_HELP = """Path to the directory or ZIP File the TestBench JSON reports
 with result should be saved to."""
+PROFILE_HELP = """Measures the time spent in each conversion phase
+                        and prints a timing and counter table at the end of the run."""
+PROFILE_OUTPUT_HELP = """Path to a file the profile should be written to.
+                        Files ending with '.json' are written as Chrome trace,
+                        all others as cProfile statistics. Requires --profile."""
+MEMORY_REPORT_HELP = """Traces memory allocations and prints peak and retained memory,
+                        top allocation sites and live model objects per phase.
+                        Slows down the conversion considerably."""
+JOBS_HELP = """Number of worker processes the test case sets are imported with.
+                        Each worker maps a shard of the leaf suites."""
+SELECT_HELP = """Only generates the selected part of the report. Can be given multiple times.
+                        'uid:<uniqueID>' and 'numbering:<prefix>' select test themes and
+                        test case sets with their subtrees, 'keyword:<pattern>' and
+                        'tag:<pattern>' select test cases by keyword or UDF tag.
+                        Patterns support Robot Framework tag pattern syntax."""
+ORDERING_FILE_HELP = """Writes a pabot --ordering file with the longest suites first,
+                        based on the durations of the last execution or, if there
+                        is none, on the number of interactions. The same file can be
+                        used with robot --prerunmodifier
+                        testbench2robotframework.suite_ordering.SuiteOrdering:<file>."""
+PROCESSES_HELP = """Number of pabot processes the suites of the ordering file are
+                        balanced over. Every process gets its own group of suites."""
+SNAPSHOT_HELP = """Writes the catalog of the report to a memory-mappable snapshot file
+                        (*.tbsnap) before generating. Snapshots can be passed as
+                        jsonReport instead of the ZIP file or directory."""
+INDEX_HELP = """Resolves --select with a SQLite index next to the report
+                        (<report>.index.sqlite), which is built or refreshed if the
+                        report changed, so that only matching test case files are
+                        opened. Ignored without --select."""
+VALIDATE_HELP = """Dry runs the generated suites in the same process after writing
+                        them and reports unresolved keywords and imports per suite."""
+INCREMENTAL_HELP = """Only maps tests whose result changed since the previous import
+                        into the same result path. Unchanged tests and test case sets
+                        are taken over from the previous result."""
+MAX_MEMORY_HELP = """Maximum resident memory in MiB. The conversion is aborted
+                        with an error as soon as the process exceeds this limit."""
+INVALID_CHARACTERS = re.compile(r'[<>:"/\\|?* ]')
 
 
 arg_parser = argparse.ArgumentParser(description=CONVERTER_DESCRIPTION)
@@ -47,6 +86,16 @@ write_parser.add_argument(
     default=str(Path(os.curdir, "config.json").resolve()),
 )
 
+write_parser.add_argument("--profile", action="store_true", help=PROFILE_HELP)
+write_parser.add_argument("--profile-output", type=str, required=False, help=PROFILE_OUTPUT_HELP)
+write_parser.add_argument("--memory-report", action="store_true", help=MEMORY_REPORT_HELP)
+write_parser.add_argument("--max-memory", type=int, required=False, help=MAX_MEMORY_HELP)
+write_parser.add_argument("--select", action="append", help=SELECT_HELP)
+write_parser.add_argument("--ordering-file", type=str, required=False, help=ORDERING_FILE_HELP)
+write_parser.add_argument("--processes", type=int, default=1, help=PROCESSES_HELP)
+write_parser.add_argument("--snapshot", type=str, required=False, help=SNAPSHOT_HELP)
+write_parser.add_argument("--index", action="store_true", help=INDEX_HELP)
+write_parser.add_argument("--validate", action="store_true", help=VALIDATE_HELP)
 write_parser.add_argument("jsonReport", nargs=1, type=str, help=JSON_PATH_ARGUMENT_HELP)
 
 read_parser = subparsers.add_parser("read", help=READ_SUBPARSER_HELP)
@@ -67,78 +116,104 @@ read_parser.add_argument(
 )
 required_named_arguments = read_parser.add_argument_group('required named arguments')
 required_named_arguments.add_argument(
-    "-o", "--output", help=ROBOT_OUTPUT_HELP, type=str, required=True
+    "-o", "--output", help=ROBOT_OUTPUT_HELP, type=str, required=True, action="append"
 )
 
+read_parser.add_argument("--profile", action="store_true", help=PROFILE_HELP)
+read_parser.add_argument("--profile-output", type=str, required=False, help=PROFILE_OUTPUT_HELP)
+read_parser.add_argument("--memory-report", action="store_true", help=MEMORY_REPORT_HELP)
+read_parser.add_argument("--max-memory", type=int, required=False, help=MAX_MEMORY_HELP)
+read_parser.add_argument("-j", "--jobs", type=int, default=1, help=JOBS_HELP)
+read_parser.add_argument("--incremental", action="store_true", help=INCREMENTAL_HELP)
 read_parser.add_argument("jsonReport", nargs=1, type=str, help=JSON_PATH_ARGUMENT_HELP)
 
 
 class PathResolver:
+    """Resolves the relative paths of the test case sets and their test themes.
+
+    Paths are plain strings joined with ``os.sep``. Nodes of the catalogs are only
+    decoded from the tree when a catalog is accessed.
+    """
+
     def __init__(
         self,
-        test_theme_tree: TestStructureTree,
+        tree_arrays: ArrayTree,
         uids_of_existing_tcs: Tuple[str, ...],
         log_suite_numbers: bool,
     ):
-        self.tcs_catalog: Dict[str, TestStructureTreeNode] = {}
-        self.tt_catalog: Dict[str, TestStructureTreeNode] = {}
-        self.tree_dict: Dict[str, TestStructureTreeNode] = {}
-        self._last_child_indices: Dict[str, int] = {}
+        self.tree = tree_arrays
+        self._paths: List[Optional[str]] = [None] * len(self.tree)
         self._log_suite_numbers = log_suite_numbers
-        self._uids_of_existing_tcs = uids_of_existing_tcs
-        self._analyze_tree(test_theme_tree)
-        self.tcs_paths = self._get_paths(self.tcs_catalog)
-        self.tt_paths = self._get_paths(self.tt_catalog)
-
-    def _analyze_tree(self, test_theme_tree: TestStructureTree):
-        self.tree_dict[test_theme_tree.root.base.key] = test_theme_tree.root
-        self._add_existing_tcs_to_catalog(test_theme_tree.root)
-        for tse in test_theme_tree.nodes:
-            self._add_existing_tcs_to_catalog(tse)
-            self.tree_dict[tse.base.key] = tse
-            self._store_highest_child_index(tse)
-
-    def _store_highest_child_index(self, tse):
-        self._last_child_indices[tse.base.parentKey] = max(
-            int(get_tse_index(tse)),
-            self._last_child_indices.get(tse.base.parentKey, 0),
-        )
+        self._uids_of_existing_tcs = frozenset(uids_of_existing_tcs)
+        self._analyze_tree()
+        self.tcs_paths = self._get_paths(self._tcs_rows)
+        self.tt_paths = {uid: self._paths[row] for uid, row in self._tt_rows.items()}
 
-    def _add_existing_tcs_to_catalog(self, tse):
-        if (
-            tse.elementType == TestStructureElementType.TestCaseSetNode
-            and tse.base.uniqueID in self._uids_of_existing_tcs
-        ):
-            self.tcs_catalog[tse.base.uniqueID] = tse
-
-    def _get_paths(self, tse_catalog: Dict[str, TestStructureTreeNode]) -> Dict[str, PurePath]:
-        return {uid: self._resolve_tse_path(tse) for uid, tse in tse_catalog.items()}
-
-    def _resolve_tse_path(self, tse: TestStructureTreeNode) -> PurePath:
-        self._add_tt_to_tt_catalog(tse)
-        if tse.elementType == TestStructureElementType.RootNode:
-            return PurePath()
-        tse_name = replace_invalid_characters(tse.base.name)
-        if tse.base.parentKey not in self.tree_dict:
-            return PurePath(f"{self._file_prefix(tse)}{tse_name}")
-        parent_path = self._resolve_tse_path(self.tree_dict[tse.base.parentKey])
-        return parent_path / f"{self._file_prefix(tse)}{tse_name}"
-
-    def _add_tt_to_tt_catalog(self, tse):
-        if (
-            tse.elementType == TestStructureElementType.TestThemeNode
-            and tse.base.uniqueID not in self.tt_catalog
-        ):
-            self.tt_catalog[tse.base.uniqueID] = tse
-
-    def _file_prefix(self, tse) -> str:
-        prefix_separator = '_' * self._log_suite_numbers
-        return f"{self._get_padded_index(tse)}_{prefix_separator}"
-
-    def _get_padded_index(self, tse) -> str:
-        index = get_tse_index(tse)
-        max_length = len(str(self._last_child_indices.get(tse.base.parentKey, "")))
-        return index.zfill(max_length)
+    @cached_property
+    def tcs_catalog(self) -> Dict[str, TestStructureTreeNode]:
+        return {uid: self.tree.get_node(row) for uid, row in self._tcs_rows.items()}
+
+    @cached_property
+    def tt_catalog(self) -> Dict[str, TestStructureTreeNode]:
+        return {uid: self.tree.get_node(row) for uid, row in self._tt_rows.items()}
+
+    def _analyze_tree(self):
+        uids = self.tree.uid
+        existing = self._uids_of_existing_tcs
+        self._tcs_rows: Dict[str, int] = {}
+        self._tt_rows: Dict[str, int] = {}
+        for row in self.tree.rows_of_type(TestStructureElementType.TestCaseSetNode):
+            if uids[row] in existing:
+                self._tcs_rows[uids[row]] = row
+
+    def _get_paths(self, catalog_rows: Dict[str, int]) -> Dict[str, str]:
+        """Resolves the path of every row from the nearest ancestor with a known path.
+
+        Test themes are added to the catalog from the node upwards, in the same order
+        as a recursive resolution would find them. The loop works on local references
+        to the columns, because it runs once for every node of the tree.
+        """
+        tree = self.tree
+        paths, parent, position = self._paths, tree.parent, tree.preorder_position
+        element_type, uids, names, index_texts = (
+            tree.element_type,
+            tree.uid,
+            tree.name,
+            tree.index_text,
+        )
+        root_code = ELEMENT_TYPE_CODES[TestStructureElementType.RootNode]
+        theme_code = ELEMENT_TYPE_CODES[TestStructureElementType.TestThemeNode]
+        separator = "_" * self._log_suite_numbers
+        replace_invalid = INVALID_CHARACTERS.sub
+        tt_rows = self._tt_rows
+        resolved = {}
+        for uid, row in catalog_rows.items():
+            chain: List[int] = []
+            while row != NO_PARENT and paths[row] is None:
+                if position[row] == NO_PARENT:
+                    sys.exit(f"Test theme tree contains a cycle at '{uids[row]}'.")
+                if element_type[row] == theme_code:
+                    tt_rows.setdefault(uids[row], row)
+                chain.append(row)
+                row = parent[row]
+            path = "" if row == NO_PARENT else paths[row]
+            for row in reversed(chain):
+                if element_type[row] == root_code:
+                    path = ""
+                    paths[row] = path
+                    continue
+                max_length = len(str(tree.get_sibling_max_child_index(row)))
+                path_name = (
+                    f"{index_texts[row].zfill(max_length)}_{separator}"
+                    f"{replace_invalid('_', names[row])}"
+                )
+                if parent[row] == NO_PARENT or not path:
+                    path = path_name
+                else:
+                    path = f"{path}{os.sep}{path_name}"
+                paths[row] = path
+            resolved[uid] = path
+        return resolved
 
 
 def get_directory(json_report_path: Optional[str]) -> str:
@@ -163,7 +238,7 @@ def ensure_dir_exists(cli_output_dir):
 
 
 def replace_invalid_characters(name: str) -> str:
-    return re.sub(r'[<>:"/\\|?* ]', "_", name)
+    return INVALID_CHARACTERS.sub("_", name)
 
 
 def get_tse_index(tse: TestStructureTreeNode) -> str:
@@ -177,6 +252,22 @@ def directory_to_zip(directory: Path, new_path: Optional[str] = None):
         shutil.make_archive(str(directory), 'zip', str(directory))
 
 
+@contextmanager
+def paused_garbage_collection():
+    """Pauses the cyclic garbage collector while many long-lived objects are created.
+
+    Decoding a report creates millions of acyclic model objects, which would otherwise
+    trigger repeated full collections over all objects created so far.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
 def get_list_item(lst, index, default: Optional[str]):
     try:
         return lst[index]
@@ -0,0 +1,18 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT_PATH = Path(__file__).resolve().parent.parent
+for path in (ROOT_PATH, ROOT_PATH / "bundled" / "libs", ROOT_PATH / "benchmarks"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from synthetic_report import create_workspace  # noqa: E402
+
+from tests.helpers import SMALL_REPORT, SyntheticWorkspace  # noqa: E402
+
+
+@pytest.fixture
+def synthetic_workspace(tmp_path) -> SyntheticWorkspace:
+    return SyntheticWorkspace(create_workspace(tmp_path, SMALL_REPORT, with_results=False))
@@ -0,0 +1,147 @@
+"""Synthetic reports and test structure trees shared by the test modules."""
+
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from synthetic_report import (
+    FAILING_KEYWORD,
+    FAILING_VALUE,
+    RESOURCE_NAME,
+    SyntheticReportSpec,
+    create_workspace,
+    write_json,
+)
+from testbench2robotframework.tree_arrays import ArrayTree
+
+TEST_THEME = "TestThemeNode"
+TEST_CASE_SET = "TestCaseSetNode"
+
+
+def create_node(key, parent_key, numbering, element_type=TEST_THEME):
+    return {
+        "elementType": element_type,
+        "base": {
+            "key": key,
+            "numbering": numbering,
+            "parentKey": parent_key,
+            "name": f"Node {numbering}",
+            "uniqueID": f"uid-{key}",
+        },
+    }
+
+
+def create_tree(nodes) -> ArrayTree:
+    root = create_node("root", "", "", "RootNode")
+    return ArrayTree.from_dict({"root": root, "nodes": nodes})
+
+
+EXAMPLE_NODES = [
+    create_node("1", "root", "1"),
+    create_node("2", "1", "1.1", TEST_CASE_SET),
+    create_node("3", "1", "1.2"),
+    create_node("4", "3", "1.2.1", TEST_CASE_SET),
+    create_node("5", "root", "2"),
+    create_node("6", "5", "2.1", TEST_CASE_SET),
+    create_node("7", "missing", "3.1", TEST_CASE_SET),
+]
+
+
+SMALL_REPORT = SyntheticReportSpec(
+    tree_depth=1,
+    fan_out=2,
+    test_case_sets_per_theme=2,
+    test_cases_per_set=3,
+    interactions_per_test_case=4,
+    interaction_nesting=1,
+)
+
+
+def atomic_interaction(
+    name: str, sequence_phase: str = "TestStep", value: Optional[str] = None
+) -> Dict:
+    return {
+        "key": f"{name}-{sequence_phase}-{value}",
+        "uniqueID": f"itb-IA-{name.replace(' ', '-')}",
+        "name": name,
+        "interactionType": "Atomic",
+        "path": f"RF-Resource.{RESOURCE_NAME}.{name}",
+        "spec": {"sequencePhase": sequence_phase},
+        "parameters": [
+            {
+                "key": f"{name}-param",
+                "name": "param1",
+                "value": value or "value 1",
+                "useType": "CallByValue",
+            }
+        ],
+        "interactions": [],
+    }
+
+
+def failing_interaction() -> Dict:
+    return atomic_interaction(FAILING_KEYWORD, value=FAILING_VALUE)
+
+
+class SyntheticWorkspace:
+    """A small synthetic report with resources and a config for round trip tests."""
+
+    def __init__(self, paths: Dict) -> None:
+        self.paths = paths
+        self.report: Path = paths["report"]
+        self.config = json.loads(paths["config"].read_text(encoding="utf-8"))
+
+    @property
+    def test_case_uids(self) -> List[str]:
+        return sorted(
+            path.stem for path in self.report.glob("itb-TC-*-PC-*.json")
+        )
+
+    def set_interactions(self, test_case_uid: str, interactions: List[Dict]) -> None:
+        test_case_path = self.report / f"{test_case_uid}.json"
+        test_case = json.loads(test_case_path.read_text(encoding="utf-8"))
+        test_case["interactions"] = interactions
+        write_json(test_case_path, test_case)
+
+    def write(self, **config) -> Path:
+        from testbench2robotframework import testbench2robotframework  # noqa: PLC0415
+
+        testbench2robotframework(str(self.report), {**self.config, **config})
+        return self.paths["generation"]
+
+    def run_robot(self, output: Optional[Path] = None, **options) -> Path:
+        from robot import run  # noqa: PLC0415
+
+        output = output or self.paths["output"]
+        run(
+            str(self.paths["generation"]),
+            output=str(output),
+            log="NONE",
+            report="NONE",
+            console="none",
+            **options,
+        )
+        return output
+
+    def read(self, result_directory: Path, **config) -> Path:
+        from testbench2robotframework.robotframework2testbench import (  # noqa: PLC0415
+            robot2testbench,
+        )
+
+        robot2testbench(
+            str(self.report),
+            str(self.paths["output"]),
+            str(result_directory),
+            {**self.config, **config},
+        )
+        return result_directory
+
+    def round_trip(self, result_directory: Path, **config) -> Path:
+        self.write(**config)
+        self.run_robot()
+        return self.read(result_directory, **config)
+
+
+def get_interaction_verdicts(result_directory: Path, test_case_uid: str) -> List[str]:
+    test_case = json.loads((result_directory / f"{test_case_uid}.json").read_text("utf-8"))
+    return [interaction["exec"]["verdict"] for interaction in test_case["interactions"]]
@@ -0,0 +1,49 @@
+import json
+import shutil
+
+from testbench2robotframework import testbench2robotframework as write_report
+from testbench2robotframework.catalog_snapshot import (
+    SNAPSHOT_SUFFIX,
+    CatalogSnapshot,
+    write_catalog_snapshot,
+)
+
+
+def write_and_collect(workspace, report, **options):
+    generation = workspace.paths["generation"]
+    shutil.rmtree(generation, ignore_errors=True)
+    write_report(str(report), workspace.config, **options)
+    return {
+        path.relative_to(generation).as_posix(): path.read_bytes()
+        for path in sorted(generation.rglob("*"))
+        if path.is_file()
+    }
+
+
+def test_snapshot_documents_equal_report_files(synthetic_workspace, tmp_path):
+    report = synthetic_workspace.report
+    snapshot_path = tmp_path / f"report{SNAPSHOT_SUFFIX}"
+    write_catalog_snapshot(str(report), str(snapshot_path))
+    snapshot = CatalogSnapshot(str(snapshot_path))
+    try:
+        for test_case_uid in synthetic_workspace.test_case_uids:
+            test_case = json.loads((report / f"{test_case_uid}.json").read_text("utf-8"))
+            assert snapshot.read_document(test_case_uid) == test_case
+            assert snapshot.read_interactions(test_case_uid) == test_case["interactions"]
+            test_case_set_uid = test_case_uid.rsplit("-PC-", 1)[0]
+            assert test_case_uid in snapshot.get_test_case_uids(test_case_set_uid)
+        assert snapshot.read_document("itb-TC-missing") is None
+        assert snapshot.read_interactions("itb-TC-missing") == []
+    finally:
+        snapshot.close()
+
+
+def test_write_from_snapshot_generates_the_same_suites(synthetic_workspace, tmp_path):
+    report = synthetic_workspace.report
+    snapshot_path = tmp_path / f"report{SNAPSHOT_SUFFIX}"
+    suites = write_and_collect(synthetic_workspace, report)
+    assert suites
+
+    assert write_and_collect(synthetic_workspace, report, snapshot=str(snapshot_path)) == suites
+    assert snapshot_path.exists()
+    assert write_and_collect(synthetic_workspace, snapshot_path) == suites
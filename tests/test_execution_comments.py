@@ -0,0 +1,53 @@
+import json
+from pathlib import Path
+
+from testbench2robotframework.html_comments import ROW_SEPARATOR, TRUNCATED_TESTS_ROW_TEMPLATE
+
+from tests.helpers import FAILING_KEYWORD, FAILING_VALUE, RESOURCE_NAME, atomic_interaction
+
+TEST_CASE_SET_UID = "itb-TC-1"
+TABLE_START = "<table><tr>"
+TABLE_END = "</tr></table>"
+
+
+def read_comments(result_directory, uid):
+    element = json.loads((result_directory / f"{uid}.json").read_text(encoding="utf-8"))
+    return element["exec"]["comments"]
+
+
+def fail_all_test_cases(workspace, message):
+    """Lets the failing keyword fail with its argument as message in every test case."""
+    resource = Path(workspace.config["resourceDirectory"], f"{RESOURCE_NAME}.resource")
+    content = resource.read_text(encoding="utf-8")
+    check = f"Should Not Contain    ${{args}}    {FAILING_VALUE}"
+    resource.write_text(content.replace(check, "Fail    @{args}"), encoding="utf-8")
+    failing = atomic_interaction(FAILING_KEYWORD, value=message)
+    for test_case_uid in workspace.test_case_uids:
+        workspace.set_interactions(test_case_uid, [failing])
+
+
+def test_plain_messages_are_escaped_in_test_and_suite_comments(synthetic_workspace, tmp_path):
+    fail_all_test_cases(synthetic_workspace, "<fail>")
+
+    result = synthetic_workspace.round_trip(tmp_path / "result")
+
+    for uid in (TEST_CASE_SET_UID, f"{TEST_CASE_SET_UID}-PC-1"):
+        comments = read_comments(result, uid)
+        assert "&lt;fail&gt;" in comments
+        assert "<fail>" not in comments
+
+
+def test_suite_comment_table_stays_within_the_budget(synthetic_workspace, tmp_path):
+    budget = 400
+    fail_all_test_cases(synthetic_workspace, "<fail> " * 100)
+
+    result = synthetic_workspace.round_trip(tmp_path / "result", maxTestCommentSize=budget)
+
+    comments = read_comments(result, TEST_CASE_SET_UID)
+    rows = comments.split(TABLE_START, 1)[1].rsplit(TABLE_END, 1)[0]
+    kept_rows, truncation_row = rows.rsplit(ROW_SEPARATOR, 1)
+    assert truncation_row == TRUNCATED_TESTS_ROW_TEMPLATE(
+        count=kept_rows.count(ROW_SEPARATOR) + 1, budget=budget
+    )
+    assert len(kept_rows) <= budget
+    assert "&lt;fail&gt;" in kept_rows
@@ -0,0 +1,145 @@
+import os
+from pathlib import Path
+from zipfile import ZipFile
+
+from testbench2robotframework.incremental_import import patch_result_zip
+from testbench2robotframework.robotframework2testbench import robot2testbench
+
+from tests.helpers import (
+    RESOURCE_NAME,
+    atomic_interaction,
+    failing_interaction,
+    get_interaction_verdicts,
+)
+
+
+def write_files(directory, files):
+    paths = []
+    for name, content in files.items():
+        path = directory / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+        paths.append(path)
+    return paths
+
+
+def read_zip(zip_path):
+    with ZipFile(zip_path) as archive:
+        assert archive.testzip() is None
+        names = archive.namelist()
+        assert len(names) == len(set(names))
+        return {name: archive.read(name) for name in names}
+
+
+def create_zip(zip_path, files):
+    with ZipFile(zip_path, "w") as archive:
+        for name, content in files.items():
+            archive.writestr(name, content)
+
+
+def test_patch_replaces_changed_files_only(tmp_path):
+    zip_path = tmp_path / "result.zip"
+    create_zip(zip_path, {"a.json": b"a", "attachments/b.txt": b"b", "c.json": b"c"})
+    result_dir = tmp_path / "result"
+    changed = write_files(result_dir, {"a.json": b"new a", "attachments/b.txt": b"new b"})
+    changed += write_files(result_dir, {"d.json": b"d"})
+
+    patch_result_zip(zip_path, result_dir, changed)
+
+    assert read_zip(zip_path) == {
+        "a.json": b"new a",
+        "attachments/b.txt": b"new b",
+        "c.json": b"c",
+        "d.json": b"d",
+    }
+
+
+def test_patch_appends_new_files(tmp_path):
+    zip_path = tmp_path / "result.zip"
+    create_zip(zip_path, {"a.json": b"a"})
+    result_dir = tmp_path / "result"
+    patch_result_zip(zip_path, result_dir, write_files(result_dir, {"b.json": b"b"}))
+    assert read_zip(zip_path) == {"a.json": b"a", "b.json": b"b"}
+
+
+def test_patch_leaves_no_superseded_entries(tmp_path):
+    zip_path = tmp_path / "result.zip"
+    content = os.urandom(64 * 1024)
+    create_zip(zip_path, {"large.json": content, "small.json": b"small"})
+    result_dir = tmp_path / "result"
+    for _ in range(3):
+        content = os.urandom(64 * 1024)
+        patch_result_zip(zip_path, result_dir, write_files(result_dir, {"large.json": content}))
+        assert read_zip(zip_path) == {"large.json": content, "small.json": b"small"}
+        assert zip_path.stat().st_size < len(content) + 1024
+    assert not zip_path.with_name("result.zip.tmp").exists()
+
+
+def read_incrementally(workspace, result_zip):
+    robot2testbench(
+        str(workspace.report),
+        str(workspace.paths["output"]),
+        str(result_zip),
+        workspace.config,
+        incremental=True,
+    )
+    return read_zip(result_zip)
+
+
+def read_zip_and_check(workspace, result_zip, extract_directory):
+    result = read_incrementally(workspace, result_zip)
+    with ZipFile(result_zip) as archive:
+        archive.extractall(extract_directory)
+    for test_case_uid in workspace.test_case_uids:
+        assert "Undefined" not in get_interaction_verdicts(extract_directory, test_case_uid)
+    return {name: content for name, content in result.items() if name.startswith("itb-TC-")}
+
+
+def test_incremental_read_takes_over_unchanged_results(synthetic_workspace, tmp_path):
+    result_zip = tmp_path / "result.zip"
+    synthetic_workspace.write()
+    synthetic_workspace.run_robot()
+    first_result = read_zip_and_check(synthetic_workspace, result_zip, tmp_path / "first")
+    second_result = read_zip_and_check(synthetic_workspace, result_zip, tmp_path / "second")
+    assert second_result == first_result
+
+
+def read_directory(directory):
+    return {
+        path.relative_to(directory).as_posix(): path.read_bytes()
+        for path in sorted(directory.rglob("*"))
+        if path.is_file()
+    }
+
+
+def fix_failing_keyword(workspace):
+    resource = Path(workspace.config["resourceDirectory"], f"{RESOURCE_NAME}.resource")
+    content = resource.read_text(encoding="utf-8")
+    resource.write_text(content.replace("Should Not Contain", "Log Many"), encoding="utf-8")
+
+
+def test_incremental_read_of_a_rerun_equals_a_merged_read(synthetic_workspace, tmp_path):
+    for index, test_case_uid in enumerate(synthetic_workspace.test_case_uids):
+        interactions = [atomic_interaction("Synthetic Step 1")]
+        if index % 2 == 0:
+            interactions.append(failing_interaction())
+        synthetic_workspace.set_interactions(test_case_uid, interactions)
+    synthetic_workspace.write()
+    output_xml = synthetic_workspace.run_robot()
+    fix_failing_keyword(synthetic_workspace)
+    rerun_xml = synthetic_workspace.run_robot(tmp_path / "rerun.xml", rerunfailed=str(output_xml))
+    report, config = str(synthetic_workspace.report), synthetic_workspace.config
+
+    incremental = tmp_path / "incremental"
+    robot2testbench(report, str(output_xml), str(incremental), config, incremental=True)
+    first_result = read_directory(incremental)
+    robot2testbench(report, str(rerun_xml), str(incremental), config, incremental=True)
+    merged = tmp_path / "merged"
+    robot2testbench(report, [str(output_xml), str(rerun_xml)], str(merged), config)
+
+    incremental_result = read_directory(incremental)
+    assert incremental_result == read_directory(merged)
+    assert incremental_result != first_result
+    for index, test_case_uid in enumerate(synthetic_workspace.test_case_uids):
+        verdicts = get_interaction_verdicts(incremental, test_case_uid)
+        assert verdicts == (["Pass", "Pass"] if index % 2 == 0 else ["Pass"])
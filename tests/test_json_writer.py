@@ -0,0 +1,100 @@
+import os
+
+import pytest
+
+from testbench2robotframework import json_writer
+from testbench2robotframework.config import FsyncPolicy
+from testbench2robotframework.io_engine import IoEngine
+from testbench2robotframework.json_writer import GroupCommitWriter, replace_file
+
+
+@pytest.fixture
+def synced(monkeypatch):
+    """Records the number of synced files and the synced paths of ``fsync_path``."""
+    synced = {"files": 0, "paths": []}
+    fsync = os.fsync
+
+    def count_fsync(file_descriptor):
+        synced["files"] += 1
+        fsync(file_descriptor)
+
+    def record_fsync_path(path):
+        synced["paths"].append(path)
+
+    monkeypatch.setattr(json_writer.os, "fsync", count_fsync)
+    monkeypatch.setattr(json_writer, "fsync_path", record_fsync_path)
+    return synced
+
+
+def list_files(directory):
+    return sorted(path.name for path in directory.rglob("*") if path.is_file())
+
+
+def test_replace_file_replaces_without_leaving_temporary_files(tmp_path):
+    target = tmp_path / "result.json"
+    target.write_bytes(b"old")
+    replace_file(target, b"new")
+    assert target.read_bytes() == b"new"
+    assert list_files(tmp_path) == ["result.json"]
+
+
+def test_writer_keeps_files_pending_until_a_batch_is_full(tmp_path):
+    writer = GroupCommitWriter(batch_size=10)
+    writer.write(tmp_path / "a.json", b"aaaa")
+    writer.write(tmp_path / "a.json", b"aaaaa")
+    writer.write(tmp_path / "b.json", b"bbbb")
+    assert writer.pending_size == 9
+    assert list_files(tmp_path) == []
+
+    writer.flush_if_pending(tmp_path / "c.json")
+    assert list_files(tmp_path) == []
+    writer.flush_if_pending(tmp_path / "a.json")
+    assert list_files(tmp_path) == ["a.json", "b.json"]
+    assert (tmp_path / "a.json").read_bytes() == b"aaaaa"
+
+    writer.write(tmp_path / "c.json", b"c" * 10)
+    assert list_files(tmp_path) == ["a.json", "b.json", "c.json"]
+    writer.close()
+
+
+@pytest.mark.parametrize(
+    "fsync, files_synced_per_batch, paths_synced_per_batch, paths_synced_on_close",
+    [
+        (FsyncPolicy.NEVER, 0, 0, 0),
+        (FsyncPolicy.BATCH, 2, 2, 0),
+        (FsyncPolicy.END, 0, 0, 4),
+    ],
+)
+def test_writer_syncs_by_policy(
+    tmp_path, synced, fsync, files_synced_per_batch, paths_synced_per_batch, paths_synced_on_close
+):
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    writer = GroupCommitWriter(batch_size=1024, fsync=fsync)
+    writer.write(tmp_path / "a" / "1.json", b"1")
+    writer.write(tmp_path / "b" / "2.json", b"2")
+    writer.flush()
+    assert synced["files"] == files_synced_per_batch
+    assert len(synced["paths"]) == paths_synced_per_batch
+    writer.close()
+    assert synced["files"] == files_synced_per_batch
+    assert len(synced["paths"]) == paths_synced_per_batch + paths_synced_on_close
+    assert list_files(tmp_path) == ["1.json", "2.json"]
+
+
+def test_writer_syncs_files_before_their_directories_on_close(tmp_path, synced):
+    writer = GroupCommitWriter(batch_size=1024, fsync=FsyncPolicy.END)
+    writer.write(tmp_path / "1.json", b"1")
+    writer.close()
+    assert synced["paths"] == [tmp_path / "1.json", tmp_path]
+
+
+def test_writer_writes_batches_concurrently_with_an_io_engine(tmp_path):
+    io_engine = IoEngine(4)
+    writer = GroupCommitWriter(batch_size=1024, io_engine=io_engine)
+    contents = {tmp_path / f"{index}.json": str(index).encode() * 10 for index in range(20)}
+    for filepath, content in contents.items():
+        writer.write(filepath, content)
+    writer.close()
+    io_engine.close()
+    assert {path: path.read_bytes() for path in tmp_path.iterdir()} == contents
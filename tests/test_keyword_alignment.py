@@ -0,0 +1,69 @@
+import re
+import sys
+
+from testbench2robotframework.keyword_alignment import (
+    WHITESPACE_AND_UNDERSCORE_TABLE,
+    align_keywords,
+    normalize_keyword_name,
+)
+
+
+def normalize_with_regex(keyword_name):
+    return re.sub(r"[\s_]", "", keyword_name.lower())
+
+
+def test_translation_table_removes_the_characters_of_the_regex():
+    all_characters = "".join(map(chr, range(sys.maxunicode + 1)))
+    assert all_characters.translate(WHITESPACE_AND_UNDERSCORE_TABLE) == re.sub(
+        r"[\s_]", "", all_characters
+    )
+
+
+def test_normalization_matches_the_regex():
+    for keyword_name in (
+        "Open Browser",
+        "open_browser",
+        "Open\u3000Browser",
+        "Open\u00a0Browser\u2029",
+        "Ünïcode\tKeyword\x1c",
+        "Resource.Keyword Name",
+    ):
+        assert normalize_keyword_name(keyword_name) == normalize_with_regex(keyword_name)
+
+
+def test_matching_keywords_are_aligned_exactly():
+    alignment = align_keywords(["Open Browser", "Close"], ["open_browser", "Resource.Close"])
+    assert alignment.keyword_indices == [0, 1]
+    assert alignment.is_exact
+
+
+def test_extra_keywords_are_skipped():
+    alignment = align_keywords(["A", "B"], ["A", "Log", "Log", "B"])
+    assert alignment.keyword_indices == [0, 3]
+    assert alignment.extra_keywords == [1, 2]
+    assert alignment.missing_interactions == []
+
+
+def test_interactions_without_keyword_are_skipped():
+    alignment = align_keywords(["A", "X", "B", "C"], ["A", "B", "C"])
+    assert alignment.keyword_indices == [0, None, 1, 2]
+    assert alignment.missing_interactions == [1]
+    assert alignment.extra_keywords == []
+
+
+def test_unrelated_names_are_skipped_pairwise():
+    alignment = align_keywords(["A", "X", "C"], ["A", "Y", "C"])
+    assert alignment.keyword_indices == [0, None, 2]
+    assert alignment.missing_interactions == [1]
+    assert alignment.extra_keywords == [1]
+
+
+def test_repeated_names_are_aligned_in_order():
+    alignment = align_keywords(["A", "B", "A", "B"], ["A", "B", "B", "A", "B"])
+    assert alignment.keyword_indices == [0, 1, 3, 4]
+    assert alignment.extra_keywords == [2]
+
+
+def test_interactions_after_the_last_keyword_stay_unassigned():
+    alignment = align_keywords(["A", "B", "C"], ["A"])
+    assert alignment.keyword_indices == [0, None, None]
@@ -0,0 +1,61 @@
+from io import StringIO
+
+from robot.api import get_model
+from testbench2robotframework.keyword_hoisting import find_call_runs, get_test_case_bodies
+
+from tests.helpers import atomic_interaction, failing_interaction, get_interaction_verdicts
+
+REPEATED_STEPS = [atomic_interaction(f"Synthetic Step {index}") for index in (1, 2, 3)]
+
+
+def test_hoisted_calls_after_a_failure_are_skipped(synthetic_workspace, tmp_path):
+    first, *others = synthetic_workspace.test_case_uids
+    synthetic_workspace.set_interactions(first, [failing_interaction(), *REPEATED_STEPS])
+    for test_case_uid in others:
+        synthetic_workspace.set_interactions(test_case_uid, REPEATED_STEPS)
+
+    generation = synthetic_workspace.write(keywordHoisting={"enabled": True})
+    assert (generation / "hoisted_keywords.resource").is_file()
+    synthetic_workspace.run_robot()
+    result = synthetic_workspace.read(tmp_path / "result", keywordHoisting={"enabled": True})
+
+    assert get_interaction_verdicts(result, first) == ["Fail", "Skipped", "Skipped", "Skipped"]
+    assert get_interaction_verdicts(result, others[0]) == ["Pass", "Pass", "Pass"]
+
+
+def test_hoisted_round_trip_reads_the_same_results_as_a_plain_one(synthetic_workspace, tmp_path):
+    for test_case_uid in synthetic_workspace.test_case_uids:
+        synthetic_workspace.set_interactions(test_case_uid, REPEATED_STEPS)
+
+    plain = synthetic_workspace.round_trip(tmp_path / "plain")
+    hoisted = synthetic_workspace.round_trip(
+        tmp_path / "hoisted", keywordHoisting={"enabled": True}
+    )
+
+    assert (synthetic_workspace.paths["generation"] / "hoisted_keywords.resource").is_file()
+    for test_case_uid in synthetic_workspace.test_case_uids:
+        verdicts = get_interaction_verdicts(hoisted, test_case_uid)
+        assert verdicts == get_interaction_verdicts(plain, test_case_uid) == ["Pass"] * 3
+
+
+def test_call_runs_end_at_compound_interactions():
+    test_suite = get_model(
+        StringIO(
+            "*** Test Cases ***\n"
+            "Test\n"
+            "    Step A    value\n"
+            "    # Compound\n"
+            "        Step B    value\n"
+            "        Step C    value\n"
+            "    Step D    value\n"
+            "    Step E    value\n"
+        )
+    )
+    call_ids = {}
+    runs, _ = find_call_runs(get_test_case_bodies({"suite": test_suite}), call_ids)
+    names = {call_id: key[0] for key, call_id in call_ids.items()}
+    assert [[names[call_id] for call_id in run] for run in runs] == [
+        ["Step A"],
+        ["Step B", "Step C"],
+        ["Step D", "Step E"],
+    ]
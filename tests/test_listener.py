@@ -0,0 +1,28 @@
+import json
+
+from tests.helpers import failing_interaction, get_interaction_verdicts
+
+LISTENER = "testbench2robotframework.listener.TestBenchListener"
+
+
+def read_result_files(result_directory):
+    return {
+        path.name: json.loads(path.read_text(encoding="utf-8"))
+        for path in sorted(result_directory.glob("*.json"))
+    }
+
+
+def test_live_results_equal_a_read_of_the_same_output_xml(synthetic_workspace, tmp_path):
+    first_test_case = synthetic_workspace.test_case_uids[0]
+    synthetic_workspace.set_interactions(first_test_case, [failing_interaction()])
+    live, read = tmp_path / "live", tmp_path / "read"
+    synthetic_workspace.write()
+
+    config = synthetic_workspace.paths["config"]
+    synthetic_workspace.run_robot(
+        listener=f"{LISTENER}:{synthetic_workspace.report}:{live}:{config}"
+    )
+    synthetic_workspace.read(read)
+
+    assert get_interaction_verdicts(live, first_test_case) == ["Fail"]
+    assert read_result_files(live) == read_result_files(read)
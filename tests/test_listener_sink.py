@@ -0,0 +1,65 @@
+import json
+from zipfile import ZipFile
+
+from testbench2robotframework.listener_sink import (
+    PROJECT_FILE,
+    PROTOCOL_FILE,
+    ListenerProtocolSink,
+)
+from testbench2robotframework.model import ProtocolTestCaseSetExecutionSummary
+
+LISTENER_UID = "itb-TC-1"
+
+
+def create_protocol(key):
+    return ProtocolTestCaseSetExecutionSummary.from_dict(
+        {"testCaseSetKey": key, "durationMillis": 1, "executionKey": key, "testCases": []}
+    )
+
+
+def write_result_file(directory, name):
+    result_file = directory / name
+    result_file.write_text(json.dumps({"uniqueID": name}), encoding="utf-8")
+    return result_file
+
+
+def read_archive(zip_path):
+    with ZipFile(zip_path) as archive:
+        assert archive.testzip() is None
+        names = archive.namelist()
+        protocol = json.loads(archive.read(PROTOCOL_FILE))
+    assert len(names) == len(set(names))
+    return sorted(names), [entry["testCaseSetKey"] for entry in protocol]
+
+
+def test_archive_receives_each_test_case_set_when_it_ends(tmp_path):
+    report, result, result_path = (tmp_path / name for name in ("report", "temp", "result"))
+    for directory in (report, result):
+        directory.mkdir()
+    (report / PROJECT_FILE).write_text("{}", encoding="utf-8")
+    sink = ListenerProtocolSink(str(report), str(result), str(result_path), LISTENER_UID)
+
+    first = write_result_file(result, f"{LISTENER_UID}-PC-1.json")
+    sink.add_test_case_set(create_protocol("1"), [first])
+    first.unlink()
+    sink.add_test_case_set(
+        create_protocol("2"),
+        [
+            write_result_file(result, f"{LISTENER_UID}-PC-2.json"),
+            write_result_file(result, "other.json"),
+        ],
+    )
+    write_result_file(result, f"{LISTENER_UID}-PC-3.json")
+    sink.close()
+    sink.close()
+
+    assert read_archive(result_path / f"{LISTENER_UID}.zip") == (
+        [
+            f"{LISTENER_UID}-PC-1.json",
+            f"{LISTENER_UID}-PC-2.json",
+            f"{LISTENER_UID}-PC-3.json",
+            PROJECT_FILE,
+            PROTOCOL_FILE,
+        ],
+        ["1", "2"],
+    )
@@ -0,0 +1,92 @@
+import os
+
+import pytest
+from testbench2robotframework.report_cache import OBJECT_DIRECTORY, STAT_DIRECTORY, ReportCache
+
+SECOND = 10**9
+
+
+class CountingDecoder:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def __call__(self, content: bytes) -> bytes:
+        self.calls += 1
+        return content
+
+
+def get_entries(cache_directory):
+    return [
+        entry
+        for directory in (STAT_DIRECTORY, OBJECT_DIRECTORY)
+        for entry in os.scandir(cache_directory / directory)
+    ]
+
+
+def age_entries(cache_directory, seconds):
+    """Moves the last use of all cache entries ``seconds`` into the past."""
+    for entry in get_entries(cache_directory):
+        mtime_ns = entry.stat().st_mtime_ns - seconds * SECOND
+        os.utime(entry.path, ns=(mtime_ns, mtime_ns))
+
+
+def test_unchanged_file_is_decoded_once(tmp_path):
+    report_file = tmp_path / "itb-TC-1.json"
+    report_file.write_bytes(b'{"uniqueID": "itb-TC-1"}')
+    cache = ReportCache(tmp_path / "cache", 1024 * 1024)
+    decode = CountingDecoder()
+
+    assert cache.load(report_file, decode) == report_file.read_bytes()
+    assert cache.load(report_file, decode) == report_file.read_bytes()
+    assert decode.calls == 1
+
+
+def test_edited_file_is_decoded_again(tmp_path):
+    report_file = tmp_path / "itb-TC-1.json"
+    report_file.write_bytes(b'{"uniqueID": "itb-TC-1"}')
+    cache = ReportCache(tmp_path / "cache", 1024 * 1024)
+    decode = CountingDecoder()
+    cache.load(report_file, decode)
+
+    report_file.write_bytes(b'{"uniqueID": "itb-TC-1", "name": "edited"}')
+
+    assert cache.load(report_file, decode) == report_file.read_bytes()
+    assert decode.calls == 2
+
+
+def test_least_recently_used_entries_are_evicted_beyond_max_size(tmp_path):
+    cache_directory = tmp_path / "cache"
+    max_size = 4000
+    cache = ReportCache(cache_directory, max_size)
+    decode = CountingDecoder()
+    report_files = []
+    for index in range(5):
+        report_file = tmp_path / f"itb-TC-{index}.json"
+        report_file.write_bytes(bytes([index]) * 1000)
+        report_files.append(report_file)
+        cache.load(report_file, decode)
+        age_entries(cache_directory, 10)
+
+    assert sum(entry.stat().st_size for entry in get_entries(cache_directory)) <= max_size
+    cache.load(report_files[-1], decode)
+    assert decode.calls == 5
+    cache.load(report_files[0], decode)
+    assert decode.calls == 6
+
+
+@pytest.mark.parametrize("corrupt_content", [b"", b"not a pickle"])
+def test_corrupt_entry_is_a_cache_miss(tmp_path, corrupt_content):
+    report_file = tmp_path / "itb-TC-1.json"
+    report_file.write_bytes(b'{"uniqueID": "itb-TC-1"}')
+    cache_directory = tmp_path / "cache"
+    cache = ReportCache(cache_directory, 1024 * 1024)
+    decode = CountingDecoder()
+    cache.load(report_file, decode)
+    for entry in os.scandir(cache_directory / OBJECT_DIRECTORY):
+        with open(entry.path, "wb") as cache_file:
+            cache_file.write(corrupt_content)
+
+    assert cache.load(report_file, decode) == report_file.read_bytes()
+    assert decode.calls == 2
+    assert cache.load(report_file, decode) == report_file.read_bytes()
+    assert decode.calls == 2
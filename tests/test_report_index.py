@@ -0,0 +1,115 @@
+import json
+import os
+from zipfile import ZipFile
+
+from testbench2robotframework import report_index
+from testbench2robotframework import testbench2robotframework as write_report
+from testbench2robotframework.report_index import ReportIndex, get_index_path
+from testbench2robotframework.selection import Selection
+from testbench2robotframework.utils import get_directory
+
+SECOND = 10**9
+ZIP_TIME = 1_600_000_000 * SECOND
+
+
+def set_keyword(test_case_path, keyword_name, mtime_ns):
+    test_case = json.loads(test_case_path.read_text(encoding="utf-8"))
+    test_case["spec"]["keywords"] = [{"key": "1", "name": keyword_name}]
+    test_case_path.write_text(json.dumps(test_case), encoding="utf-8")
+    os.utime(test_case_path, ns=(mtime_ns, mtime_ns))
+    return test_case_path.stat().st_size
+
+
+def get_keywords(report, test_case_uid):
+    index = ReportIndex.open(str(report))
+    try:
+        return index.get_test_case_tags([test_case_uid])[test_case_uid][0]
+    finally:
+        index.close()
+
+
+def test_index_is_reused_for_an_unchanged_report(synthetic_workspace):
+    report = str(synthetic_workspace.report)
+    ReportIndex.open(report).close()
+    index_mtime = get_index_path(report).stat().st_mtime_ns
+    ReportIndex.open(report).close()
+    assert get_index_path(report).stat().st_mtime_ns == index_mtime
+
+
+def test_index_is_reused_if_only_modification_times_changed(synthetic_workspace):
+    report = str(synthetic_workspace.report)
+    ReportIndex.open(report).close()
+    for path in synthetic_workspace.report.iterdir():
+        os.utime(path, ns=(SECOND, SECOND))
+    index = ReportIndex.open(report, build=False)
+    assert index is not None
+    index.close()
+
+
+def test_index_is_rebuilt_after_an_edit_of_the_same_size(synthetic_workspace):
+    report = synthetic_workspace.report
+    test_case_uid = synthetic_workspace.test_case_uids[0]
+    test_case_path = report / f"{test_case_uid}.json"
+    size = set_keyword(test_case_path, "smoke", SECOND)
+    assert get_keywords(report, test_case_uid) == ["smoke"]
+
+    assert set_keyword(test_case_path, "basic", 2 * SECOND) == size
+    assert get_keywords(report, test_case_uid) == ["basic"]
+    index = ReportIndex.open(str(report))
+    test_case_set_uid = test_case_uid.rsplit("-PC-", 1)[0]
+    assert index.select_test_cases(Selection(keywords=["basic"]), test_case_set_uid) == [
+        test_case_uid
+    ]
+    index.close()
+
+
+def test_write_builds_no_index_without_select(synthetic_workspace):
+    write_report(
+        str(synthetic_workspace.report), synthetic_workspace.config, use_index=True
+    )
+    assert not get_index_path(str(synthetic_workspace.report)).exists()
+
+
+def zip_report(report, zip_path):
+    with ZipFile(zip_path, "w") as archive:
+        for path in sorted(report.iterdir()):
+            archive.write(path, path.name)
+    return zip_path
+
+
+def test_zip_reports_are_fingerprinted_without_reading_the_extracted_files(
+    synthetic_workspace, tmp_path, monkeypatch
+):
+    report_zip = str(zip_report(synthetic_workspace.report, tmp_path / "report.zip"))
+    json_dir = get_directory(report_zip)
+    ReportIndex.open(json_dir, report_zip=report_zip).close()
+    index_path = get_index_path(json_dir)
+    index_mtime = index_path.stat().st_mtime_ns
+
+    def read_directory(*_):
+        raise AssertionError("The extracted report must not be hashed.")
+
+    monkeypatch.setattr(report_index, "get_report_content_fingerprint", read_directory)
+    json_dir = get_directory(report_zip)
+    ReportIndex.open(json_dir, report_zip=report_zip).close()
+    assert index_path.stat().st_mtime_ns == index_mtime
+
+
+def test_zip_reports_are_reindexed_after_a_change(synthetic_workspace, tmp_path):
+    report = synthetic_workspace.report
+    test_case_uid = synthetic_workspace.test_case_uids[0]
+    set_keyword(report / f"{test_case_uid}.json", "smoke", ZIP_TIME)
+    report_zip = str(zip_report(report, tmp_path / "report.zip"))
+    json_dir = get_directory(report_zip)
+    ReportIndex.open(json_dir, report_zip=report_zip).close()
+
+    os.utime(report_zip, ns=(SECOND, SECOND))
+    index = ReportIndex.open(get_directory(report_zip), build=False, report_zip=report_zip)
+    assert index is not None
+    index.close()
+
+    set_keyword(report / f"{test_case_uid}.json", "basic", ZIP_TIME)
+    zip_report(report, tmp_path / "report.zip")
+    index = ReportIndex.open(get_directory(report_zip), report_zip=report_zip)
+    assert index.get_test_case_tags([test_case_uid])[test_case_uid][0] == ["basic"]
+    index.close()
@@ -0,0 +1,150 @@
+import json
+
+from robot.api import ExecutionResult
+from robot.result import Result
+from robot.result import TestSuite as ResultSuite
+
+from testbench2robotframework.result_merger import merge_output_xmls
+from testbench2robotframework.robotframework2testbench import robot2testbench
+
+PHASE_PATTERN = "{testcase} : Phase {index}/{length}"
+
+
+def create_suite(name, tests=(), suites=(), unique_id=None):
+    suite = ResultSuite(name=name, metadata={"uniqueID": unique_id} if unique_id else None)
+    for test_name, status in tests:
+        suite.tests.create(name=test_name, status=status)
+    suite.suites.extend(suites)
+    return suite
+
+
+def save_output_xml(path, suite):
+    Result(suite=suite).save(str(path))
+    return str(path)
+
+
+def get_statuses(suite):
+    return [(test.name, test.status) for test in suite.tests]
+
+
+def test_last_result_wins_and_new_tests_and_suites_are_appended(tmp_path):
+    first = save_output_xml(
+        tmp_path / "first.xml",
+        create_suite(
+            "Root",
+            suites=[
+                create_suite("Set", [("A", "FAIL"), ("B", "PASS")], unique_id="itb-TC-1"),
+                create_suite("Other", [("C", "FAIL")], unique_id="itb-TC-2"),
+            ],
+        ),
+    )
+    second = save_output_xml(
+        tmp_path / "second.xml",
+        create_suite(
+            "Root",
+            suites=[
+                create_suite("Renamed Set", [("A", "PASS"), ("D", "SKIP")], unique_id="itb-TC-1"),
+                create_suite("New", [("E", "PASS")], unique_id="itb-TC-3"),
+            ],
+        ),
+    )
+    third = save_output_xml(
+        tmp_path / "third.xml",
+        create_suite("Root", suites=[create_suite("Set", [("B", "FAIL")], unique_id="itb-TC-1")]),
+    )
+
+    merged = merge_output_xmls([first, second, third], PHASE_PATTERN)[0].suite
+
+    assert [suite.name for suite in merged.suites] == ["Set", "Other", "New"]
+    test_case_set, other, new = merged.suites
+    assert get_statuses(test_case_set) == [("A", "PASS"), ("B", "FAIL"), ("D", "SKIP")]
+    assert get_statuses(other) == [("C", "FAIL")]
+    assert get_statuses(new) == [("E", "PASS")]
+
+
+def test_split_phases_are_replaced_one_by_one_in_phase_order(tmp_path):
+    first = save_output_xml(
+        tmp_path / "first.xml",
+        create_suite(
+            "Set",
+            [
+                ("A : Phase 1/2", "PASS"),
+                ("B", "PASS"),
+                ("A : Phase 2/2", "FAIL"),
+            ],
+        ),
+    )
+    second = save_output_xml(
+        tmp_path / "second.xml",
+        create_suite(
+            "Set",
+            [
+                ("C : Phase 2/2", "PASS"),
+                ("A : Phase 2/2", "PASS"),
+                ("C : Phase 1/2", "PASS"),
+            ],
+        ),
+    )
+
+    merged = merge_output_xmls([first, second], PHASE_PATTERN)[0].suite
+
+    assert get_statuses(merged) == [
+        ("A : Phase 1/2", "PASS"),
+        ("A : Phase 2/2", "PASS"),
+        ("B", "PASS"),
+        ("C : Phase 1/2", "PASS"),
+        ("C : Phase 2/2", "PASS"),
+    ]
+
+
+def test_a_single_output_xml_is_read_unchanged(tmp_path):
+    output_xml = save_output_xml(tmp_path / "output.xml", create_suite("Set", [("A", "FAIL")]))
+    assert get_statuses(merge_output_xmls([output_xml], PHASE_PATTERN)[0].suite) == [("A", "FAIL")]
+
+
+def test_output_xmls_of_tests_from_later_files_are_recorded(tmp_path):
+    first = save_output_xml(
+        tmp_path / "first.xml",
+        create_suite(
+            "Root", suites=[create_suite("Set", [("A", "FAIL"), ("B", "FAIL")], unique_id="1")]
+        ),
+    )
+    second = save_output_xml(
+        tmp_path / "second.xml",
+        create_suite(
+            "Root", suites=[create_suite("Set", [("A", "PASS"), ("B", "FAIL")], unique_id="1")]
+        ),
+    )
+    third = save_output_xml(
+        tmp_path / "third.xml",
+        create_suite("Root", suites=[create_suite("Set", [("B", "PASS")], unique_id="1")]),
+    )
+
+    _, test_output_xmls = merge_output_xmls([first, second, third], PHASE_PATTERN)
+
+    assert test_output_xmls == {("1", "A"): second, ("1", "B"): third}
+
+
+def test_references_are_resolved_next_to_their_output_xml(synthetic_workspace, tmp_path):
+    synthetic_workspace.write()
+    first = synthetic_workspace.run_robot(tmp_path / "first" / "output.xml")
+    result = ExecutionResult(str(first))
+    test = next(iter(result.suite.all_tests))
+    test.message = "itb-reference: file:///evidence.txt"
+    (tmp_path / "second").mkdir()
+    (tmp_path / "second" / "evidence.txt").write_text("evidence", encoding="utf-8")
+    second = tmp_path / "second" / "output.xml"
+    result.save(str(second))
+
+    robot2testbench(
+        str(synthetic_workspace.report),
+        [str(first), str(second)],
+        str(tmp_path / "result"),
+        synthetic_workspace.config,
+    )
+
+    assert (tmp_path / "result" / "attachments" / "evidence.txt").read_text("utf-8") == "evidence"
+    test_case = json.loads((tmp_path / "result" / f"{test.name}.json").read_text("utf-8"))
+    assert test_case["exec"]["references"] == [
+        {"type": "Attachment", "path": "attachments/evidence.txt"}
+    ]
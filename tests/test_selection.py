@@ -0,0 +1,45 @@
+import pytest
+
+from testbench2robotframework.selection import Selection
+
+from tests.helpers import EXAMPLE_NODES, create_tree
+
+
+def test_selection_selects_test_case_sets_of_subtrees():
+    tree = create_tree(EXAMPLE_NODES)
+    assert Selection().select_test_case_sets(tree) == ["uid-2", "uid-4", "uid-6"]
+    assert Selection(numberings=["1.2", "2"]).select_test_case_sets(tree) == ["uid-4", "uid-6"]
+    assert Selection(numberings=["1.1"]).select_test_case_sets(tree) == ["uid-2"]
+    assert Selection(uids=["uid-1", "uid-3"]).select_test_case_sets(tree) == ["uid-2", "uid-4"]
+    assert Selection(uids=["uid-7"]).select_test_case_sets(tree) == ["uid-7"]
+    assert Selection(numberings=["1.2.1.1"]).select_test_case_sets(tree) == []
+
+
+def test_numbering_prefixes_match_whole_levels_only():
+    tree = create_tree(EXAMPLE_NODES)
+    assert Selection(numberings=["1.2.1"]).select_test_case_sets(tree) == ["uid-4"]
+    assert Selection(numberings=["1."]).select_test_case_sets(tree) == []
+
+
+def test_selection_from_list():
+    assert Selection.from_list(None) is None
+    assert Selection.from_list(
+        ["uid:uid-1", "Numbering:1.2", "keyword:smoke", "tag:prio-*", "uid:uid-2"]
+    ) == Selection(
+        uids=["uid-1", "uid-2"], numberings=["1.2"], keywords=["smoke"], tags=["prio-*"]
+    )
+
+
+@pytest.mark.parametrize("selector", ["uid-1", "name:test", "uid:"])
+def test_selection_from_list_rejects_invalid_selectors(selector):
+    with pytest.raises(SystemExit):
+        Selection.from_list([selector])
+
+
+def test_keywords_and_tags_select_test_cases():
+    assert Selection().selects_tags([], [])
+    assert Selection(uids=["uid-1"]).selects_tags([], [])
+    selection = Selection(keywords=["smoke"], tags=["prio-*"])
+    assert selection.selects_tags(["Smoke"], [])
+    assert selection.selects_tags([], ["prio-high"])
+    assert not selection.selects_tags(["regression"], ["area-ui"])
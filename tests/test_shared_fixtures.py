@@ -0,0 +1,57 @@
+from testbench2robotframework.generated_keywords import (
+    SHARED_SETUP_PREFIX,
+    SHARED_TEARDOWN_PREFIX,
+)
+
+from tests.helpers import (
+    FAILING_KEYWORD,
+    FAILING_VALUE,
+    atomic_interaction,
+    get_interaction_verdicts,
+)
+
+SETUP = [atomic_interaction(name, "Setup") for name in ("Synthetic Open", "Synthetic Prepare")]
+STEPS = [atomic_interaction("Synthetic Step 1")]
+TEARDOWN = [atomic_interaction(name, "Teardown") for name in ("Synthetic Close", FAILING_KEYWORD)]
+
+
+def read_generated_suites(generation):
+    return [path.read_text(encoding="utf-8") for path in sorted(generation.rglob("*.robot"))]
+
+
+def test_identical_fixtures_are_shared_and_read_back(synthetic_workspace, tmp_path):
+    for test_case_uid in synthetic_workspace.test_case_uids:
+        synthetic_workspace.set_interactions(test_case_uid, [*SETUP, *STEPS, *TEARDOWN])
+
+    synthetic_workspace.write()
+    suites = [
+        suite
+        for suite in read_generated_suites(synthetic_workspace.paths["generation"])
+        if "*** Test Cases ***" in suite
+    ]
+    assert suites
+    for suite in suites:
+        assert suite.count(f"\n{SHARED_SETUP_PREFIX}") == 1
+        assert suite.count(f"\n{SHARED_TEARDOWN_PREFIX}") == 1
+    synthetic_workspace.run_robot()
+    result = synthetic_workspace.read(tmp_path / "result")
+
+    for test_case_uid in synthetic_workspace.test_case_uids:
+        assert get_interaction_verdicts(result, test_case_uid) == ["Pass"] * 5
+
+
+def test_failing_shared_setup_is_read_back_per_test_case(synthetic_workspace, tmp_path):
+    setup = [SETUP[0], atomic_interaction(FAILING_KEYWORD, "Setup", FAILING_VALUE)]
+    for test_case_uid in synthetic_workspace.test_case_uids:
+        synthetic_workspace.set_interactions(test_case_uid, [*setup, *STEPS, *TEARDOWN])
+
+    result = synthetic_workspace.round_trip(tmp_path / "result")
+
+    for test_case_uid in synthetic_workspace.test_case_uids:
+        assert get_interaction_verdicts(result, test_case_uid) == [
+            "Pass",
+            "Fail",
+            "Skipped",
+            "Pass",
+            "Pass",
+        ]
@@ -0,0 +1,68 @@
+import json
+
+from robot.api import ExecutionResult
+from testbench2robotframework import testbench2robotframework as write_report
+from testbench2robotframework.suite_ordering import GROUP_END, GROUP_START, SUITE_OPTION
+
+TEST_CASE_DURATIONS = {"itb-TC-1": 1000, "itb-TC-2": 4000, "itb-TC-3": 3000, "itb-TC-4": 2000}
+SUITE_ORDERING = "testbench2robotframework.suite_ordering.SuiteOrdering"
+
+
+def set_durations(workspace):
+    for test_case_uid in workspace.test_case_uids:
+        test_case_path = workspace.report / f"{test_case_uid}.json"
+        test_case = json.loads(test_case_path.read_text(encoding="utf-8"))
+        test_case_set_uid = test_case_uid.split("-PC-", 1)[0]
+        test_case["exec"]["actualDuration"] = TEST_CASE_DURATIONS[test_case_set_uid]
+        test_case_path.write_text(json.dumps(test_case), encoding="utf-8")
+
+
+def read_groups(ordering_file):
+    groups = []
+    for line in ordering_file.read_text(encoding="utf-8").splitlines():
+        if line == GROUP_START:
+            groups.append([])
+        elif line.startswith(SUITE_OPTION):
+            groups[-1].append(line[len(SUITE_OPTION) :])
+        else:
+            assert line == GROUP_END
+    return groups
+
+
+def get_executed_suites(output):
+    executed = []
+
+    def collect(suite):
+        if suite.tests:
+            executed.append((suite.full_name, suite.metadata["uniqueID"]))
+        for child in suite.suites:
+            collect(child)
+
+    collect(ExecutionResult(str(output)).suite)
+    return executed
+
+
+def test_ordering_file_drives_robot_execution_order_and_pabot_groups(
+    synthetic_workspace, tmp_path
+):
+    set_durations(synthetic_workspace)
+    ordering_file = tmp_path / "ordering.txt"
+
+    write_report(
+        str(synthetic_workspace.report),
+        synthetic_workspace.config,
+        ordering_file=str(ordering_file),
+        processes=2,
+    )
+    output = synthetic_workspace.run_robot(prerunmodifier=f"{SUITE_ORDERING}:{ordering_file}")
+
+    executed = get_executed_suites(output)
+    uids = dict(executed)
+    groups = read_groups(ordering_file)
+    assert [[uids[longname] for longname in group] for group in groups] == [
+        ["itb-TC-3", "itb-TC-4"],
+        ["itb-TC-2", "itb-TC-1"],
+    ]
+    assert [longname for longname, _ in executed] == [
+        longname for group in groups for longname in group
+    ]
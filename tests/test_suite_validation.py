@@ -0,0 +1,35 @@
+from robot.api import get_init_model, get_model
+from testbench2robotframework.suite_validation import validate_test_suites
+
+VALID_INIT = """*** Settings ***
+Metadata    UniqueID    itb-TT-1
+"""
+BROKEN_INIT = """*** Settings ***
+Resource    missing.resource
+Suite Setup    Missing Setup Keyword
+"""
+TEST_SUITE = """*** Test Cases ***
+itb-TC-1-PC-1
+    Log    checked
+"""
+
+
+def write_suites(generation_directory, init_content):
+    theme_directory = generation_directory / "1_Theme_1"
+    theme_directory.mkdir(parents=True)
+    init_file = theme_directory / "__init__.robot"
+    init_file.write_text(init_content, encoding="utf-8")
+    suite_file = theme_directory / "1_Test_Case_Set_1.1.robot"
+    suite_file.write_text(TEST_SUITE, encoding="utf-8")
+    return {
+        "itb-TT-1": get_init_model(init_file),
+        "itb-TC-1": get_model(suite_file),
+    }
+
+
+def test_valid_suites_have_no_problems(tmp_path):
+    assert validate_test_suites(write_suites(tmp_path, VALID_INIT), tmp_path) == 0
+
+
+def test_problems_of_init_files_are_found(tmp_path):
+    assert validate_test_suites(write_suites(tmp_path, BROKEN_INIT), tmp_path) == 1
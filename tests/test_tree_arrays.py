@@ -0,0 +1,68 @@
+import random
+
+from testbench2robotframework.model import TestStructureElementType as ElementType
+from testbench2robotframework.tree_arrays import NO_PARENT
+
+from tests.helpers import EXAMPLE_NODES, create_node, create_tree
+
+
+def is_ancestor(tree, ancestor, row):
+    visited = set()
+    while row != NO_PARENT and row not in visited:
+        if row == ancestor:
+            return True
+        visited.add(row)
+        row = tree.parent[row]
+    return False
+
+
+def test_subtrees_are_preorder_ranges():
+    tree = create_tree(EXAMPLE_NODES)
+    assert list(tree.preorder) == [0, 1, 2, 3, 4, 5, 6, 7]
+    assert list(tree.subtree_rows(1)) == [1, 2, 3, 4]
+    assert list(tree.subtree_rows(3)) == [3, 4]
+    assert list(tree.subtree_rows(7)) == [7]
+
+
+def test_postorder_numbers_every_reachable_row_once():
+    tree = create_tree(EXAMPLE_NODES)
+    assert list(tree.postorder_position) == [6, 3, 0, 2, 1, 5, 4, 7]
+
+
+def test_contains_answers_ancestor_queries():
+    tree = create_tree(EXAMPLE_NODES)
+    assert tree.contains(0, 4)
+    assert tree.contains(1, 4)
+    assert tree.contains(3, 3)
+    assert not tree.contains(4, 3)
+    assert not tree.contains(5, 4)
+    assert not tree.contains(0, 7)
+
+
+def test_contains_matches_walking_parents_on_random_trees():
+    random_generator = random.Random(4711)
+    for _ in range(50):
+        nodes = []
+        for index in range(1, random_generator.randint(2, 40)):
+            parent_key = random_generator.choice(["root", "missing", *map(str, range(1, index))])
+            nodes.append(create_node(str(index), parent_key, f"{index}"))
+        tree = create_tree(nodes)
+        for ancestor in range(len(tree)):
+            for row in range(len(tree)):
+                assert tree.contains(ancestor, row) == is_ancestor(tree, ancestor, row)
+
+
+def test_rows_on_parent_cycles_only_contain_themselves():
+    tree = create_tree([create_node("1", "2", "1"), create_node("2", "1", "2")])
+    assert tree.preorder_position[1] == NO_PARENT
+    assert tree.contains(1, 1)
+    assert not tree.contains(1, 2)
+    assert not tree.contains(0, 1)
+
+
+def test_rows_in_subtrees_returns_rows_in_tree_order():
+    tree = create_tree(EXAMPLE_NODES)
+    test_case_set = ElementType.TestCaseSetNode
+    assert tree.rows_in_subtrees([5, 1, 3], test_case_set) == [2, 4, 6]
+    assert tree.rows_in_subtrees([7], test_case_set) == [7]
+    assert tree.rows_in_subtrees([0], test_case_set) == [2, 4, 6]